@@ -1,325 +1,693 @@
 import os
+import io
 import json
 import re
-from copy import deepcopy
+import bisect
+import functools
+import zipfile
 from docx import Document
 from docx.shared import Pt
 from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml import OxmlElement, parse_xml
+from docx.text.paragraph import Paragraph
+from lxml import etree
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import logging
+from placeholder_utils import PLACEHOLDER_RE, BRACE_RE, WHITESPACE_RE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Element tags
+W_P = qn('w:p')
+W_R = qn('w:r')
+W_T = qn('w:t')
+W_TXBX_CONTENT = qn('w:txbxContent')
+
+# Compiled XPath queries
+_NSMAP = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+# Descendant text nodes of a paragraph (including text box content)
+_TEXT_NODES_XPATH = etree.XPath('.//w:t', namespaces=_NSMAP)
+# Text nodes of a paragraph's direct runs
+_RUN_TEXT_NODES_XPATH = etree.XPath('./w:r/w:t', namespaces=_NSMAP)
+# Text nodes of a paragraph's own runs
+_OWN_TEXT_NODES_XPATH = etree.XPath('./w:r/w:t | ./w:hyperlink/w:r/w:t', namespaces=_NSMAP)
+# Body and table cell paragraphs (text box paragraphs are handled by replace_in_textboxes)
+_STORY_PARAGRAPHS_XPATH = etree.XPath('./w:p | ./w:tbl//w:tc/w:p', namespaces=_NSMAP)
+
+# English month names for cover page dates (independent of the process locale)
+MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December')
+
+class _TitleFilenameTable(dict):
+    """
+    str.translate table for the title part of the output filename: keeps
+    characters that are alphabetic, digits or a space, and drops the rest.
+    Entries are filled in the first time a code point is seen.
+    """
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        value = codepoint if char.isalpha() or char.isdigit() or char == ' ' else None
+        self[codepoint] = value
+        return value
+
+_TITLE_FILENAME_TABLE = _TitleFilenameTable()
+
+# Static label replacements for Thesis/Dissertation/Research Proposal templates
+CO_SUPERVISOR_LABELS = {
+    'Field Supervisor': 'Co-Supervisor',
+    'FIELD SUPERVISOR': 'CO-SUPERVISOR',
+    'Field supervisor': 'Co-Supervisor',
+}
+
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 TEMPLATES_DIR = os.path.join(os.path.dirname(BASE_DIR), 'Cover Pages')
 OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), 'outputs', 'Cover Pages')
 
+# Document type -> template file
+TEMPLATE_FILES = {
+    'Assignment': 'Assignments Cover Page Template.docx',
+    'Thesis': 'Dissertation Cover Page Template.docx',
+    'Dissertation': 'Dissertation Cover Page Template.docx', # Added explicit mapping
+    'Research Proposal': 'Dissertation Cover Page Template.docx', # Same as Dissertation
+    'Internship Report': 'Internship Cover Page Template.docx', # Renamed from Project Report
+    'Project Report': 'Internship Cover Page Template.docx', # Keep for backward compatibility
+    'Research Paper': 'Assignments Cover Page Template.docx', # Fallback
+    'Lab Report': 'Assignments Cover Page Template.docx', # Fallback
+    'Term Paper': 'Assignments Cover Page Template.docx', # Fallback
+}
+TEMPLATE_PATHS = {k: os.path.join(TEMPLATES_DIR, v) for k, v in TEMPLATE_FILES.items()}
+DEFAULT_TEMPLATE_PATH = os.path.join(TEMPLATES_DIR, 'Assignments Cover Page Template.docx')
+
+# Simple French Faculty Translation (can be expanded)
+FRENCH_FACULTIES = {
+    "Faculty of Science": "Faculté des Sciences",
+    "Faculty of Arts": "Faculté des Arts",
+    "Faculty of Education": "Faculté d'Éducation",
+    "Faculty of Health Sciences": "Faculté des Sciences de la Santé",
+    "Faculty of Laws and Political Science": "Faculté des Lois et Sciences Politiques",
+    "College of Technology": "Collège de Technologie",
+    "Higher Technical Teacher Training College": "École Normale Supérieure de l'Enseignement Technique",
+    "National Higher Polytechnic Institute": "École Nationale Supérieure Polytechnique",
+    "Faculty of Economics and Management Sciences": "Faculté des Sciences Économiques et de Gestion"
+}
+
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+@functools.lru_cache(maxsize=32)
+def _load_json_cached(filepath, mtime):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 def load_json(filename):
+    """
+    Load a JSON file from DATA_DIR, parsed once per file version (path, mtime).
+    The returned object is shared between calls and must not be mutated.
+    """
     filepath = os.path.join(DATA_DIR, filename)
     if os.path.exists(filepath):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _load_json_cached(filepath, os.path.getmtime(filepath))
     return []
 
+def _coalesce_split_placeholders(p):
+    """
+    Move every {{...}} placeholder that Word split across several runs of paragraph p
+    into the w:t where it starts, so replacement becomes a plain per-run text swap.
+    Text outside the placeholders stays in its original run. Returns True if p changed.
+    """
+    nodes = [t for t in _RUN_TEXT_NODES_XPATH(p) if t.text]
+    if len(nodes) < 2:
+        return False
+    texts = [t.text for t in nodes]
+    full_text = "".join(texts)
+    if '{{' not in full_text:
+        return False
+    
+    starts = []
+    pos = 0
+    for text in texts:
+        starts.append(pos)
+        pos += len(text)
+    
+    changed = False
+    # Right to left so the offsets of earlier matches stay valid
+    for m in reversed(list(PLACEHOLDER_RE.finditer(full_text))):
+        first = bisect.bisect_right(starts, m.start()) - 1
+        last = bisect.bisect_right(starts, m.end() - 1) - 1
+        if first == last:
+            continue
+        texts[first] = texts[first][:m.start() - starts[first]] + m.group(0)
+        for i in range(first + 1, last):
+            texts[i] = ""
+        texts[last] = texts[last][m.end() - starts[last]:]
+        changed = True
+    
+    if changed:
+        for t, text in zip(nodes, texts):
+            if text != t.text:
+                t.text = text
+                if text != text.strip():
+                    t.set(qn('xml:space'), 'preserve')
+    return changed
+
+@functools.lru_cache(maxsize=8)
+def _load_template_bytes(template_path, mtime):
+    """
+    Read a template .docx into memory once per (path, mtime).
+    The mtime is part of the cache key so an edited template is picked up automatically.
+    Placeholders split across runs are coalesced here, once, before caching.
+    """
+    with open(template_path, 'rb') as f:
+        data = f.read()
+    
+    doc = Document(io.BytesIO(data))
+    body = doc.element.body
+    if body is None:
+        return data
+    changed = False
+    for p in body.iter(W_P):
+        if _coalesce_split_placeholders(p):
+            changed = True
+    if not changed:
+        return data
+    
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+def load_template(template_path):
+    """
+    Open a fresh Document for the template, served from the in-memory byte cache.
+    """
+    data = _load_template_bytes(template_path, os.path.getmtime(template_path))
+    return Document(io.BytesIO(data))
+
+# Parts rewritten when filling a cover page (body text and the Normal style font).
+# Only these are deflated on each save; every other entry keeps the template's
+# decompressed bytes and is written uncompressed (ZIP_STORED), so a render never
+# re-compresses the static parts
+_REWRITTEN_PARTS = frozenset(('word/document.xml', 'word/styles.xml'))
+
+@functools.lru_cache(maxsize=8)
+def _template_zip_entries(template_path, mtime):
+    with zipfile.ZipFile(io.BytesIO(_load_template_bytes(template_path, mtime))) as zf:
+        return tuple((info.filename, zf.read(info)) for info in zf.infolist())
+
+def save_from_template(doc, template_path, output_path):
+    """
+    Save doc by splicing its rewritten parts into the template's cached zip entries,
+    skipping python-docx's full re-serialization and re-compression of untouched parts
+    (those are stored uncompressed).
+    Falls back to doc.save() when the package layout differs from the template.
+    """
+    entries = _template_zip_entries(template_path, os.path.getmtime(template_path))
+    names = {name for name, _ in entries}
+    
+    rewritten = {}
+    for part in doc.part.package.iter_parts():
+        name = part.partname.lstrip('/')
+        if name in _REWRITTEN_PARTS:
+            rewritten[name] = part.blob
+        elif name not in names:
+            # A part was added after loading; only a full save gets rels/content types right
+            doc.save(output_path)
+            return
+    if len(rewritten) != len(_REWRITTEN_PARTS) or not names.issuperset(rewritten):
+        doc.save(output_path)
+        return
+    
+    with zipfile.ZipFile(output_path, 'w') as zf:
+        for name, data in entries:
+            if name in rewritten:
+                zf.writestr(name, rewritten[name], compress_type=zipfile.ZIP_DEFLATED)
+            else:
+                zf.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+
 def get_template_path(document_type):
     """
     Map document type to template file.
     """
-    mapping = {
-        'Assignment': 'Assignments Cover Page Template.docx',
-        'Thesis': 'Dissertation Cover Page Template.docx',
-        'Dissertation': 'Dissertation Cover Page Template.docx', # Added explicit mapping
-        'Research Proposal': 'Dissertation Cover Page Template.docx', # Same as Dissertation
-        'Internship Report': 'Internship Cover Page Template.docx', # Renamed from Project Report
-        'Project Report': 'Internship Cover Page Template.docx', # Keep for backward compatibility
-        'Research Paper': 'Assignments Cover Page Template.docx', # Fallback
-        'Lab Report': 'Assignments Cover Page Template.docx', # Fallback
-        'Term Paper': 'Assignments Cover Page Template.docx', # Fallback
-    }
-    
-    filename = mapping.get(document_type, 'Assignments Cover Page Template.docx')
-    return os.path.join(TEMPLATES_DIR, filename)
+    return TEMPLATE_PATHS.get(document_type, DEFAULT_TEMPLATE_PATH)
+
+def _iter_paragraph_texts(body):
+    """
+    Yield the joined w:t text of each paragraph under body (paragraphs, tables and text boxes)
+    in a single walk, so placeholders split across runs still appear contiguous.
+    """
+    current_p = None
+    parts = []
+    for t in body.iter(W_T):
+        p = next(t.iterancestors(W_P), None)
+        if p is not current_p:
+            if parts:
+                yield "".join(parts)
+            current_p = p
+            parts = []
+        if t.text:
+            parts.append(t.text)
+    if parts:
+        yield "".join(parts)
 
 def get_all_placeholders(doc):
     """
-    Scan document for all {{...}} placeholders, including those with newlines.
+    Scan document for all {{...}} placeholders, including those split across runs.
     Returns a list of unique placeholder strings found in the doc.
     """
-    text_content = []
-    
-    # Paragraphs
-    for p in doc.paragraphs:
-        text_content.append(p.text)
-        
-    # Tables
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    text_content.append(p.text)
-                    
-    # Text Boxes
-    if doc.element.body is not None:
-        for txbx in doc.element.body.iter(qn('w:txbxContent')):
-            for p in txbx.iter(qn('w:p')):
-                para_text = ""
-                for r in p.iter(qn('w:r')):
-                    for t in r.iter(qn('w:t')):
-                        if t.text:
-                            para_text += t.text
-                if para_text:
-                    text_content.append(para_text)
-                            
-    full_text = "\n".join(text_content)
-    # Find all {{...}} patterns, allowing for newlines and whitespace inside
-    # The regex matches {{ followed by any char (including newline) until }}
-    matches = re.findall(r'\{\{[^}]+\}\}', full_text, re.DOTALL)
-    return list(set(matches))
-
-def replace_text_in_paragraph(paragraph, replacements, formatting=None):
+    body = doc.element.body
+    if body is None:
+        return []
+
+    found = set()
+    for text in _iter_paragraph_texts(body):
+        if '{{' in text:
+            found.update(PLACEHOLDER_RE.findall(text))
+    return list(found)
+
+@functools.lru_cache(maxsize=8)
+def _scan_template_placeholders(template_path, mtime):
+    return frozenset(get_all_placeholders(load_template(template_path)))
+
+def get_template_placeholders(template_path):
+    """
+    Placeholders of a template file, scanned once per (path, mtime).
+    """
+    return _scan_template_placeholders(template_path, os.path.getmtime(template_path))
+
+def compile_replacements(replacements):
+    """
+    Build a single alternation regex over all replacement keys.
+    Longer keys come first so e.g. {{ACADEMIC YEAR}} wins over {{YEAR}}.
+    Returns None when there is nothing to replace.
+    """
+    if not replacements:
+        return None
+    keys = sorted(replacements, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(k) for k in keys))
+
+def _apply_run_formatting(run, fmt):
+    if 'font' in fmt: run.font.name = fmt['font']
+    if 'size' in fmt: run.font.size = fmt['size']
+    if 'bold' in fmt: run.font.bold = fmt['bold']
+
+def replacement_triggers(replacements):
+    """
+    Cheap substrings that must be present for any key to match: '{{' for placeholders
+    plus any plain-text keys (e.g. the static "Field Supervisor" label).
+    """
+    return ('{{',) + tuple(k for k in replacements if '{{' not in k)
+
+def replace_text_in_paragraph(paragraph, replacements, formatting=None, pattern=None, triggers=None):
     """
     Replace text in a paragraph preserving formatting as much as possible.
     formatting: dict of {key: {'font': 'Name', 'size': Pt(x)}}
+    pattern: precompiled alternation from compile_replacements (built on demand if omitted)
+    triggers: substrings from replacement_triggers used to skip static paragraphs
     """
+    if pattern is None:
+        pattern = compile_replacements(replacements)
+        if pattern is None:
+            return
+    if triggers is None:
+        triggers = replacement_triggers(replacements)
+    # paragraph.text is rebuilt from the XML on every access, so read it once
+    full_text = paragraph.text
+    if not any(s in full_text for s in triggers):
+        return
+    if not pattern.search(full_text):
+        return
+
+    def sub_fn(m):
+        return str(replacements[m.group(0)])
+
     # First, try exact match replacement in runs (best for formatting)
-    for key, value in replacements.items():
-        if key in paragraph.text:
-            replaced = False
-            for run in paragraph.runs:
-                if key in run.text:
-                    run.text = run.text.replace(key, str(value))
-                    replaced = True
-                    # Apply formatting if needed
-                    if formatting and key in formatting:
-                        fmt = formatting[key]
-                        if 'font' in fmt: run.font.name = fmt['font']
-                        if 'size' in fmt: run.font.size = fmt['size']
-                        if 'bold' in fmt: run.font.bold = fmt['bold']
-            
-            # If not replaced in runs, replace in paragraph text
-            if not replaced and key in paragraph.text:
-                paragraph.text = paragraph.text.replace(key, str(value))
-                # Note: Formatting applied to paragraph.text directly is harder to control for specific runs
-                # But we can try to apply to all runs if the paragraph was just the placeholder
-                if formatting and key in formatting and len(paragraph.runs) > 0:
-                    fmt = formatting[key]
-                    for run in paragraph.runs:
-                        if 'font' in fmt: run.font.name = fmt['font']
-                        if 'size' in fmt: run.font.size = fmt['size']
-                        if 'bold' in fmt: run.font.bold = fmt['bold']
-
-def replace_in_textboxes(doc, replacements, formatting=None):
+    replaced_in_runs = False
+    for run in paragraph.runs:
+        run_text = run.text
+        matched = pattern.findall(run_text)
+        if not matched:
+            continue
+        run.text = pattern.sub(sub_fn, run_text)
+        replaced_in_runs = True
+        # Apply formatting if needed
+        if formatting:
+            for key in matched:
+                if key in formatting:
+                    _apply_run_formatting(run, formatting[key])
+
+    # Keys split across runs: replace in paragraph text
+    if replaced_in_runs:
+        full_text = paragraph.text
+    matched = pattern.findall(full_text)
+    if matched:
+        paragraph.text = pattern.sub(sub_fn, full_text)
+        # Note: Formatting applied to paragraph.text directly is harder to control for specific runs
+        # But we can try to apply to all runs if the paragraph was just the placeholder
+        if formatting:
+            runs = paragraph.runs
+            for key in matched:
+                if key in formatting:
+                    for run in runs:
+                        _apply_run_formatting(run, formatting[key])
+
+def replace_in_textboxes(doc, replacements, formatting=None, pattern=None):
     """
     Replace text in text boxes (shapes) by iterating over XML.
     Handles placeholders split across multiple runs.
     """
     if doc.element.body is None:
         return
+    if pattern is None:
+        pattern = compile_replacements(replacements)
+        if pattern is None:
+            return
 
-    for txbx in doc.element.body.iter(qn('w:txbxContent')):
-        for p in txbx.iter(qn('w:p')):
+    for txbx in doc.element.body.iter(W_TXBX_CONTENT):
+        for p in txbx.iter(W_P):
             # 1. Reconstruct full paragraph text
-            full_text = ""
-            runs = []
-            # We need to map runs to their text content to apply formatting later
-            # But since we are reconstructing, we only keep the first run active.
-            # So we will apply formatting to the first run.
-            
-            # Collect runs
-            xml_runs = []
-            for r in p.iter(qn('w:r')):
-                xml_runs.append(r)
-                for t in r.iter(qn('w:t')):
-                    if t.text:
-                        full_text += t.text
-                        runs.append(t) # Store the text element
+            # We keep the text elements so the replacement can be written back into
+            # the first one; skip the paragraph early when no key occurs in it.
+            runs = [t for t in _TEXT_NODES_XPATH(p) if t.text]
+            full_text = "".join(t.text for t in runs)
             
             # 2. Check if any replacement key is in the full text
-            original_text = full_text
-            matched_key = None
-            replacement_value = None
-            
-            for key, value in replacements.items():
-                if key in full_text:
-                    matched_key = key
-                    replacement_value = str(value)
-                    break
+            m = pattern.search(full_text) if full_text else None
+            if m is None:
+                continue
+            logger.debug("Replaced %r in textbox", m.group(0))
             
-            if matched_key:
-                print(f"DEBUG: Replaced '{matched_key}' in textbox")
-                
-                # Check if we need complex split logic (formatting + surrounding text)
-                # If formatting is requested, we should split to apply formatting ONLY to the replacement
-                # REVERTED: Complex split logic caused issues. Reverting to simple replacement.
-                if False and formatting and matched_key in formatting:
-                    # SPLIT LOGIC
-                    if not runs: continue
-                    
-                    first_run = runs[0].getparent()
-                    p_element = first_run.getparent()
-                    
-                    # Get base properties (rPr) from the first run
-                    base_rPr = first_run.find(qn('w:rPr'))
-                    
-                    # Remove all existing runs from this paragraph
-                    # We iterate over a copy of children to avoid modification issues during iteration
-                    for child in list(p_element):
-                        if child.tag == qn('w:r'):
-                            p_element.remove(child)
-                            
-                    # Split text by key
-                    parts = original_text.split(matched_key)
-                    
-                    for i, part in enumerate(parts):
-                        # Add part (normal)
-                        if part:
-                            new_r = OxmlElement('w:r')
-                            if base_rPr is not None:
-                                new_r.append(deepcopy(base_rPr))
-                            
-                            # Handle newlines in part
-                            if '\n' in part:
-                                subparts = part.split('\n')
-                                for j, subpart in enumerate(subparts):
-                                    if j > 0: new_r.append(OxmlElement('w:br'))
-                                    t = OxmlElement('w:t')
-                                    t.text = subpart
-                                    if subpart.strip() == '': t.set(qn('xml:space'), 'preserve')
-                                    new_r.append(t)
-                            else:
-                                t = OxmlElement('w:t')
-                                t.text = part
-                                if part.startswith(' ') or part.endswith(' '):
-                                    t.set(qn('xml:space'), 'preserve')
-                                new_r.append(t)
-                            
-                            p_element.append(new_r)
-                        
-                        # Add replacement (formatted)
-                        if i < len(parts) - 1:
-                            new_r = OxmlElement('w:r')
-                            # Copy base props first
-                            if base_rPr is not None:
-                                new_r.append(deepcopy(base_rPr))
-                            else:
-                                rPr = OxmlElement('w:rPr')
-                                new_r.append(rPr)
-                            
-                            # Apply formatting
-                            rPr = new_r.find(qn('w:rPr'))
-                            if rPr is None:
-                                rPr = OxmlElement('w:rPr')
-                                new_r.insert(0, rPr)
-                            
-                            fmt = formatting[matched_key]
-                            
-                            if 'font' in fmt:
-                                rFonts = rPr.find(qn('w:rFonts'))
-                                if rFonts is None:
-                                    rFonts = OxmlElement('w:rFonts')
-                                    rPr.append(rFonts)
-                                rFonts.set(qn('w:ascii'), fmt['font'])
-                                rFonts.set(qn('w:hAnsi'), fmt['font'])
-                                rFonts.set(qn('w:cs'), fmt['font'])
-                            
-                            if 'size' in fmt:
-                                sz = rPr.find(qn('w:sz'))
-                                if sz is None:
-                                    sz = OxmlElement('w:sz')
-                                    rPr.append(sz)
-                                szCs = rPr.find(qn('w:szCs'))
-                                if szCs is None:
-                                    szCs = OxmlElement('w:szCs')
-                                    rPr.append(szCs)
-                                val = str(int(fmt['size'].pt * 2))
-                                sz.set(qn('w:val'), val)
-                                szCs.set(qn('w:val'), val)
-                                
-                            if 'bold' in fmt and fmt['bold']:
-                                b = rPr.find(qn('w:b'))
-                                if b is None:
-                                    b = OxmlElement('w:b')
-                                    rPr.append(b)
-                                b.set(qn('w:val'), '1')
-                            
-                            # Handle newlines in replacement value
-                            if '\n' in replacement_value:
-                                subparts = replacement_value.split('\n')
-                                for j, subpart in enumerate(subparts):
-                                    if j > 0: new_r.append(OxmlElement('w:br'))
-                                    t = OxmlElement('w:t')
-                                    t.text = subpart
-                                    new_r.append(t)
-                            else:
-                                t = OxmlElement('w:t')
-                                t.text = replacement_value
-                                new_r.append(t)
-                                
-                            p_element.append(new_r)
+            # Replace in place
+            sub_fn = lambda m: str(replacements[m.group(0)])
+            full_text = pattern.sub(sub_fn, full_text)
+
+            # Fast path: every key sits inside a single w:t and no line breaks are
+            # needed, so swap the text in place and leave the other runs alone
+            if '\n' not in full_text:
+                new_texts = [pattern.sub(sub_fn, t.text) for t in runs]
+                if "".join(new_texts) == full_text:
+                    for t, new_text in zip(runs, new_texts):
+                        if new_text != t.text:
+                            t.text = new_text
+                    continue
+
+            if runs:
+                # Check if we need newline handling
+                if '\n' in full_text:
+                    # We need to handle newlines properly by modifying the parent run
+                    first_t = runs[0]
+                    parent_r = first_t.getparent()
+
+                    # Clear other runs
+                    for t in runs[1:]:
+                        t.text = ""
+
+                    # Update the first run with new text, handling newlines
+                    # Clear existing content of the run (except rPr)
+                    for child in parent_r.getchildren():
+                        if child.tag != qn('w:rPr'):
+                            parent_r.remove(child)
 
+                    # Append new content
+                    lines = full_text.split('\n')
+                    for i, line in enumerate(lines):
+                        if i > 0:
+                            br = OxmlElement('w:br')
+                            parent_r.append(br)
+                        t = OxmlElement('w:t')
+                        t.text = line
+                        if line.startswith(' ') or line.endswith(' '):
+                            t.set(qn('xml:space'), 'preserve')
+                        parent_r.append(t)
                 else:
-                    # OLD LOGIC (Replace in place)
-                    full_text = full_text.replace(matched_key, replacement_value)
-                    
-                    if runs:
-                        # Check if we need newline handling
-                        if '\n' in full_text:
-                            # We need to handle newlines properly by modifying the parent run
-                            first_t = runs[0]
-                            parent_r = first_t.getparent()
-                            
-                            # Clear other runs
-                            for t in runs[1:]:
-                                t.text = ""
-                            
-                            # Update the first run with new text, handling newlines
-                            # Clear existing content of the run (except rPr)
-                            for child in parent_r.getchildren():
-                                if child.tag != qn('w:rPr'):
-                                    parent_r.remove(child)
-                            
-                            # Append new content
-                            lines = full_text.split('\n')
-                            for i, line in enumerate(lines):
-                                if i > 0:
-                                    br = OxmlElement('w:br')
-                                    parent_r.append(br)
-                                t = OxmlElement('w:t')
-                                t.text = line
-                                if line.startswith(' ') or line.endswith(' '):
-                                    t.set(qn('xml:space'), 'preserve')
-                                parent_r.append(t)
-                        else:
-                            # Simple logic for single line text
-                            runs[0].text = full_text
-                            for t in runs[1:]:
-                                t.text = ""
+                    # Simple logic for single line text
+                    runs[0].text = full_text
+                    for t in runs[1:]:
+                        t.text = ""
 
 def replace_placeholders(doc, replacements, formatting=None):
     """
     Replace placeholders in the document (paragraphs, tables, and text boxes).
     """
-    # Replace in paragraphs
-    for paragraph in doc.paragraphs:
-        replace_text_in_paragraph(paragraph, replacements, formatting)
+    # Only keep the keys that actually occur in this document so the per-paragraph
+    # alternation stays small (many static keys never appear in a given template)
+    if doc.element.body is None:
+        return
+    doc_text = "\n".join(_iter_paragraph_texts(doc.element.body))
+    replacements = {k: v for k, v in replacements.items() if k in doc_text}
+
+    pattern = compile_replacements(replacements)
+    if pattern is None:
+        return
+    triggers = replacement_triggers(replacements)
 
-    # Replace in tables
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    replace_text_in_paragraph(paragraph, replacements, formatting)
+    # Replace in body and table paragraphs with one XML walk; only paragraphs whose
+    # text contains a trigger get wrapped in python-docx objects
+    for p in _STORY_PARAGRAPHS_XPATH(doc.element.body):
+        own_text = "".join(t.text for t in _OWN_TEXT_NODES_XPATH(p) if t.text)
+        if not any(s in own_text for s in triggers):
+            continue
+        replace_text_in_paragraph(Paragraph(p, doc.part), replacements, formatting, pattern, triggers)
                     
     # Replace in text boxes
-    replace_in_textboxes(doc, replacements, formatting)
+    replace_in_textboxes(doc, replacements, formatting, pattern)
+
+# Placeholder classification
+# Ordered (matches(norm_key), value(values_map, clean_key), formatting) rules; the first match wins.
+_TNR12 = {'font': 'Times New Roman', 'size': Pt(12)}
+_TNR12_BOLD = {'font': 'Times New Roman', 'size': Pt(12), 'bold': True}
+
+def _supervisor_value(name):
+    # Force new line for all supervisors
+    return "\n" + name if name else ""
+
+_PLACEHOLDER_RULES = (
+    (lambda k: 'student' in k and 'name' in k and 'lecturer' not in k and 'supervisor' not in k,
+     lambda v, ck: v['studentName'], None),
+    # Apply Times New Roman 12 for Matricule
+    (lambda k: 'matricule' in k or 'id' in k,
+     lambda v, ck: v['studentId'], _TNR12),
+    (lambda k: 'course' in k and 'code' in k,
+     lambda v, ck: v['courseCode'], None),
+    (lambda k: 'course' in k,
+     lambda v, ck: v['courseTitle'], None),
+    (lambda k: 'department' in k or 'deparment' in k, # Handle typo
+     lambda v, ck: v['department'].upper() if 'DEPARMENT' in ck or 'DEPARTMENT' in ck else v['department'], None),
+    # Check for French translation request
+    (lambda k: ('faculty' in k or 'schoo' in k) and ('french' in k or 'translation' in k),
+     lambda v, ck: v['facultyFr'], None),
+    (lambda k: 'faculty' in k or 'schoo' in k,
+     lambda v, ck: v['faculty'].upper() if 'FACULTY' in ck else v['faculty'], None),
+    (lambda k: 'institution' in k,
+     lambda v, ck: v['institution'].upper(), None),
+    (lambda k: 'title' in k or 'topic' in k,
+     lambda v, ck: v['title'], None),
+    # Only bold the name; assuming placeholder is just {{INSTRUCTOR}} or {{Lecturer Name}}
+    (lambda k: 'lecturer' in k or 'instructor' in k,
+     lambda v, ck: " " + v['instructor'] if v['instructor'] else "", _TNR12_BOLD),
+    (lambda k: 'field' in k and 'supervisor' in k,
+     lambda v, ck: _supervisor_value(v['fieldSupervisor'] or v.get('coSupervisor', '')), None),
+    (lambda k: 'academic' in k and 'supervisor' in k,
+     lambda v, ck: _supervisor_value(v['academicSupervisor']), None),
+    # Generic supervisor (fallback)
+    (lambda k: 'supervisor' in k,
+     lambda v, ck: _supervisor_value(v['supervisor']), None),
+    (lambda k: 'level' in k,
+     lambda v, ck: v['level'], None),
+    (lambda k: 'degree' in k,
+     lambda v, ck: v['degree'], None),
+    (lambda k: 'month' in k,
+     lambda v, ck: v['monthYear'], None),
+    (lambda k: 'academic' in k and 'year' in k,
+     lambda v, ck: v['academicYear'], _TNR12),
+    # Plain "Year" maps to the Academic Year (it was missing from assignment cover pages)
+    (lambda k: 'year' in k and 'month' not in k,
+     lambda v, ck: v['academicYear'], _TNR12),
+    # Handle 'Session' for Academic Year
+    (lambda k: 'session' in k,
+     lambda v, ck: v['academicYear'], _TNR12),
+    (lambda k: 'date' in k,
+     lambda v, ck: v['date'], None),
+)
+
+# Separator used to normalize a batch of placeholders in one regex pass
+_KEY_SEP = '\x01'
+
+def normalize_placeholders(placeholders):
+    """
+    Clean and normalize a batch of placeholders with a single pass of each regex.
+    Returns a list of (clean_key, norm_key) in the same order.
+    """
+    # Clean the placeholder keys (remove {{, }}, newlines, whitespace)
+    clean_keys = [k.strip() for k in BRACE_RE.sub('', _KEY_SEP.join(placeholders)).split(_KEY_SEP)]
+    # Normalize keys for matching (lowercase, remove extra spaces)
+    norm_keys = WHITESPACE_RE.sub(' ', _KEY_SEP.join(clean_keys)).lower().split(_KEY_SEP)
+    return list(zip(clean_keys, norm_keys))
+
+@functools.lru_cache(maxsize=32)
+def _classify_placeholder_set(placeholders):
+    classified = []
+    for ph, (clean_key, norm_key) in zip(placeholders, normalize_placeholders(placeholders)):
+        value_fn = None
+        fmt = None
+        for matches, rule_value_fn, rule_fmt in _PLACEHOLDER_RULES:
+            if matches(norm_key):
+                value_fn = rule_value_fn
+                fmt = rule_fmt
+                break
+        
+        # Apply formatting to Student Name as well
+        if 'student' in norm_key and 'name' in norm_key:
+            fmt = _TNR12
+        classified.append((ph, clean_key, value_fn, fmt))
+    return tuple(classified)
+
+def classify_placeholders(placeholders):
+    """
+    Resolve raw {{...}} placeholders to (ph, clean_key, value_fn, formatting) tuples.
+    Templates reuse the same placeholder set, so the rule scan runs once per template.
+    """
+    return _classify_placeholder_set(tuple(sorted(placeholders)))
+
+def _apply_default_font(doc):
+    # Force document defaults to Times New Roman to ensure consistency after merge
+    try:
+        style = doc.styles['Normal']
+        font = style.font
+        font.name = 'Times New Roman'
+        font.size = Pt(12)
+    except Exception as e:
+        logger.warning(f"Could not set default font: {e}")
+
+def fill_cover_page(doc, data, found_placeholders):
+    """
+    Build the replacement values for one record and apply them to doc.
+    found_placeholders: placeholders present in the template (see get_template_placeholders)
+    """
+    document_type = data.get('documentType', 'Assignment')
+
+    # Standardize date
+    date_obj = datetime.now()
+    if data.get('date'):
+        try:
+            date_obj = datetime.strptime(data.get('date'), '%Y-%m-%d')
+        except:
+            pass
+
+    year = date_obj.year
+    month_name = MONTH_NAMES[date_obj.month - 1]
+    date_str = f"{month_name} {date_obj.day:02d}, {year}"
+    month_year = f"{month_name} {year}"
+    year_str = str(year)
+    academic_year = f"{year}/{year + 1}" if date_obj.month >= 9 else f"{year - 1}/{year}"
+
+    # Helper to get value or empty string
+    def get_val(k): return str(data.get(k, '') or '')
+
+    # Infer degree based on faculty
+    faculty = get_val('faculty')
+    degree = "Bachelor of Science" # Default
+    if "Arts" in faculty:
+        degree = "Bachelor of Arts"
+    elif "Technology" in faculty:
+        degree = "Bachelor of Technology"
+    elif "Engineering" in faculty or "Polytechnic" in faculty:
+        degree = "Bachelor of Engineering"
+    elif "Education" in faculty:
+        degree = "Bachelor of Education"
+    elif "Commerce" in faculty or "Management" in faculty:
+        degree = "Bachelor of Science"
+
+    # Override for Thesis/Dissertation if needed (usually Masters)
+    if document_type in ['Thesis', 'Dissertation']:
+        degree = "Master of Science" # Simplified assumption
+        if "Arts" in faculty: degree = "Master of Arts"
+
+    # Base values map
+    values_map = {
+        'studentName': get_val('studentName'),
+        'studentId': get_val('studentId'),
+        'courseCode': get_val('courseCode'),
+        'courseTitle': get_val('courseTitle'),
+        'department': get_val('department'),
+        'faculty': get_val('faculty'),
+        'institution': get_val('institution'),
+        'title': get_val('title'),
+        'date': date_str,
+        'instructor': get_val('instructor'),
+        'supervisor': get_val('supervisor') or get_val('academicSupervisor'), # Fallback for Project Reports
+        'coSupervisor': get_val('coSupervisor'),
+        'academicSupervisor': get_val('academicSupervisor') or get_val('supervisor'), # Fallback
+        'fieldSupervisor': get_val('fieldSupervisor'),
+        'level': get_val('level'),
+        'assignmentNumber': get_val('assignmentNumber'),
+        'degree': degree,
+        'monthYear': month_year,
+        'year': year_str,
+        'academicYear': academic_year
+    }
+
+    values_map['facultyFr'] = FRENCH_FACULTIES.get(values_map['faculty'], values_map['faculty']) # Default to English if not found
+
+    logger.debug("Found placeholders: %s", found_placeholders)
+
+    replacements = {}
+    formatting_rules = {} # Map placeholder -> {font: 'Name', size: Pt(x)}
+
+    for ph, clean_key, value_fn, fmt in classify_placeholders(found_placeholders):
+        val = value_fn(values_map, clean_key) if value_fn else ""
+
+        # Add to replacements
+        # We replace even if empty to remove the placeholder tag
+        replacements[ph] = val
+        if fmt:
+            formatting_rules[ph] = fmt
+        logger.debug("Mapped %r -> %r", ph, val)
+
+    # Static Text Replacement (e.g. "Field Supervisor" -> "Co-Supervisor" for Dissertations)
+    if document_type in ['Thesis', 'Dissertation', 'Research Proposal']:
+        # We need to replace the static label "Field Supervisor" with "Co-Supervisor"
+        # This is tricky because it's not a placeholder. We'll do a global text replacement.
+        # We'll add it to replacements but with a special key that matches the text.
+        # Note: replace_placeholders iterates paragraphs/runs, so we can add plain text to replacements.
+        replacements.update(CO_SUPERVISOR_LABELS)
+
+    # Also add standard clean keys just in case
+    replacements.update({
+        '{{degree_selected}}': degree,
+        '{{Deparment}}': values_map['department'],
+        '{{School/Faculty}}': values_map['faculty'],
+        '{{Month and Year}}': month_year,
+        '{{Academic Year}}': academic_year,
+        '{{ACADEMIC YEAR}}': academic_year,
+        '{{academic year}}': academic_year,
+        '{{Year}}': academic_year,
+        '{{Session}}': academic_year,
+        '{{Date}}': date_str,
+    })
+
+    replace_placeholders(doc, replacements, formatting_rules)
+
+def save_cover_page(doc, data, suffix='', template_path=None):
+    """
+    Save a filled cover page to OUTPUT_DIR and return the output path.
+    suffix: appended to the filename stem (used by batches to keep names unique)
+    template_path: template doc was loaded from; enables the zip-splicing save
+    """
+    # Generate output filename
+    timestamp = f"{datetime.now():%Y%m%d_%H%M%S}"
+    safe_title = data.get('title', 'cover_page').translate(_TITLE_FILENAME_TABLE).rstrip()
+    filename = f"CoverPage_{safe_title}_{timestamp}{suffix}.docx"
+    output_path = os.path.join(OUTPUT_DIR, filename)
+    
+    if template_path:
+        save_from_template(doc, template_path, output_path)
+    else:
+        doc.save(output_path)
+    return output_path
 
 def generate_cover_page(data):
     """
@@ -333,211 +701,96 @@ def generate_cover_page(data):
             logger.error(f"Template not found: {template_path}")
             return None, f"Template for {document_type} not found."
 
-        doc = Document(template_path)
-        
-        # Force document defaults to Times New Roman to ensure consistency after merge
-        try:
-            style = doc.styles['Normal']
-            font = style.font
-            font.name = 'Times New Roman'
-            font.size = Pt(12)
-        except Exception as e:
-            logger.warning(f"Could not set default font: {e}")
-
-        # Standardize date
-        date_obj = datetime.now()
-        if data.get('date'):
-            try:
-                date_obj = datetime.strptime(data.get('date'), '%Y-%m-%d')
-            except:
-                pass
-        
-        date_str = date_obj.strftime('%B %d, %Y')
-        month_year = date_obj.strftime('%B %Y')
-        year_str = date_obj.strftime('%Y')
-        academic_year = f"{date_obj.year}/{date_obj.year + 1}" if date_obj.month >= 9 else f"{date_obj.year - 1}/{date_obj.year}"
-        
-        # Helper to get value or empty string
-        def get_val(k): return str(data.get(k, '') or '')
-
-        # Infer degree based on faculty
-        faculty = get_val('faculty')
-        degree = "Bachelor of Science" # Default
-        if "Arts" in faculty:
-            degree = "Bachelor of Arts"
-        elif "Technology" in faculty:
-            degree = "Bachelor of Technology"
-        elif "Engineering" in faculty or "Polytechnic" in faculty:
-            degree = "Bachelor of Engineering"
-        elif "Education" in faculty:
-            degree = "Bachelor of Education"
-        elif "Commerce" in faculty or "Management" in faculty:
-            degree = "Bachelor of Science"
-            
-        # Override for Thesis/Dissertation if needed (usually Masters)
-        if document_type in ['Thesis', 'Dissertation']:
-            degree = "Master of Science" # Simplified assumption
-            if "Arts" in faculty: degree = "Master of Arts"
-
-        # Base values map
-        values_map = {
-            'studentName': get_val('studentName'),
-            'studentId': get_val('studentId'),
-            'courseCode': get_val('courseCode'),
-            'courseTitle': get_val('courseTitle'),
-            'department': get_val('department'),
-            'faculty': get_val('faculty'),
-            'institution': get_val('institution'),
-            'title': get_val('title'),
-            'date': date_str,
-            'instructor': get_val('instructor'),
-            'supervisor': get_val('supervisor') or get_val('academicSupervisor'), # Fallback for Project Reports
-            'coSupervisor': get_val('coSupervisor'),
-            'academicSupervisor': get_val('academicSupervisor') or get_val('supervisor'), # Fallback
-            'fieldSupervisor': get_val('fieldSupervisor'),
-            'level': get_val('level'),
-            'assignmentNumber': get_val('assignmentNumber'),
-            'degree': degree,
-            'monthYear': month_year,
-            'year': year_str,
-            'academicYear': academic_year
-        }
-
-        # Simple French Faculty Translation (can be expanded)
-        french_faculties = {
-            "Faculty of Science": "Faculté des Sciences",
-            "Faculty of Arts": "Faculté des Arts",
-            "Faculty of Education": "Faculté d'Éducation",
-            "Faculty of Health Sciences": "Faculté des Sciences de la Santé",
-            "Faculty of Laws and Political Science": "Faculté des Lois et Sciences Politiques",
-            "College of Technology": "Collège de Technologie",
-            "Higher Technical Teacher Training College": "École Normale Supérieure de l'Enseignement Technique",
-            "National Higher Polytechnic Institute": "École Nationale Supérieure Polytechnique",
-            "Faculty of Economics and Management Sciences": "Faculté des Sciences Économiques et de Gestion"
-        }
-        faculty_fr = french_faculties.get(values_map['faculty'], values_map['faculty']) # Default to English if not found
+        doc = load_template(template_path)
+        _apply_default_font(doc)
 
         # Scan document for actual placeholders
-        found_placeholders = get_all_placeholders(doc)
-        print(f"DEBUG: Found placeholders: {found_placeholders}")
-        
-        replacements = {}
-        formatting_rules = {} # Map placeholder -> {font: 'Name', size: Pt(x)}
-        
-        for ph in found_placeholders:
-            # Clean the placeholder key (remove {{, }}, newlines, whitespace)
-            clean_key = re.sub(r'[{}]', '', ph).strip()
-            # Normalize key for matching (lowercase, remove extra spaces)
-            norm_key = re.sub(r'\s+', ' ', clean_key).lower()
-            
-            val = ""
-            
-            # Map normalized keys to values
-            if 'student' in norm_key and 'name' in norm_key and 'lecturer' not in norm_key and 'supervisor' not in norm_key:
-                val = values_map['studentName']
-            elif 'matricule' in norm_key or 'id' in norm_key:
-                val = values_map['studentId']
-                # Apply Times New Roman 12 for Matricule
-                formatting_rules[ph] = {'font': 'Times New Roman', 'size': Pt(12)}
-            elif 'course' in norm_key:
-                if 'code' in norm_key: val = values_map['courseCode']
-                else: val = values_map['courseTitle']
-            elif 'department' in norm_key or 'deparment' in norm_key: # Handle typo
-                val = values_map['department'].upper() if 'DEPARMENT' in clean_key or 'DEPARTMENT' in clean_key else values_map['department']
-            elif 'faculty' in norm_key or 'schoo' in norm_key:
-                # Check for French translation request
-                if 'french' in norm_key or 'translation' in norm_key:
-                    val = faculty_fr
-                else:
-                    val = values_map['faculty'].upper() if 'FACULTY' in clean_key else values_map['faculty']
-            elif 'institution' in norm_key:
-                val = values_map['institution'].upper()
-            elif 'title' in norm_key or 'topic' in norm_key:
-                val = values_map['title']
-            elif 'lecturer' in norm_key or 'instructor' in norm_key:
-                # Only bold the name, not the title "Instructor:" if it's part of the placeholder (unlikely for {{INSTRUCTOR}})
-                # But if the placeholder is {{Instructor: Name}}, we might have issues.
-                # Assuming placeholder is just {{INSTRUCTOR}} or {{Lecturer Name}}
-                val = " " + values_map['instructor'] if values_map['instructor'] else ""
-                formatting_rules[ph] = {'font': 'Times New Roman', 'size': Pt(12), 'bold': True}
-            elif 'field' in norm_key and 'supervisor' in norm_key:
-                raw_val = values_map['fieldSupervisor'] or values_map.get('coSupervisor', '')
-                # Force new line for all supervisors
-                val = "\n" + raw_val if raw_val else ""
-            elif 'academic' in norm_key and 'supervisor' in norm_key:
-                val = "\n" + values_map['academicSupervisor'] if values_map['academicSupervisor'] else ""
-            elif 'supervisor' in norm_key: # Generic supervisor (fallback)
-                val = "\n" + values_map['supervisor'] if values_map['supervisor'] else ""
-            elif 'level' in norm_key:
-                val = values_map['level']
-            elif 'degree' in norm_key:
-                val = values_map['degree']
-            elif 'month' in norm_key:
-                val = values_map['monthYear']
-            elif 'academic' in norm_key and 'year' in norm_key:
-                val = values_map['academicYear']
-                formatting_rules[ph] = {'font': 'Times New Roman', 'size': Pt(12)}
-            elif 'year' in norm_key and 'month' not in norm_key:
-                # If it's just "Year", prefer Academic Year for assignments, or just Year?
-                # User said "Academic Year for assignment is not on the final cover page".
-                # I'll assume they want Academic Year.
-                val = values_map['academicYear']
-                formatting_rules[ph] = {'font': 'Times New Roman', 'size': Pt(12)}
-            elif 'session' in norm_key: # Handle 'Session' for Academic Year
-                val = values_map['academicYear']
-                formatting_rules[ph] = {'font': 'Times New Roman', 'size': Pt(12)}
-            elif 'date' in norm_key:
-                val = values_map['date']
-            
-            # Add to replacements
-            # We replace even if empty to remove the placeholder tag
-            replacements[ph] = val
-            if val:
-                print(f"DEBUG: Mapped '{ph}' -> '{val}'")
-            else:
-                print(f"DEBUG: Mapped '{ph}' -> '' (Empty)")
-                
-            # Apply formatting to Student Name as well
-            if 'student' in norm_key and 'name' in norm_key:
-                 formatting_rules[ph] = {'font': 'Times New Roman', 'size': Pt(12)}
-
-        # Static Text Replacement (e.g. "Field Supervisor" -> "Co-Supervisor" for Dissertations)
-        if document_type in ['Thesis', 'Dissertation', 'Research Proposal']:
-            # We need to replace the static label "Field Supervisor" with "Co-Supervisor"
-            # This is tricky because it's not a placeholder. We'll do a global text replacement.
-            # We'll add it to replacements but with a special key that matches the text.
-            # Note: replace_placeholders iterates paragraphs/runs, so we can add plain text to replacements.
-            replacements['Field Supervisor'] = 'Co-Supervisor'
-            replacements['FIELD SUPERVISOR'] = 'CO-SUPERVISOR'
-            replacements['Field supervisor'] = 'Co-Supervisor'
-        
-        # Also add standard clean keys just in case
-        replacements.update({
-            '{{degree_selected}}': degree,
-            '{{Deparment}}': values_map['department'],
-            '{{School/Faculty}}': values_map['faculty'],
-            '{{Month and Year}}': month_year,
-            '{{Academic Year}}': academic_year,
-            '{{ACADEMIC YEAR}}': academic_year,
-            '{{academic year}}': academic_year,
-            '{{Year}}': academic_year,
-            '{{Session}}': academic_year,
-            '{{Date}}': date_str,
-        })
+        found_placeholders = get_template_placeholders(template_path)
+        fill_cover_page(doc, data, found_placeholders)
         
-        replace_placeholders(doc, replacements, formatting_rules)
-        
-        # Generate output filename
-
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        safe_title = "".join([c for c in data.get('title', 'cover_page') if c.isalpha() or c.isdigit() or c==' ']).rstrip()
-        filename = f"CoverPage_{safe_title}_{timestamp}.docx"
-        output_path = os.path.join(OUTPUT_DIR, filename)
-        
-        doc.save(output_path)
+        output_path = save_cover_page(doc, data, template_path=template_path)
         
         return output_path, None
         
     except Exception as e:
         logger.error(f"Error generating cover page: {str(e)}")
         return None, str(e)
+
+def generate_cover_pages(records, index_offset=0):
+    """
+    Generate cover pages for many records, parsing each template only once.
+    Every record is rendered into a fresh copy of the pristine template body.
+    index_offset: added to the per-record filename suffix (keeps names unique across chunks)
+    Returns a list of (output_path, error) tuples in the same order as records.
+    """
+    results = [None] * len(records)
+    
+    # Group records by template so each template is parsed and scanned once
+    grouped = {}
+    for i, data in enumerate(records):
+        document_type = data.get('documentType', 'Assignment')
+        grouped.setdefault(get_template_path(document_type), []).append(i)
+    
+    for template_path, indices in grouped.items():
+        if not os.path.exists(template_path):
+            logger.error(f"Template not found: {template_path}")
+            for i in indices:
+                document_type = records[i].get('documentType', 'Assignment')
+                results[i] = (None, f"Template for {document_type} not found.")
+            continue
+        
+        try:
+            doc = load_template(template_path)
+            _apply_default_font(doc)
+            found_placeholders = get_template_placeholders(template_path)
+            body = doc.element.body
+            pristine_body = etree.tostring(body)
+        except Exception as e:
+            logger.error(f"Error loading cover page template: {str(e)}")
+            for i in indices:
+                results[i] = (None, str(e))
+            continue
+        
+        for n, i in enumerate(indices):
+            try:
+                if n > 0:
+                    # Reset the body in place so python-docx's cached wrappers stay valid
+                    for child in list(body):
+                        body.remove(child)
+                    for child in list(parse_xml(pristine_body)):
+                        body.append(child)
+                fill_cover_page(doc, records[i], found_placeholders)
+                results[i] = (save_cover_page(doc, records[i], suffix=f"_{index_offset + i + 1}", template_path=template_path), None)
+            except Exception as e:
+                logger.error(f"Error generating cover page: {str(e)}")
+                results[i] = (None, str(e))
+    
+    return results
+
+def _warm_template_cache():
+    # Worker initializer: load and scan every known template once per process
+    for template_path in set(TEMPLATE_PATHS.values()):
+        if os.path.exists(template_path):
+            get_template_placeholders(template_path)
+
+def _generate_cover_page_chunk(chunk):
+    index_offset, records = chunk
+    return generate_cover_pages(records, index_offset=index_offset)
+
+def generate_cover_pages_parallel(records, workers=None, chunksize=16):
+    """
+    Generate cover pages across a pool of worker processes.
+    Records are split into chunks that each go through generate_cover_pages, so every
+    worker still shares one parsed template per chunk. Small batches run in-process.
+    Returns a list of (output_path, error) tuples in the same order as records.
+    """
+    records = list(records)
+    if len(records) <= chunksize or workers == 1:
+        return generate_cover_pages(records)
+    
+    chunks = [(i, records[i:i + chunksize]) for i in range(0, len(records), chunksize)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_template_cache) as executor:
+        for chunk_results in executor.map(_generate_cover_page_chunk, chunks):
+            results.extend(chunk_results)
+    return results
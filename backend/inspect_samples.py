@@ -1,7 +1,7 @@
 import os
-import re
 from docx import Document
 from docx.oxml.ns import qn
+from placeholder_utils import PLACEHOLDER_RE
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -36,7 +36,7 @@ def get_placeholders(doc_path):
                             
     full_text = "\n".join(text_content)
     # Find all {{...}} patterns, allowing for newlines
-    matches = re.findall(r'\{\{[^}]+\}\}', full_text, re.DOTALL)
+    matches = PLACEHOLDER_RE.findall(full_text)
     return list(set(matches))
 
 print("Inspecting Poorly Formatted Samples for Unresolved Placeholders...")
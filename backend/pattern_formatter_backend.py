@@ -7,34 +7,103 @@ from flask_cors import CORS
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
+import docx.api
 from docx import Document
 from docx.shared import Pt, Inches, RGBColor, Emu
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_CELL_VERTICAL_ALIGNMENT
 from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.section import WD_SECTION
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+from docx.oxml import OxmlElement, parse_xml
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.opc.pkgwriter import PackageWriter
+from docx.oxml.ns import qn, nsmap
+from lxml import etree
 from docxcompose.composer import Composer
+from copy import deepcopy
 import re
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import json
-import uuid
+import secrets
 import threading
+import atexit
+import zipfile
 import time
+from dataclasses import dataclass, fields
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from io import BytesIO
+from pathlib import Path
 import logging
 
+try:
+    import orjson
+except ImportError:  # Optional: falls back to Flask's stdlib json provider
+    orjson = None
+from flask.json.provider import DefaultJSONProvider
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, used for request parsing and jsonify.
+    Keeps the default provider's sorted keys and its encoding of dates and
+    other non-native types.
+    """
+    
+    _OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Pretty-printed debug output stays with the stdlib encoder
+        if self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._OPTIONS),
+            mimetype=self.mimetype)
+
+
+# Lengths used throughout the formatter. Length is an immutable int, so one
+# instance can be shared instead of constructing it per run/paragraph.
+PT_0 = Pt(0)
+PT_3 = Pt(3)
+PT_6 = Pt(6)
+PT_11 = Pt(11)
+PT_12 = Pt(12)
+PT_18 = Pt(18)
+INCH_1 = Inches(1)
+INCH_HALF = Inches(0.5)
+INCH_QUARTER = Inches(0.25)
+INCH_NEG_QUARTER = Inches(-0.25)
+
 # Serve frontend files directly from the backend for simple deployment
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Behind nginx/Apache, let the front server send downloaded files itself
+# (X-Sendfile) instead of streaming them through the worker
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+# Reject oversized request bodies before they are read
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', '100')) * 1024 * 1024
+UPLOAD_BUFFER_SIZE = 1024 * 1024
 
 CORS(app, expose_headers=["Content-Disposition"])
 db = SQLAlchemy(app)
@@ -176,16 +245,337 @@ def auth_status():
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 OUTPUT_FOLDER = os.path.join(BASE_DIR, 'outputs')
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+
+
+@lru_cache(maxsize=8)
+def _ensure_dir(path):
+    """Create a directory on first use (once per process) and return its path."""
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+    return path
+
+
+@lru_cache(maxsize=8)
+def _read_template_bytes(template_path, mtime):
+    """Read a template .docx once per (path, mtime); an edited file is re-read."""
+    with open(template_path, 'rb') as f:
+        return f.read()
+
+
+def load_template(template_path=None):
+    """
+    Open a fresh Document from a template .docx, served from an in-memory byte
+    cache. Defaults to python-docx's built-in template (what Document() loads).
+    """
+    if template_path is None:
+        template_path = docx.api._default_docx_path()
+    data = _read_template_bytes(template_path, os.path.getmtime(template_path))
+    return Document(BytesIO(data))
+
+
+# Media that is already compressed (JPEG/PNG/GIF) is stored as-is rather than
+# deflated a second time; XML parts use the fastest deflate level
+_STORED_MEDIA_EXTS = frozenset(('jpg', 'jpeg', 'png', 'gif'))
+
+
+class _FastZipPkgWriter:
+    """python-docx PhysPkgWriter that skips recompressing image media."""
+    
+    def __init__(self, pkg_file):
+        self._zipf = zipfile.ZipFile(pkg_file, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+    
+    def close(self):
+        self._zipf.close()
+    
+    def write(self, pack_uri, blob):
+        if pack_uri.ext.lower() in _STORED_MEDIA_EXTS:
+            self._zipf.writestr(pack_uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zipf.writestr(pack_uri.membername, blob)
+
+
+def save_docx(doc, pkg_file):
+    """
+    Save a python-docx Document like doc.save(), but with _FastZipPkgWriter.
+    
+    Args:
+        doc: python-docx Document
+        pkg_file: Output path or writable binary stream
+    """
+    package = doc.part.package
+    parts = list(package.parts)
+    for part in parts:
+        part.before_marshal()
+    writer = _FastZipPkgWriter(pkg_file)
+    try:
+        PackageWriter._write_content_types_stream(writer, parts)
+        PackageWriter._write_pkg_rels(writer, package.rels)
+        PackageWriter._write_parts(writer, parts)
+    finally:
+        writer.close()
+
+
+# Word COM automation (Windows only). COM objects are bound to the apartment
+# (thread) that created them and Flask serves each request on its own thread, so
+# a single worker thread owns the process-wide Word instance and every Word job
+# is queued to it. win32com is imported on first use.
+_word_executor = None
+_word_executor_lock = threading.Lock()
+_word_app = None
+
+
+def _init_word_thread():
+    import pythoncom
+    pythoncom.CoInitialize()
+
+
+def _run_on_word_thread(func, *args):
+    """
+    Run func(*args) on the Word COM thread and return its result, starting the
+    thread on first use. Jobs are executed one at a time in submission order.
+    """
+    global _word_executor
+    with _word_executor_lock:
+        if _word_executor is None:
+            _word_executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix='word-com',
+                initializer=_init_word_thread,
+            )
+        executor = _word_executor
+    return executor.submit(func, *args).result()
+
+
+def _get_word_app():
+    """
+    Return the cached Word.Application, starting Word on first use.
+    Must only be called on the Word COM thread (see _run_on_word_thread).
+    """
+    global _word_app
+    if _word_app is not None:
+        return _word_app
+    
+    import win32com.client
+    import win32com.client.gencache
+    
+    # Create Word application instance (own process, not the user's Word)
+    word = win32com.client.DispatchEx('Word.Application')
+    try:
+        # Early-bind through the makepy cache (generated on first run) so
+        # attribute access skips the IDispatch name lookups
+        word = win32com.client.gencache.EnsureDispatch(word)
+    except Exception as e:
+        logger.warning(f"Word type library unavailable, using late binding: {e}")
+    word.Visible = False  # Run in background
+    word.DisplayAlerts = False  # Suppress dialogs
+    
+    _word_app = word
+    return word
+
+
+def _discard_word_app():
+    """Quit and drop the cached Word instance (e.g. after Word crashed or was closed)."""
+    global _word_app
+    word = _word_app
+    _word_app = None
+    if word is None:
+        return
+    try:
+        word.Quit()
+    except Exception:
+        pass
+
+
+# Application settings switched off while fields are recomputed. Background
+# repagination and as-you-type proofing re-run after every field update, which
+# makes large documents scale quadratically. These are Word-wide user options,
+# so the previous values are restored after each update.
+_WORD_QUIET_OPTIONS = (
+    ('Pagination', False),
+    ('CheckSpellingAsYouType', False),
+    ('CheckGrammarAsYouType', False),
+    ('SaveInterval', 0),
+)
+
+
+def _suspend_word_background(word):
+    """Turn off screen updating, repagination and proofing; return the values to restore."""
+    saved = {}
+    try:
+        saved['ScreenUpdating'] = word.ScreenUpdating
+        word.ScreenUpdating = False
+    except Exception:
+        pass
+    for name, value in _WORD_QUIET_OPTIONS:
+        try:
+            saved[name] = getattr(word.Options, name)
+            setattr(word.Options, name, value)
+        except Exception:
+            pass
+    return saved
+
+
+def _restore_word_background(word, saved):
+    """Restore settings captured by _suspend_word_background."""
+    for name, value in saved.items():
+        try:
+            if name == 'ScreenUpdating':
+                word.ScreenUpdating = value
+            else:
+                setattr(word.Options, name, value)
+        except Exception:
+            pass
+
+
+def _close_word_thread():
+    """Quit Word and release COM; runs as the last job on the Word COM thread."""
+    import pythoncom
+    _discard_word_app()
+    pythoncom.CoUninitialize()
+
+
+@atexit.register
+def _shutdown_word_thread():
+    global _word_executor
+    with _word_executor_lock:
+        executor = _word_executor
+        _word_executor = None
+    if executor is None:
+        return
+    try:
+        executor.submit(_close_word_thread).result(timeout=30)
+    except Exception:
+        pass
+    executor.shutdown(wait=False)
+
+
+def _word_app_alive(word):
+    """Return True if the Word instance still answers COM calls."""
+    try:
+        word.Documents.Count
+        return True
+    except Exception:
+        return False
+
+
+# Whether the "Table of Figures" style exists, keyed by attached template name
+_tof_style_exists = {}
+
+
+def _update_word_fields(doc):
+    """Regenerate the TOC, LOF and LOT of an open Word document."""
+    # Only the caption/heading indexes are refreshed. The generator writes SEQ
+    # caption numbers and PAGE fields with correct cached results and emits no
+    # cross-references, so a whole-document Fields.Update is not needed.
+    # Each index update lays out the document itself to resolve page numbers.
+    
+    # Update TOC if present
+    for toc in doc.TablesOfContents:
+        toc.Update()
+    
+    # Update List of Figures and List of Tables if present
+    # Both use TablesOfFigures collection (they're all caption-based tables)
+    for caption_table in doc.TablesOfFigures:
+        caption_table.Update()
+    
+    # Format LOF and LOT entries to be plain text (not bold, not italic)
+    # The "Table of Figures" style controls these entries
+    try:
+        template_name = doc.AttachedTemplate.Name
+    except Exception:
+        template_name = None
+    if _tof_style_exists.get(template_name, True):
+        try:
+            tof_style = doc.Styles("Table of Figures")
+            tof_style.Font.Bold = False
+            tof_style.Font.Italic = False
+            _tof_style_exists[template_name] = True
+        except:
+            # Style may not exist; skip the failing lookup for later documents
+            # built on the same template
+            if template_name is not None:
+                _tof_style_exists[template_name] = False
+
+
+def update_toc_with_word_batch(doc_paths):
+    """
+    Update TOC, LOF and LOT in several Word documents using one Word session.
+    Background options are suspended once for the whole batch, and each document
+    is opened, updated, saved and closed in turn on the Word COM thread.
+    Falls back to LibreOffice when win32com is unavailable.
+    
+    Args:
+        doc_paths: Iterable of paths to Word documents
+        
+    Returns:
+        list of bool: Per-document success, in input order
+    """
+    doc_paths = list(doc_paths)
+    if not doc_paths:
+        return []
+    try:
+        import win32com.client  # noqa: F401
+        import pythoncom  # noqa: F401
+    except ImportError:
+        # No Word on this host (e.g. Linux server): try headless LibreOffice
+        logger.info("win32com not available - updating TOC/LOF/LOT with LibreOffice")
+        return [update_toc_with_libreoffice(path) for path in doc_paths]
+    try:
+        return _run_on_word_thread(_update_toc_on_word_thread, doc_paths)
+    except Exception as e:
+        logger.error(f"Failed to update TOC/LOF/LOT with Word: {str(e)}")
+        return [False] * len(doc_paths)
+
+
+def _update_toc_on_word_thread(doc_paths):
+    """Body of update_toc_with_word_batch; runs on the Word COM thread."""
+    word = _get_word_app()
+    results = []
+    saved_options = _suspend_word_background(word)
+    try:
+        for doc_path in doc_paths:
+            doc = None
+            try:
+                doc = word.Documents.Open(os.path.abspath(doc_path))
+                _update_word_fields(doc)
+                
+                # Save and close
+                doc.Save()
+                doc.Close()
+                doc = None
+                
+                logger.info(f"TOC, LOF, and LOT updated successfully in {doc_path}")
+                results.append(True)
+            except Exception as e:
+                logger.error(f"Error updating TOC/LOF/LOT in {doc_path}: {str(e)}")
+                results.append(False)
+                if doc is not None:
+                    try:
+                        doc.Close(False)  # wdDoNotSaveChanges
+                    except Exception:
+                        pass
+                if not _word_app_alive(word):
+                    # Word crashed or was closed; carry on with a fresh instance
+                    _discard_word_app()
+                    try:
+                        word = _get_word_app()
+                    except Exception as e:
+                        logger.error(f"Failed to restart Word: {str(e)}")
+                        results.extend([False] * (len(doc_paths) - len(results)))
+                        return results
+                    saved_options = _suspend_word_background(word)
+        return results
+    finally:
+        _restore_word_background(word, saved_options)
 
 
 def update_toc_with_word(doc_path):
     """
     Update Table of Contents, List of Figures, and List of Tables in a Word document 
     using Microsoft Word COM automation.
-    This opens the document in Word, updates all fields (including TOC, LOF, LOT), and saves it.
+    This opens the document in Word, regenerates the TOC, LOF and LOT, and saves it.
     Also ensures LOF and LOT entries are plain text (not bold/italic).
+    A single Word instance, owned by the Word COM thread, is reused across calls.
     
     Args:
         doc_path: Absolute path to the Word document
@@ -193,74 +583,391 @@ def update_toc_with_word(doc_path):
     Returns:
         bool: True if successful, False otherwise
     """
+    return update_toc_with_word_batch([doc_path])[0]
+
+
+_UPDATE_FIELDS_SUCCESSORS = frozenset(qn(tag) for tag in (
+    'w:hdrShapeDefaults', 'w:footnotePr', 'w:endnotePr', 'w:compat', 'w:docVars',
+    'w:rsids', 'm:mathPr', 'w:attachedSchema', 'w:themeFontLang', 'w:clrSchemeMapping',
+    'w:doNotIncludeSubdocsInStats', 'w:doNotAutoCompressPictures', 'w:forceUpgrade',
+    'w:captions', 'w:readModeInkLockDown', 'w:smartTagType', 'sl:schemaLibrary',
+    'w:shapeDefaults', 'w:doNotEmbedSmartTags', 'w:decimalSymbol', 'w:listSeparator',
+))
+
+
+def _set_update_fields_element(settings_element, enabled):
+    """Add, set or remove <w:updateFields> on a w:settings element."""
+    update_fields = settings_element.find(qn('w:updateFields'))
+    if not enabled:
+        if update_fields is not None:
+            settings_element.remove(update_fields)
+        return
+    if update_fields is None:
+        update_fields = OxmlElement('w:updateFields')
+        # Keep schema order: updateFields precedes these siblings
+        successor = next(
+            (child for child in settings_element if child.tag in _UPDATE_FIELDS_SUCCESSORS), None)
+        if successor is not None:
+            successor.addprevious(update_fields)
+        else:
+            settings_element.append(update_fields)
+    update_fields.set(qn('w:val'), 'true')
+
+
+def request_field_update_on_open(doc):
+    """
+    Ask Word to refresh all fields (TOC, LOF, LOT) when the document is next
+    opened, by setting w:updateFields in its settings part. Avoids running
+    Word on the server for the common case.
+    
+    Args:
+        doc: python-docx Document, before it is saved
+    """
+    _set_update_fields_element(doc.settings.element, True)
+
+
+def _docx_settings_xml(docx_path):
+    with zipfile.ZipFile(docx_path) as zf:
+        try:
+            return zf.read('word/settings.xml')
+        except KeyError:
+            return None
+
+
+def docx_requests_field_update(docx_path):
+    """Return True if a saved .docx has w:updateFields enabled."""
+    settings_xml = _docx_settings_xml(docx_path)
+    if settings_xml is None:
+        return False
+    update_fields = etree.fromstring(settings_xml).find(qn('w:updateFields'))
+    return update_fields is not None and update_fields.get(qn('w:val'), 'true') in ('true', '1', 'on')
+
+
+def set_docx_update_fields(docx_path, enabled=True):
+    """
+    Set or clear w:updateFields in a saved .docx, patching only word/settings.xml
+    (every other zip entry is copied through unchanged).
+    
+    Returns:
+        bool: True if the file was updated, False if it has no settings part
+    """
+    settings_xml = _docx_settings_xml(docx_path)
+    if settings_xml is None:
+        return False
+    settings = etree.fromstring(settings_xml)
+    _set_update_fields_element(settings, enabled)
+    patched = etree.tostring(settings, xml_declaration=True, encoding='UTF-8', standalone=True)
+    
+    tmp_path = docx_path + '.tmp'
+    with zipfile.ZipFile(docx_path) as src, zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = patched if info.filename == 'word/settings.xml' else src.read(info.filename)
+            dst.writestr(info, data)
+    os.replace(tmp_path, docx_path)
+    return True
+
+
+# Headless LibreOffice (cross-platform fallback for the Word TOC update, and the
+# PDF exporter on non-Windows servers). One soffice process listens on a local
+# UNO socket and is reused by every job, the same amortization as the shared
+# Word instance above. It runs on its own user profile: a second soffice started
+# on an in-use profile hands its arguments to the running one and exits.
+LIBREOFFICE_UNO_PORT = int(os.environ.get('LIBREOFFICE_UNO_PORT', '2002'))
+LIBREOFFICE_PROFILE_DIR = os.environ.get(
+    'LIBREOFFICE_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'camdocs-soffice-profile'))
+# Interpreter that drives the bridge when this one cannot import uno (a venv or
+# /usr/local Python does not see the distribution's python3-uno)
+LIBREOFFICE_PYTHON = os.environ.get('LIBREOFFICE_PYTHON', '/usr/bin/python3')
+SOFFICE_BRIDGE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'soffice_bridge.py')
+SOFFICE_JOB_TIMEOUT = 120
+_soffice_lock = threading.Lock()
+_soffice_process = None
+_soffice_desktop = None
+
+
+def _find_soffice():
+    """Return the LibreOffice executable on PATH, or None."""
+    return shutil.which('soffice') or shutil.which('libreoffice')
+
+
+@lru_cache(maxsize=1)
+def _soffice_bridge_mode():
+    """
+    Return how the UNO bridge is reached: 'inprocess' when this interpreter
+    imports uno, 'subprocess' when LIBREOFFICE_PYTHON does, or None.
+    """
     try:
-        import win32com.client
-        import pythoncom
-        
-        # Initialize COM
-        pythoncom.CoInitialize()
-        
-        # Create Word application instance
-        word = win32com.client.DispatchEx('Word.Application')
-        word.Visible = False  # Run in background
-        word.DisplayAlerts = False  # Suppress dialogs
-        
+        import uno  # noqa: F401 - only to detect the bridge
+        return 'inprocess'
+    except ImportError:
+        pass
+    if not os.path.exists(LIBREOFFICE_PYTHON):
+        return None
+    try:
+        subprocess.run([LIBREOFFICE_PYTHON, '-c', 'import uno'], check=True, timeout=30,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return 'subprocess'
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _ensure_soffice_process():
+    """Start the shared headless soffice process if it is not running. Call with _soffice_lock held."""
+    global _soffice_process
+    if _soffice_process is not None and _soffice_process.poll() is None:
+        return
+    soffice = _find_soffice()
+    if soffice is None:
+        raise RuntimeError('LibreOffice (soffice) not found on PATH')
+    profile_url = Path(os.path.abspath(LIBREOFFICE_PROFILE_DIR)).as_uri()
+    _soffice_process = subprocess.Popen(
+        [soffice, f'-env:UserInstallation={profile_url}',
+         '--headless', '--invisible', '--nologo', '--norestore',
+         '--nodefault', '--nolockcheck',
+         f'--accept=socket,host=localhost,port={LIBREOFFICE_UNO_PORT};urp;'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _get_soffice_desktop():
+    """
+    Return a UNO Desktop connected to the shared headless soffice process,
+    starting it on first use. Call with _soffice_lock held.
+    Raises ImportError when the LibreOffice Python bridge (uno) is missing.
+    """
+    global _soffice_desktop
+    import soffice_bridge
+    
+    if _soffice_desktop is not None:
         try:
-            # Open the document
-            doc = word.Documents.Open(os.path.abspath(doc_path))
-            
-            # Update all fields in the document (including TOC, LOF, LOT)
-            # wdStory = 6 (entire document)
-            word.Selection.WholeStory()
-            word.Selection.Fields.Update()
-            
-            # Also specifically update TOC if present
-            for toc in doc.TablesOfContents:
-                toc.Update()
-            
-            # Update List of Figures and List of Tables if present
-            # Both use TablesOfFigures collection (they're all caption-based tables)
-            for caption_table in doc.TablesOfFigures:
-                caption_table.Update()
-            
-            # Format LOF and LOT entries to be plain text (not bold, not italic)
-            # The "Table of Figures" style controls these entries
+            _soffice_desktop.getComponents()  # Cheap liveness check
+            return _soffice_desktop
+        except Exception:
+            _soffice_desktop = None
+    
+    _ensure_soffice_process()
+    # soffice takes a moment to open the socket
+    _soffice_desktop = soffice_bridge.connect(LIBREOFFICE_UNO_PORT)
+    return _soffice_desktop
+
+
+@atexit.register
+def _quit_soffice():
+    with _soffice_lock:
+        if _soffice_desktop is not None:
             try:
-                tof_style = doc.Styles("Table of Figures")
-                tof_style.Font.Bold = False
-                tof_style.Font.Italic = False
-            except:
-                pass  # Style may not exist
-            
-            # Save and close
-            doc.Save()
-            doc.Close()
-            
-            logger.info(f"TOC, LOF, and LOT updated successfully in {doc_path}")
+                _soffice_desktop.terminate()
+            except Exception:
+                pass
+        if _soffice_process is not None and _soffice_process.poll() is None:
+            try:
+                _soffice_process.terminate()
+            except Exception:
+                pass
+
+
+def _run_soffice_job(docx_path, update_fields=False, pdf_path=None):
+    """
+    Refresh the fields of a .docx in place and/or export it as PDF through the
+    shared soffice process, in this interpreter or via LIBREOFFICE_PYTHON.
+    
+    Returns:
+        bool: True if successful, False otherwise (including no UNO bridge)
+    """
+    mode = _soffice_bridge_mode()
+    if mode is None:
+        return False
+    
+    with _soffice_lock:
+        try:
+            if mode == 'inprocess':
+                import soffice_bridge
+                soffice_bridge.process_document(
+                    _get_soffice_desktop(), docx_path,
+                    update_fields=update_fields, pdf_path=pdf_path)
+            else:
+                _ensure_soffice_process()
+                cmd = [LIBREOFFICE_PYTHON, SOFFICE_BRIDGE_SCRIPT,
+                       str(LIBREOFFICE_UNO_PORT), os.path.abspath(docx_path)]
+                if update_fields:
+                    cmd.append('--update-fields')
+                if pdf_path:
+                    cmd += ['--pdf', os.path.abspath(pdf_path)]
+                result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        timeout=SOFFICE_JOB_TIMEOUT)
+                if result.returncode != 0:
+                    raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip()
+                                       or f'exit code {result.returncode}')
             return True
-            
         except Exception as e:
-            logger.error(f"Error updating TOC/LOF/LOT: {str(e)}")
+            logger.error(f"LibreOffice job failed for {docx_path}: {str(e)}")
             return False
-            
-        finally:
-            # Quit Word application
-            word.Quit()
-            pythoncom.CoUninitialize()
-            
-    except ImportError:
-        logger.warning("win32com not available - TOC/LOF/LOT will need manual update")
-        logger.warning("Install with: pip install pywin32")
+
+
+def update_toc_with_libreoffice(doc_path):
+    """
+    Update Table of Contents, List of Figures, and List of Tables in a Word document
+    using a persistent headless LibreOffice instance over the UNO bridge.
+    Used where Word COM automation is unavailable (non-Windows servers).
+    
+    Args:
+        doc_path: Absolute path to the Word document
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if _soffice_bridge_mode() is None:
+        logger.warning("Neither win32com nor LibreOffice's uno module is available - "
+                       "TOC/LOF/LOT will need manual update")
+        logger.warning("Install with: pip install pywin32 (Windows) or apt install python3-uno")
         return False
-    except Exception as e:
-        logger.error(f"Failed to update TOC/LOF/LOT with Word: {str(e)}")
+    
+    if not _run_soffice_job(doc_path, update_fields=True):
         return False
+    logger.info(f"TOC, LOF, and LOT updated with LibreOffice in {doc_path}")
+    return True
+
+
+def stream_scan(docx_path, tags, part='word/document.xml'):
+    """
+    Stream the elements with the given tags out of one part of a .docx with
+    lxml iterparse, without building the python-docx object tree.
+    Each element is yielded once its end tag is parsed and cleared afterwards
+    (along with earlier siblings), so memory stays flat on large documents;
+    copy anything needed before advancing.
+    
+    Pass tags that do not nest inside one another: a matching element inside
+    another match (e.g. w:pPr inside w:tbl) is cleared before the enclosing
+    element is yielded.
+    
+    Args:
+        docx_path: Path to the .docx file
+        tags: Prefixed tag names (e.g. 'w:tbl', 'a:blip') to yield
+        part: Zip entry to scan
+    """
+    with zipfile.ZipFile(docx_path) as zf, zf.open(part) as stream:
+        for _, elem in etree.iterparse(stream, events=('end',), tag=[qn(t) for t in tags]):
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
+def docx_has_images(docx_path):
+    """Return True if the document body references any embedded picture (a:blip)."""
+    for _ in stream_scan(docx_path, tags=('a:blip',)):
+        return True
+    return False
+
+
+_XP_FOOTNOTE_REFS = etree.XPath('.//w:footnoteReference', namespaces=nsmap)
+
+
+class FootnoteBatchingComposer(Composer):
+    """
+    docxcompose Composer that parses the footnote parts once per appended
+    document. The stock add_footnotes re-parses both footnotes.xml parts for
+    every body element and footnote reference and re-serializes after each
+    element, which dominates merge time on long, footnoted documents.
+    """
+    
+    def insert(self, index, doc, remove_property_fields=True):
+        self._footnotes = None
+        try:
+            super().insert(index, doc, remove_property_fields=remove_property_fields)
+        finally:
+            if self._footnotes is not None:
+                dst_part, dst_root = self._footnotes[1], self._footnotes[3]
+                dst_part._blob = serialize_part_xml(dst_root)
+            self._footnotes = None
+    
+    def add_footnotes(self, doc, element):
+        """Add footnotes from the given document used in the given element."""
+        refs = _XP_FOOTNOTE_REFS(element)
+        if not refs:
+            return
+        
+        if self._footnotes is None:
+            src_part = doc.part.rels.part_with_reltype(RT.FOOTNOTES)
+            dst_part = self.footnote_part()
+            src_by_id = {
+                footnote.get(qn('w:id')): footnote
+                for footnote in parse_xml(src_part.blob).iterfind(qn('w:footnote'))
+            }
+            dst_root = parse_xml(dst_part.blob)
+            self._footnotes = [src_part, dst_part, src_by_id, dst_root, len(dst_root) + 1]
+        src_part, dst_part, src_by_id, dst_root, next_id = self._footnotes
+        
+        for ref in refs:
+            source = src_by_id.get(ref.get(qn('w:id')))
+            if source is None:
+                continue
+            footnote = deepcopy(source)
+            footnote.set(qn('w:id'), str(next_id))
+            ref.set(qn('w:id'), str(next_id))
+            # Copy images/hyperlinks used by this footnote only
+            self.add_referenced_parts(src_part, dst_part, footnote)
+            dst_root.append(footnote)
+            next_id += 1
+        self._footnotes[4] = next_id
 
 
 # ============================================================
 # IMAGE EXTRACTION AND REINSERTION SYSTEM
 # ============================================================
 
+# Names and compiled XPaths for the image extractor's per-run loops, built once
+_W_P = qn('w:p')
+_W_TBL = qn('w:tbl')
+_W_R = qn('w:r')
+_Q_EMBED = qn('r:embed')
+_Q_EXTENT = qn('wp:extent')
+_Q_ANCHOR = qn('wp:anchor')
+_EMU_PER_INCH = 914400
+_XP_FIRST_EXTENT = etree.XPath('(.//wp:extent)[1]', namespaces=nsmap)
+_XP_FIRST_EXT = etree.XPath('(.//a:ext)[1]', namespaces=nsmap)
+_XP_BLIP = etree.XPath('.//a:blip', namespaces=nsmap)
+_XP_INLINE = etree.XPath('.//wp:inline', namespaces=nsmap)
+_XP_ANCHOR = etree.XPath('.//wp:anchor', namespaces=nsmap)
+
+@dataclass(slots=True)
+class ImageMeta:
+    """
+    One extracted picture: where it sat in the source document, its size in
+    inches and the image part holding its bytes.
+    
+    Item access (meta['width'], meta.get('caption')) is kept for callers
+    written against the earlier dict form.
+    """
+    image_id: str  # assigned by extract_all_images once the walk is done
+    position_type: str  # 'paragraph', 'table' or 'floating'
+    paragraph_index: int
+    element_index: int
+    table_location: dict
+    part: object
+    format: str
+    width: float
+    height: float
+    caption: str = None
+    caption_position: str = None
+    is_inline: bool = True
+    anchor_type: str = 'inline'
+    width_emu: int = None
+    height_emu: int = None
+    
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+    
+    def to_dict(self):
+        """Plain dict of the fields (the part is referenced, not copied)."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
 class ImageExtractor:
     """
     Extract images from Word documents with full metadata.
@@ -279,76 +986,101 @@ class ImageExtractor:
         'image/x-wmf': 'wmf',
     }
     
-    # Caption patterns (reuse existing patterns)
-    CAPTION_PATTERNS = [
-        re.compile(r'^Figure\s+\d+[\.\:\s]', re.IGNORECASE),
-        re.compile(r'^Fig\.\s*\d+[\.\:\s]', re.IGNORECASE),
-        re.compile(r'^Image\s+\d+[\.\:\s]', re.IGNORECASE),
-        re.compile(r'^Diagram\s+\d+[\.\:\s]', re.IGNORECASE),
-        re.compile(r'^Chart\s+\d+[\.\:\s]', re.IGNORECASE),
-        re.compile(r'^Graph\s+\d+[\.\:\s]', re.IGNORECASE),
-        re.compile(r'^Illustration\s+\d+[\.\:\s]', re.IGNORECASE),
-        re.compile(r'^Photo\s+\d+[\.\:\s]', re.IGNORECASE),
-        re.compile(r'^Plate\s+\d+[\.\:\s]', re.IGNORECASE),
-    ]
+    # Caption prefixes as one alternation ("Figure 1.", "Fig.2:", "Plate 3 ", ...)
+    CAPTION_RE = re.compile(
+        r'^(?:(?:Figure|Image|Diagram|Chart|Graph|Illustration|Photo|Plate)\s+|Fig\.\s*)\d+[\.\:\s]',
+        re.IGNORECASE,
+    )
+    # Every character CAPTION_RE can start with (IGNORECASE also folds the dotted/dotless I)
+    _CAPTION_FIRST = frozenset('FfIi\u0130\u0131DdCcGgPp')
     
     def __init__(self):
         self.images = []
         self.image_count = 0
         self.extracted_rIds = set()  # Track extracted image rIds to prevent duplicates
+        self._rels_cache = {}  # id(part) -> part.rels, valid for one document
+        self._image_part_cache = {}  # id(image part) -> (format, content_type)
+        self._image_runs = set()  # w:r elements that hold a picture
         
-    def extract_all_images(self, doc_path):
+    def extract_all_images(self, doc_or_path):
         """
         Extract all images from a Word document.
         
         Args:
-            doc_path: Path to the .docx file
+            doc_or_path: Path to the .docx file, or a Document the caller has
+                already opened (it is only read, never modified)
             
         Returns:
-            list: List of image metadata dictionaries
+            list: List of ImageMeta records
         """
         self.images = []
         self.image_count = 0
         self.extracted_rIds = set()  # Reset for new document
+        self._rels_cache = {}
+        self._image_part_cache = {}
+        self._image_runs = set()
         
         try:
-            doc = Document(doc_path)
+            if hasattr(doc_or_path, 'element'):
+                doc = doc_or_path
+            else:
+                # Cheap streaming pre-scan: most documents have no pictures, and
+                # those never need the full python-docx load below
+                if not docx_has_images(doc_or_path):
+                    logger.info("Extracted 0 images from document")
+                    return self.images
+                doc = Document(doc_or_path)
             
             # Track paragraph index for position mapping
             paragraph_index = 0
             element_index = 0
             
+            # Map body elements to their wrappers once (index = position in doc.tables)
+            paragraphs = doc.paragraphs
+            para_map = {para._element: para for para in paragraphs}
+            tbl_map = {table._element: (i, table) for i, table in enumerate(doc.tables)}
+            
+            # One pass over the XML finds which body elements hold pictures;
+            # only those get the run-by-run extraction below
+            body = doc.element.body
+            with_images, with_anchors, self._image_runs = self._locate_images(body)
+            
             # Process document body elements in order
-            for element in doc.element.body:
-                if element.tag.endswith('p'):
+            for element in body:
+                tag = element.tag
+                if tag == _W_P:
                     # This is a paragraph - check for inline images
-                    for para in doc.paragraphs:
-                        if para._element is element:
+                    para = para_map.get(element)
+                    if para is not None:
+                        if element in with_images:
                             images_in_para = self._extract_images_from_paragraph(
                                 para, paragraph_index, element_index
                             )
                             self.images.extend(images_in_para)
-                            paragraph_index += 1
-                            break
+                        paragraph_index += 1
                 
-                elif element.tag.endswith('tbl'):
+                elif tag == _W_TBL:
                     # This is a table - check cells for images
-                    table_index = 0
-                    for table in doc.tables:
-                        if table._element is element:
-                            images_in_table = self._extract_images_from_table(
-                                table, table_index, element_index
-                            )
-                            self.images.extend(images_in_table)
-                            break
-                        table_index += 1
+                    if element in with_images and element in tbl_map:
+                        table_index, table = tbl_map[element]
+                        images_in_table = self._extract_images_from_table(
+                            table, table_index, element_index
+                        )
+                        self.images.extend(images_in_table)
                 
                 element_index += 1
             
             # Also check for floating images (anchored drawings)
-            floating_images = self._extract_floating_images(doc)
+            floating_images = self._extract_floating_images(
+                (i, para) for i, para in enumerate(paragraphs) if para._element in with_anchors
+            )
             self.images.extend(floating_images)
             
+            # Ids follow document order: body paragraphs/tables, then floating images
+            for number, image_meta in enumerate(self.images):
+                image_meta.image_id = 'img_%04d' % number
+            self.image_count = len(self.images)
+            
             logger.info(f"Extracted {len(self.images)} images from document")
             return self.images
             
@@ -366,12 +1098,16 @@ class ImageExtractor:
             
             # Look for inline shapes (images) in the paragraph
             for run in para.runs:
+                # Text-only runs (most of them) have nothing to look up
+                if run._element not in self._image_runs:
+                    continue
+                
                 # Check if run contains inline shapes
-                drawing_elements = run._element.findall('.//' + qn('a:blip'))
+                drawing_elements = _XP_BLIP(run._element)
                 
                 for drawing in drawing_elements:
                     # Get the relationship ID (rId) for the image
-                    embed_attr = drawing.get(qn('r:embed'))
+                    embed_attr = drawing.get(_Q_EMBED)
                     if embed_attr and embed_attr not in self.extracted_rIds:
                         image_data = self._get_image_from_rId(para.part, embed_attr)
                         if image_data:
@@ -382,61 +1118,59 @@ class ImageExtractor:
                             # Detect caption
                             caption = self._detect_caption(para, para_text)
                             
-                            image_meta = {
-                                'image_id': f'img_{self.image_count:04d}',
-                                'position_type': 'paragraph',
-                                'paragraph_index': para_index,
-                                'element_index': element_index,
-                                'table_location': None,
-                                'data': image_data['bytes'],
-                                'format': image_data['format'],
-                                'width': width,
-                                'height': height,
-                                'width_emu': image_data.get('width_emu'),
-                                'height_emu': image_data.get('height_emu'),
-                                'caption': caption,
-                                'caption_position': 'below' if caption else None,
-                                'is_inline': True,
-                                'anchor_type': 'inline',
-                            }
+                            image_meta = ImageMeta(
+                                image_id=None,
+                                position_type='paragraph',
+                                paragraph_index=para_index,
+                                element_index=element_index,
+                                table_location=None,
+                                part=image_data['part'],
+                                format=image_data['format'],
+                                width=width,
+                                height=height,
+                                width_emu=image_data.get('width_emu'),
+                                height_emu=image_data.get('height_emu'),
+                                caption=caption,
+                                caption_position='below' if caption else None,
+                                is_inline=True,
+                                anchor_type='inline',
+                            )
                             images.append(image_meta)
-                            self.image_count += 1
-                            logger.info(f"Extracted image {image_meta['image_id']} at paragraph {para_index}")
+                            logger.debug("Extracted image at paragraph %d", para_index)
                 
                 # Also check for drawing elements with pictures (inside the run loop)
-                inline_shapes = run._element.findall('.//' + qn('wp:inline'))
+                inline_shapes = _XP_INLINE(run._element)
                 for inline in inline_shapes:
-                    blips = inline.findall('.//' + qn('a:blip'))
+                    blips = _XP_BLIP(inline)
                     for blip in blips:
-                        embed = blip.get(qn('r:embed'))
+                        embed = blip.get(_Q_EMBED)
                         if embed and embed not in self.extracted_rIds:
                             image_data = self._get_image_from_rId(para.part, embed)
                             if image_data:
                                 self.extracted_rIds.add(embed)  # Mark as extracted
                                 # Get dimensions
-                                extent = inline.find(qn('wp:extent'))
+                                extent = inline.find(_Q_EXTENT)
                                 width = self._emu_to_inches(int(extent.get('cx', 0))) if extent is not None else 3.0
                                 height = self._emu_to_inches(int(extent.get('cy', 0))) if extent is not None else 2.0
                                 
                                 caption = self._detect_caption(para, para_text)
                                 
-                                image_meta = {
-                                    'image_id': f'img_{self.image_count:04d}',
-                                    'position_type': 'paragraph',
-                                    'paragraph_index': para_index,
-                                    'element_index': element_index,
-                                    'table_location': None,
-                                    'data': image_data['bytes'],
-                                    'format': image_data['format'],
-                                    'width': width,
-                                    'height': height,
-                                    'caption': caption,
-                                    'caption_position': 'below' if caption else None,
-                                    'is_inline': True,
-                                    'anchor_type': 'inline',
-                                }
+                                image_meta = ImageMeta(
+                                    image_id=None,
+                                    position_type='paragraph',
+                                    paragraph_index=para_index,
+                                    element_index=element_index,
+                                    table_location=None,
+                                    part=image_data['part'],
+                                    format=image_data['format'],
+                                    width=width,
+                                    height=height,
+                                    caption=caption,
+                                    caption_position='below' if caption else None,
+                                    is_inline=True,
+                                    anchor_type='inline',
+                                )
                                 images.append(image_meta)
-                                self.image_count += 1
                             
         except Exception as e:
             logger.warning(f"Error extracting images from paragraph {para_index}: {str(e)}")
@@ -452,84 +1186,120 @@ class ImageExtractor:
                 for cell_idx, cell in enumerate(row.cells):
                     for para_idx, para in enumerate(cell.paragraphs):
                         for run in para.runs:
+                            if run._element not in self._image_runs:
+                                continue
                             # Look for embedded images
-                            blips = run._element.findall('.//' + qn('a:blip'))
+                            blips = _XP_BLIP(run._element)
                             for blip in blips:
-                                embed = blip.get(qn('r:embed'))
+                                embed = blip.get(_Q_EMBED)
                                 if embed:
                                     image_data = self._get_image_from_rId(table.part if hasattr(table, 'part') else cell.part, embed)
                                     if image_data:
                                         # Get dimensions
                                         width, height = self._get_inline_dimensions(run._element)
                                         
-                                        image_meta = {
-                                            'image_id': f'img_{self.image_count:04d}',
-                                            'position_type': 'table',
-                                            'paragraph_index': None,
-                                            'element_index': element_index,
-                                            'table_location': {
+                                        image_meta = ImageMeta(
+                                            image_id=None,
+                                            position_type='table',
+                                            paragraph_index=None,
+                                            element_index=element_index,
+                                            table_location={
                                                 'table_index': table_index,
                                                 'row_index': row_idx,
                                                 'cell_index': cell_idx,
                                                 'para_index': para_idx,
                                             },
-                                            'data': image_data['bytes'],
-                                            'format': image_data['format'],
-                                            'width': min(width, 2.0),  # Limit size for table cells
-                                            'height': min(height, 2.0),
-                                            'caption': None,
-                                            'is_inline': True,
-                                            'anchor_type': 'inline',
-                                        }
+                                            part=image_data['part'],
+                                            format=image_data['format'],
+                                            width=min(width, 2.0),  # Limit size for table cells
+                                            height=min(height, 2.0),
+                                            caption=None,
+                                            is_inline=True,
+                                            anchor_type='inline',
+                                        )
                                         images.append(image_meta)
-                                        self.image_count += 1
-                                        logger.info(f"Extracted table image {image_meta['image_id']} at table {table_index}, row {row_idx}, cell {cell_idx}")
+                                        logger.debug("Extracted table image at table %d, row %d, cell %d", table_index, row_idx, cell_idx)
         
         except Exception as e:
             logger.warning(f"Error extracting images from table {table_index}: {str(e)}")
         
         return images
     
-    def _extract_floating_images(self, doc):
-        """Extract floating/anchored images not inline with text."""
+    def _locate_images(self, body):
+        """
+        Find the top-level body elements that contain pictures, in one pass.
+        
+        Returns:
+            tuple: (set of body children holding an a:blip,
+                    subset of those where the blip sits in a wp:anchor,
+                    set of w:r elements holding an a:blip)
+        """
+        with_images = set()
+        with_anchors = set()
+        runs = set()
+        for blip in _XP_BLIP(body):
+            top = blip
+            anchored = False
+            for ancestor in blip.iterancestors():
+                if ancestor is body:
+                    break
+                tag = ancestor.tag
+                if tag == _W_R:
+                    runs.add(ancestor)
+                elif tag == _Q_ANCHOR:
+                    anchored = True
+                top = ancestor
+            with_images.add(top)
+            if anchored:
+                with_anchors.add(top)
+        return with_images, with_anchors, runs
+    
+    def _extract_floating_images(self, paragraphs):
+        """
+        Extract floating/anchored images not inline with text.
+        
+        Args:
+            paragraphs: Iterable of (body paragraph index, Paragraph) pairs to scan
+        """
         images = []
         
         try:
             # Look for anchored drawings in the document
-            for i, para in enumerate(doc.paragraphs):
+            for i, para in paragraphs:
                 for run in para.runs:
-                    anchors = run._element.findall('.//' + qn('wp:anchor'))
+                    if run._element not in self._image_runs:
+                        continue
+                    anchors = _XP_ANCHOR(run._element)
                     for anchor in anchors:
-                        blips = anchor.findall('.//' + qn('a:blip'))
+                        blips = _XP_BLIP(anchor)
                         for blip in blips:
-                            embed = blip.get(qn('r:embed'))
+                            embed = blip.get(_Q_EMBED)
                             # Skip if already extracted as inline image
                             if embed and embed not in self.extracted_rIds:
                                 image_data = self._get_image_from_rId(para.part, embed)
                                 if image_data:
                                     self.extracted_rIds.add(embed)  # Mark as extracted
                                     # Get dimensions
-                                    extent = anchor.find(qn('wp:extent'))
+                                    extent = anchor.find(_Q_EXTENT)
                                     width = self._emu_to_inches(int(extent.get('cx', 0))) if extent is not None else 3.0
                                     height = self._emu_to_inches(int(extent.get('cy', 0))) if extent is not None else 2.0
                                     
-                                    image_meta = {
-                                        'image_id': f'img_{self.image_count:04d}',
-                                        'position_type': 'floating',
-                                        'paragraph_index': i,
-                                        'element_index': i,
-                                        'table_location': None,
-                                        'data': image_data['bytes'],
-                                        'format': image_data['format'],
-                                        'width': width,
-                                        'height': height,
-                                        'caption': None,
-                                        'is_inline': False,
-                                        'anchor_type': 'floating',
-                                    }
+                                    image_meta = ImageMeta(
+                                        image_id=None,
+                                        position_type='floating',
+                                        paragraph_index=i,
+                                        element_index=i,
+                                        table_location=None,
+                                        part=image_data['part'],
+                                        format=image_data['format'],
+                                        width=width,
+                                        height=height,
+                                        caption=None,
+                                        is_inline=False,
+                                        anchor_type='floating',
+                                    )
                                     images.append(image_meta)
-                                    self.image_count += 1
-                                    logger.info(f"Extracted floating image {image_meta['image_id']}")
+                                    logger.debug("Extracted floating image at paragraph %d", i)
         
         except Exception as e:
             logger.warning(f"Error extracting floating images: {str(e)}")
@@ -537,22 +1307,29 @@ class ImageExtractor:
         return images
     
     def _get_image_from_rId(self, part, rId):
-        """Get image binary data from relationship ID."""
+        """Get the image part and format for a relationship ID."""
         try:
-            rel = part.rels.get(rId)
+            rels = self._rels_cache.get(id(part))
+            if rels is None:
+                rels = self._rels_cache[id(part)] = part.rels
+            rel = rels.get(rId)
             if rel and rel.target_part:
                 # Get the image part
                 image_part = rel.target_part
-                content_type = image_part.content_type
-                
-                # Determine format
-                img_format = self.SUPPORTED_FORMATS.get(content_type, 'png')
                 
-                # Get binary data
-                image_bytes = image_part.blob
+                # Determine format (once per part, several rIds may share it)
+                cached = self._image_part_cache.get(id(image_part))
+                if cached is None:
+                    content_type = image_part.content_type
+                    cached = self._image_part_cache[id(image_part)] = (
+                        self.SUPPORTED_FORMATS.get(content_type, 'png'), content_type
+                    )
+                img_format, content_type = cached
                 
+                # Keep a reference to the part; the bytes are only read when
+                # the image is actually inserted
                 return {
-                    'bytes': image_bytes,
+                    'part': image_part,
                     'format': img_format,
                     'content_type': content_type,
                 }
@@ -565,17 +1342,17 @@ class ImageExtractor:
         """Get dimensions from inline shape element."""
         try:
             # Try to find extent element
-            extent = run_element.find('.//' + qn('wp:extent'))
-            if extent is not None:
-                cx = int(extent.get('cx', 0))
-                cy = int(extent.get('cy', 0))
+            extent = _XP_FIRST_EXTENT(run_element)
+            if extent:
+                cx = int(extent[0].get('cx', 0))
+                cy = int(extent[0].get('cy', 0))
                 return self._emu_to_inches(cx), self._emu_to_inches(cy)
             
             # Try to find a:ext element
-            ext = run_element.find('.//' + qn('a:ext'))
-            if ext is not None:
-                cx = int(ext.get('cx', 0))
-                cy = int(ext.get('cy', 0))
+            ext = _XP_FIRST_EXT(run_element)
+            if ext:
+                cx = int(ext[0].get('cx', 0))
+                cy = int(ext[0].get('cy', 0))
                 return self._emu_to_inches(cx), self._emu_to_inches(cy)
                 
         except Exception as e:
@@ -584,22 +1361,17 @@ class ImageExtractor:
         # Default dimensions
         return 4.0, 3.0
     
-    def _emu_to_inches(self, emu):
-        """Convert EMU (English Metric Units) to inches."""
-        # 914400 EMU = 1 inch
-        if emu <= 0:
-            return 3.0  # Default
-        return emu / 914400
+    @staticmethod
+    def _emu_to_inches(emu):
+        """Convert EMU (English Metric Units) to inches, 3.0 for a missing size."""
+        return emu / _EMU_PER_INCH if emu > 0 else 3.0
     
     def _detect_caption(self, para, para_text):
         """Detect if paragraph text is a figure caption."""
-        if not para_text:
+        if not para_text or para_text[0] not in self._CAPTION_FIRST:
             return None
-        
-        for pattern in self.CAPTION_PATTERNS:
-            if pattern.match(para_text):
-                return para_text
-        
+        if self.CAPTION_RE.match(para_text):
+            return para_text
         return None
     
     def get_images_by_position(self):
@@ -607,13 +1379,13 @@ class ImageExtractor:
         position_map = {}
         
         for img in self.images:
-            if img['position_type'] == 'paragraph':
-                key = ('paragraph', img['paragraph_index'])
-            elif img['position_type'] == 'table':
-                loc = img['table_location']
+            if img.position_type == 'paragraph':
+                key = ('paragraph', img.paragraph_index)
+            elif img.position_type == 'table':
+                loc = img.table_location
                 key = ('table', loc['table_index'], loc['row_index'], loc['cell_index'])
             else:
-                key = ('floating', img['element_index'])
+                key = ('floating', img.element_index)
             
             if key not in position_map:
                 position_map[key] = []
@@ -637,7 +1409,32 @@ class ImageInserter:
         """
         self.doc = doc
         self.images = images
-        self.image_lookup = {img['image_id']: img for img in images}
+        self.image_lookup = {img.image_id: img for img in images}
+        self._sizes = {}  # image_id -> clamped (width, height) in inches
+    
+    def _clamped_size(self, img_data):
+        """Image size limited to 6x8 inches, aspect ratio kept; computed once per image."""
+        size = self._sizes.get(img_data.image_id)
+        if size is None:
+            width = img_data.width
+            height = img_data.height
+            
+            # Limit maximum dimensions
+            max_width = 6.0  # Max 6 inches wide
+            max_height = 8.0  # Max 8 inches tall
+            
+            if width > max_width:
+                ratio = max_width / width
+                width = max_width
+                height = height * ratio
+            
+            if height > max_height:
+                ratio = max_height / height
+                height = max_height
+                width = width * ratio
+            
+            size = self._sizes[img_data.image_id] = (width, height)
+        return size
         
     def insert_image(self, image_id, after_paragraph=None):
         """
@@ -665,40 +1462,25 @@ class ImageInserter:
             run = para.add_run()
             
             # Create BytesIO stream from image data
-            image_stream = BytesIO(img_data['data'])
+            image_stream = BytesIO(img_data.part.blob)
             
             # Determine width and height
-            width = img_data.get('width', 4.0)
-            height = img_data.get('height', 3.0)
-            
-            # Limit maximum dimensions
-            max_width = 6.0  # Max 6 inches wide
-            max_height = 8.0  # Max 8 inches tall
-            
-            if width > max_width:
-                ratio = max_width / width
-                width = max_width
-                height = height * ratio
-            
-            if height > max_height:
-                ratio = max_height / height
-                height = max_height
-                width = width * ratio
+            width, height = self._clamped_size(img_data)
             
             # Add picture
             run.add_picture(image_stream, width=Inches(width), height=Inches(height))
             
             # Add caption if exists
-            if img_data.get('caption'):
+            if img_data.caption:
                 caption_para = self.doc.add_paragraph()
-                caption_run = caption_para.add_run(img_data['caption'])
+                caption_run = caption_para.add_run(img_data.caption)
                 caption_run.italic = True
                 caption_run.font.name = 'Times New Roman'
                 caption_run.font.size = Pt(10)
                 caption_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                caption_para.paragraph_format.space_after = Pt(12)
+                caption_para.paragraph_format.space_after = PT_12
             
-            logger.info(f"Inserted image {image_id} ({width:.2f}x{height:.2f} inches)")
+            logger.debug("Inserted image %s (%.2fx%.2f inches)", image_id, width, height)
             return para
             
         except Exception as e:
@@ -729,15 +1511,15 @@ class ImageInserter:
             para.alignment = WD_ALIGN_PARAGRAPH.CENTER
             
             run = para.add_run()
-            image_stream = BytesIO(img_data['data'])
+            image_stream = BytesIO(img_data.part.blob)
             
             # Use smaller dimensions for table cells
-            width = min(img_data.get('width', 2.0), 2.0)
-            height = min(img_data.get('height', 1.5), 1.5)
+            width = min(img_data.width, 2.0)
+            height = min(img_data.height, 1.5)
             
             run.add_picture(image_stream, width=Inches(width), height=Inches(height))
             
-            logger.info(f"Inserted image {image_id} in table cell")
+            logger.debug("Inserted image %s in table cell", image_id)
             
         except Exception as e:
             logger.error(f"Error inserting table image {image_id}: {str(e)}")
@@ -768,6 +1550,10 @@ hierarchical_pairs = {
     'PRINCIPLE': ['RULE', 'GUIDELINE', 'STANDARD'],
 }
 
+# Numbered heading lines: "3.6 WEEK TWO" -> ('3.6', 'WEEK TWO')
+_NUM_HEAD_RE = re.compile(r'^(\d+(?:\.\d+)*)\s+(.*)$')
+
+
 class HierarchyCorrector:
     """Detect and correct hierarchical numbering issues in heading lines."""
     
@@ -791,72 +1577,93 @@ class HierarchyCorrector:
         'PRINCIPLE': ['RULE', 'GUIDELINE', 'STANDARD'],
     }
 
-    def __init__(self):
-        self.patterns = [
-            # Pattern A: Sequential Major/Minor Topics (Placeholder for specific logic)
-            # (re.compile(r'(?i)^\s*(\d+(?:\.\d+)*)\s+([A-Z\s]{2,})(?:\s+|$)\n^\s*(\d+(?:\.\d+)*)\s+([A-Z\s]{2,})(?:\s+|$)', re.MULTILINE),
-            #  lambda m: m.group(0)), 
-
-            # Pattern B: Temporal/Categorical Relationships
-            (re.compile(r'(?i)(\d+(?:\.\d+)*)\s+(WEEK|MONTH|YEAR|QUARTER|TERM|SEMESTER)\s+([A-Z\d]+)(?:\s+|$)\n(\d+(?:\.\d+)*)\s+(DAY|SESSION|CLASS|PERIOD|LECTURE)\s+([A-Z\d]+)(?:\s+|$)', re.MULTILINE),
-             lambda m: f"{m.group(1)} {m.group(2)} {m.group(3)}\n{m.group(1)}.1 {m.group(5)} {m.group(6)}"),
-
-            # Pattern D: Week/Day Pattern
-            (re.compile(r'(?i)^(\d+\.\d+)\s+WEEK\s+([A-Z\d]+).*?\n^(\d+\.\d+)\s+DAY\s+([A-Z\d]+)', re.MULTILINE),
-             lambda m: f"{m.group(1)} WEEK {m.group(2)}\n{m.group(1)}.1 DAY {m.group(4)}"),
-
-            # Pattern E: Unit/Lesson Pattern
-            (re.compile(r'(?i)^(\d+\.\d+)\s+UNIT\s+([A-Z\d]+).*?\n^(\d+\.\d+)\s+LESSON\s+([A-Z\d]+)', re.MULTILINE),
-             lambda m: f"{m.group(1)} UNIT {m.group(2)}\n{m.group(1)}.1 LESSON {m.group(4)}"),
-             
-            # Pattern F: Chapter/Section Pattern
-            (re.compile(r'(?i)^(\d+\.\d+)\s+CHAPTER\s+([A-Z\d]+).*?\n^(\d+\.\d+)\s+SECTION\s+([A-Z\d]+)', re.MULTILINE),
-             lambda m: f"{m.group(1)} CHAPTER {m.group(2)}\n{m.group(1)}.1 SECTION {m.group(4)}"),
-
-            # Pattern G: Module/Topic Pattern
-            (re.compile(r'(?i)^(\d+\.\d+)\s+MODULE\s+([A-Z\d]+).*?\n^(\d+\.\d+)\s+TOPIC\s+([A-Z\d]+)', re.MULTILINE),
-             lambda m: f"{m.group(1)} MODULE {m.group(2)}\n{m.group(1)}.1 TOPIC {m.group(4)}"),
-
-            # Pattern H: Lettered Hierarchies
-            (re.compile(r'(?i)^(\d+\.\d+)\s+((?:PART\s+)?[A-Z])\b.*?\n^(\d+\.\d+)\s+(\d+[\.\)]?)\s+(.*)', re.MULTILINE),
-             lambda m: f"{m.group(1)} {m.group(2)}\n{m.group(1)}.1 {m.group(4)} {m.group(5)}"),
+    # One scan finds every parent keyword in a title (lookahead, so overlapping
+    # keywords are all reported); each parent's children are one alternation
+    _PARENT_SCAN = re.compile(
+        '(?=(' + '|'.join(sorted(HIERARCHICAL_PAIRS, key=len, reverse=True)) + '))'
+    )
+    _CHILD_SEARCH = {
+        parent: re.compile('|'.join(children))
+        for parent, children in HIERARCHICAL_PAIRS.items()
+    }
 
-            # Pattern J: Short Title Followed by Specific Title
-            (re.compile(r'^(\d+\.\d+)\s+([A-Z]{2,15})\s*$\n^(\d+\.\d+)\s+([A-Z].{10,})', re.MULTILINE),
-             lambda m: f"{m.group(1)} {m.group(2)}\n{m.group(1)}.1 {m.group(4)}"),
+    # Rewrites applied in order by correct(); each pass sees the previous output,
+    # so they are kept as separate passes. Compiled once for all instances.
+    PATTERNS = (
+        # Pattern A: Sequential Major/Minor Topics (Placeholder for specific logic)
+        # (re.compile(r'(?i)^\s*(\d+(?:\.\d+)*)\s+([A-Z\s]{2,})(?:\s+|$)\n^\s*(\d+(?:\.\d+)*)\s+([A-Z\s]{2,})(?:\s+|$)', re.MULTILINE),
+        #  lambda m: m.group(0)), 
+
+        # Pattern B: Temporal/Categorical Relationships
+        (re.compile(r'(?i)(\d+(?:\.\d+)*)\s+(WEEK|MONTH|YEAR|QUARTER|TERM|SEMESTER)\s+([A-Z\d]+)(?:\s+|$)\n(\d+(?:\.\d+)*)\s+(DAY|SESSION|CLASS|PERIOD|LECTURE)\s+([A-Z\d]+)(?:\s+|$)', re.MULTILINE),
+         lambda m: f"{m.group(1)} {m.group(2)} {m.group(3)}\n{m.group(1)}.1 {m.group(5)} {m.group(6)}"),
+
+        # Pattern D: Week/Day Pattern
+        (re.compile(r'(?i)^(\d+\.\d+)\s+WEEK\s+([A-Z\d]+).*?\n^(\d+\.\d+)\s+DAY\s+([A-Z\d]+)', re.MULTILINE),
+         lambda m: f"{m.group(1)} WEEK {m.group(2)}\n{m.group(1)}.1 DAY {m.group(4)}"),
+
+        # Pattern E: Unit/Lesson Pattern
+        (re.compile(r'(?i)^(\d+\.\d+)\s+UNIT\s+([A-Z\d]+).*?\n^(\d+\.\d+)\s+LESSON\s+([A-Z\d]+)', re.MULTILINE),
+         lambda m: f"{m.group(1)} UNIT {m.group(2)}\n{m.group(1)}.1 LESSON {m.group(4)}"),
+         
+        # Pattern F: Chapter/Section Pattern
+        (re.compile(r'(?i)^(\d+\.\d+)\s+CHAPTER\s+([A-Z\d]+).*?\n^(\d+\.\d+)\s+SECTION\s+([A-Z\d]+)', re.MULTILINE),
+         lambda m: f"{m.group(1)} CHAPTER {m.group(2)}\n{m.group(1)}.1 SECTION {m.group(4)}"),
+
+        # Pattern G: Module/Topic Pattern
+        (re.compile(r'(?i)^(\d+\.\d+)\s+MODULE\s+([A-Z\d]+).*?\n^(\d+\.\d+)\s+TOPIC\s+([A-Z\d]+)', re.MULTILINE),
+         lambda m: f"{m.group(1)} MODULE {m.group(2)}\n{m.group(1)}.1 TOPIC {m.group(4)}"),
+
+        # Pattern H: Lettered Hierarchies
+        (re.compile(r'(?i)^(\d+\.\d+)\s+((?:PART\s+)?[A-Z])\b.*?\n^(\d+\.\d+)\s+(\d+[\.\)]?)\s+(.*)', re.MULTILINE),
+         lambda m: f"{m.group(1)} {m.group(2)}\n{m.group(1)}.1 {m.group(4)} {m.group(5)}"),
+
+        # Pattern J: Short Title Followed by Specific Title
+        (re.compile(r'^(\d+\.\d+)\s+([A-Z]{2,15})\s*$\n^(\d+\.\d+)\s+([A-Z].{10,})', re.MULTILINE),
+         lambda m: f"{m.group(1)} {m.group(2)}\n{m.group(1)}.1 {m.group(4)}"),
+
+        # Pattern K: Category/Subcategory Pattern
+        (re.compile(r'(?i)^(\d+\.\d+)\s+(TYPES|CATEGORIES|CLASSIFICATIONS|FORMS|MODELS).*?\n^(\d+\.\d+)\s+((?:.*?MODEL|.*?TYPE|.*?FORM).*)', re.MULTILINE),
+         lambda m: f"{m.group(1)} {m.group(2)}\n{m.group(1)}.1 {m.group(4)}"), # Simplified replacement
+
+        # Pattern Parent/Child with same starting words (Pattern L/M/N combined logic)
+        (re.compile(r'^(\d+\.\d+)\s+(.*?\b\w+\b).*?\n^(\d+\.\d+)\s+\2.*?', re.MULTILINE),
+         lambda m: f"{m.group(1)} {m.group(2)}\n{m.group(1)}.1 {m.group(2)}"),
+         
+         # Pattern R: Convert Flat to Hierarchical (Generic)
+        (re.compile(r'(?i)^(\d+\.\d+)\s+(WEEK|UNIT|MODULE|CHAPTER|PART)\s+([A-Z\d]+)(?:\s+|$)\n^(\d+\.\d+)\s+(DAY|LESSON|TOPIC|SECTION|SESSION)\s+([A-Z\d]+)(?:\s+|$)', re.MULTILINE),
+         lambda m: f"{m.group(1)} {m.group(2)} {m.group(3)}\n{m.group(1)}.1 {m.group(5)} {m.group(6)}"),
+    )
 
-            # Pattern K: Category/Subcategory Pattern
-            (re.compile(r'(?i)^(\d+\.\d+)\s+(TYPES|CATEGORIES|CLASSIFICATIONS|FORMS|MODELS).*?\n^(\d+\.\d+)\s+((?:.*?MODEL|.*?TYPE|.*?FORM).*)', re.MULTILINE),
-             lambda m: f"{m.group(1)} {m.group(2)}\n{m.group(1)}.1 {m.group(4)}"), # Simplified replacement
+    def __init__(self):
+        self.patterns = self.PATTERNS
 
-            # Pattern Parent/Child with same starting words (Pattern L/M/N combined logic)
-            (re.compile(r'^(\d+\.\d+)\s+(.*?\b\w+\b).*?\n^(\d+\.\d+)\s+\2.*?', re.MULTILINE),
-             lambda m: f"{m.group(1)} {m.group(2)}\n{m.group(1)}.1 {m.group(2)}"),
-             
-             # Pattern R: Convert Flat to Hierarchical (Generic)
-            (re.compile(r'(?i)^(\d+\.\d+)\s+(WEEK|UNIT|MODULE|CHAPTER|PART)\s+([A-Z\d]+)(?:\s+|$)\n^(\d+\.\d+)\s+(DAY|LESSON|TOPIC|SECTION|SESSION)\s+([A-Z\d]+)(?:\s+|$)', re.MULTILINE),
-             lambda m: f"{m.group(1)} {m.group(2)} {m.group(3)}\n{m.group(1)}.1 {m.group(5)} {m.group(6)}"),
-        ]
+    # Every rewrite pattern spans a line break followed by a numbered line
+    _PAIR_HINT = re.compile(r'\n\d')
 
     def correct(self, text):
         corrected = text
+        if not self._PAIR_HINT.search(corrected):
+            return corrected
         for pattern, repl in self.patterns:
             corrected = pattern.sub(repl, corrected)
         return corrected
 
     def is_hierarchical_pair(self, parent, child):
-        parent_upper = parent.upper()
-        child_upper = child.upper()
-        
+        return self._is_hierarchical_pair(parent.upper(), child.upper())
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _is_hierarchical_pair(parent_upper, child_upper):
+        # Heading titles repeat across a document, so results are cached per pair
         # Check dictionary
-        for p, children in self.HIERARCHICAL_PAIRS.items():
-            if p in parent_upper:
-                for c in children:
-                    if c in child_upper:
-                        return True
+        child_search = HierarchyCorrector._CHILD_SEARCH
+        for p in {m.group(1) for m in HierarchyCorrector._PARENT_SCAN.finditer(parent_upper)}:
+            if child_search[p].search(child_upper):
+                return True
         
         # Check general/specific (short parent, long child)
-        if len(parent.split()) < 4 and len(child.split()) > 3:
+        if len(parent_upper.split()) < 4 and len(child_upper.split()) > 3:
             common_words = set(parent_upper.split()) & set(child_upper.split())
             if len(common_words) > 0:
                 return True
@@ -868,25 +1675,33 @@ class HierarchyCorrector:
         Correct hierarchical numbering issues in a list of heading lines.
         Implements the logic from 'correct_hierarchical_numbering' and 'smart_hierarchy_correction'.
         """
-        corrected_lines = []
+        return list(self.iter_corrected(lines))
+    
+    def iter_corrected(self, lines):
+        """
+        Yield the lines of correct_lines(lines) one at a time, so a caller can
+        classify them in the same pass. Each line is matched once, as "next"
+        and then reused as "current".
+        """
+        count = len(lines)
+        match = _NUM_HEAD_RE.match
+        m2 = match(lines[0]) if count else None
         i = 0
-        while i < len(lines):
+        while i < count:
             current_line = lines[i]
+            m1 = m2
+            m2 = match(lines[i + 1]) if i + 1 < count else None
             
             # Skip if not a numbered heading (simple check)
-            m1 = re.match(r'^(\d+(?:\.\d+)*)\s+(.*)$', current_line)
             if not m1:
-                corrected_lines.append(current_line)
+                yield current_line
                 i += 1
                 continue
                 
-            if i == len(lines) - 1:
-                corrected_lines.append(current_line)
+            if i == count - 1:
+                yield current_line
                 break
                 
-            next_line = lines[i+1]
-            m2 = re.match(r'^(\d+(?:\.\d+)*)\s+(.*)$', next_line)
-            
             if m2:
                 current_num, current_title = m1.group(1), m1.group(2)
                 next_num, next_title = m2.group(1), m2.group(2)
@@ -895,18 +1710,118 @@ class HierarchyCorrector:
                     # Convert to hierarchical
                     # If parent is 3.6, child becomes 3.6.1
                     child_num = f"{current_num}.1"
-                    corrected_lines.append(current_line)
-                    corrected_lines.append(f"{child_num} {next_title}")
+                    yield current_line
+                    yield f"{child_num} {next_title}"
                     i += 2  # Skip next line
+                    m2 = match(lines[i]) if i < count else None
                     continue
             
-            corrected_lines.append(current_line)
+            yield current_line
             i += 1
-            
-        return corrected_lines
 
 # --- End Hierarchy Correction Utility ---
 
+# Heading-numbering patterns, compiled once instead of per call
+_MD_PREFIX_RE = re.compile(r'^#+\s*')  # Markdown heading markers
+_MD_LEVEL_RE = re.compile(r'^(#+)\s*')
+# Existing numbers (group 1, dropped) or a punctuation character (becomes a space)
+_NUM_OR_PUNCT_RE = re.compile(r'([\d\.]+\s*)|[^\w\s]')
+# Existing heading numbers: "1.2 Title", "1.2.3 Title" or appendix "A.1 Title"
+# (the two forms start with a digit and a capital, so one alternation covers both)
+_EXISTING_NUM_RE = re.compile(r'^(?:(?:\d+\.)+\d+|[A-Z]\.(?:\d+\.)*\d+)\s+')
+_EXISTING_NUM_TITLE_RE = re.compile(r'^((?:\d+\.)+\d+|[A-Z]\.(?:\d+\.)*\d+)\s+(.+)$')
+# Whatever follows the leading 'CHAPTER': a word/Roman numeral or a digit run.
+_CHAPTER_TAIL_RE = re.compile(r'\s+(?:([A-Z]+)\b|(\d+))')
+
+# Roman numeral to integer mapping
+_ROMAN_TO_INT = {
+    'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5,
+    'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10,
+    'XI': 11, 'XII': 12, 'XIII': 13, 'XIV': 14, 'XV': 15
+}
+
+# Word to integer mapping
+_WORD_TO_INT = {
+    'ONE': 1, 'TWO': 2, 'THREE': 3, 'FOUR': 4, 'FIVE': 5,
+    'SIX': 6, 'SEVEN': 7, 'EIGHT': 8, 'NINE': 9, 'TEN': 10,
+    'ELEVEN': 11, 'TWELVE': 12, 'THIRTEEN': 13, 'FOURTEEN': 14, 'FIFTEEN': 15
+}
+
+# Everything that may follow 'CHAPTER' as a word, resolved in one lookup
+_CHAPTER_WORDS = {**_WORD_TO_INT, **_ROMAN_TO_INT}
+# Lines treated as headings: '#' markers, ALL CAPS lines of at most 60
+# characters, or numbered starts like "1.2 Background" / "3. Methods"
+_HEADING_LINE_RE = re.compile(r'#|[A-Z][A-Z\s]{1,59}$|(?:\d+\.)+\d*\s+[A-Z]')
+# Characters a _HEADING_LINE_RE match can start with, besides any decimal digit
+_HEADING_FIRST_CHARS = frozenset('#ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+
+def _number_or_punct_repl(match):
+    return '' if match.group(1) is not None else ' '
+
+
+def _split_md_prefix(text):
+    """Return (markdown heading level, text without the '#' markers, stripped)."""
+    match = _MD_LEVEL_RE.match(text)
+    if match is None:
+        return 0, text.strip()
+    return len(match.group(1)), text[match.end():].strip()
+
+
+def _compile_keyword_finder(keywords):
+    """
+    Build a function returning the set of ``keywords`` that occur in a string.
+    One regex scan gives the same answer as testing ``keyword in text`` for
+    each keyword.
+    """
+    keywords = list(keywords)
+    scan = re.compile(
+        '(?=(' + '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + '))'
+    )
+    # The lookahead reports the longest keyword starting at each position;
+    # shorter keywords that are prefixes of it occur there too
+    prefixes = {k: frozenset(p for p in keywords if k.startswith(p)) for k in keywords}
+    
+    def find(text):
+        found = set()
+        for match in scan.finditer(text):
+            found |= prefixes[match.group(1)]
+        return found
+    
+    return find
+
+
+@lru_cache(maxsize=8192)
+def _normalize_heading(text):
+    """
+    Normalized form of a heading used for comparisons. Cached: number_heading
+    normalizes the same heading several times, and headings repeat.
+    """
+    clean = _MD_PREFIX_RE.sub('', text).strip().lower()
+    clean = clean.replace('**', '')  # Remove markdown bold
+    # Remove existing numbers and punctuation in one pass
+    clean = _NUM_OR_PUNCT_RE.sub(_number_or_punct_repl, clean)
+    return ' '.join(clean.split())  # Normalize whitespace
+
+
+# Lower-case characters re.IGNORECASE matches against ASCII 'i' and 's'
+_IGNORECASE_FOLD = str.maketrans({'\u0131': 'i', '\u017f': 's'})
+
+
+def _compile_child_index(parent_child, find_parents):
+    """
+    Map each parent key to one regex over the children of every parent keyword
+    found in that key, i.e. what _is_child_of_parent would test for it.
+    """
+    index = {}
+    for key in parent_child:
+        children = [child for parent in find_parents(_normalize_heading(key))
+                    for child in parent_child[parent]]
+        if children:
+            index[key] = re.compile('|'.join(re.escape(child) for child in children))
+    return index
+
+
 class HeadingNumberer:
     """
     Auto-number headings based on chapter context with semantic hierarchy detection.
@@ -925,38 +1840,29 @@ class HeadingNumberer:
     - "Specific Research Objectives" → "1.4.2 Specific Research Objectives"
     """
     
-    # Roman numeral to integer mapping
-    ROMAN_TO_INT = {
-        'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5,
-        'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10,
-        'XI': 11, 'XII': 12, 'XIII': 13, 'XIV': 14, 'XV': 15
-    }
-    
-    # Word to integer mapping
-    WORD_TO_INT = {
-        'ONE': 1, 'TWO': 2, 'THREE': 3, 'FOUR': 4, 'FIVE': 5,
-        'SIX': 6, 'SEVEN': 7, 'EIGHT': 8, 'NINE': 9, 'TEN': 10,
-        'ELEVEN': 11, 'TWELVE': 12, 'THIRTEEN': 13, 'FOURTEEN': 14, 'FIFTEEN': 15
-    }
+    # Chapter number tables (defined at module level)
+    ROMAN_TO_INT = _ROMAN_TO_INT
+    WORD_TO_INT = _WORD_TO_INT
+    CHAPTER_WORDS = _CHAPTER_WORDS
     
     # Front matter sections that should NOT be numbered
-    UNNUMBERED_SECTIONS = {
+    UNNUMBERED_SECTIONS = frozenset({
         'DECLARATION', 'CERTIFICATION', 'DEDICATION', 'ACKNOWLEDGEMENTS',
         'ACKNOWLEDGMENTS', 'ACKNOWLEDGEMENT', 'ABSTRACT', 'RESUME', 'RÉSUMÉ',
         'TABLE OF CONTENTS', 'CONTENTS', 'LIST OF TABLES', 'LIST OF FIGURES',
         'LIST OF ABBREVIATIONS', 'ABBREVIATIONS', 'GLOSSARY', 'REFERENCES',
         'BIBLIOGRAPHY', 'APPENDIX', 'APPENDICES', 'INDEX', 'PREFACE', 'FOREWORD'
-    }
+    })
     
     # Section titles that are typically ALL CAPS and follow chapter headings (not numbered)
-    CHAPTER_TITLE_SECTIONS = {
+    CHAPTER_TITLE_SECTIONS = frozenset({
         'GENERAL INTRODUCTION', 'INTRODUCTION', 'REVIEW OF RELATED LITERATURE',
         'LITERATURE REVIEW', 'RESEARCH METHODOLOGY', 'METHODOLOGY',
         'DATA ANALYSIS AND INTERPRETATION', 'DATA ANALYSIS', 'FINDINGS AND DISCUSSION',
         'DISCUSSION', 'SUMMARY CONCLUSION AND RECOMMENDATIONS', 'SUMMARY AND CONCLUSION',
         'CONCLUSION', 'RECOMMENDATIONS', 'PRESENTATION OF FINDINGS',
         'RESULTS AND DISCUSSION', 'ANALYSIS AND FINDINGS'
-    }
+    })
     
     # Parent sections and their expected children (for semantic hierarchy detection)
     # Format: 'parent_keyword': ['child_keyword1', 'child_keyword2', ...]
@@ -1010,6 +1916,17 @@ class HeadingNumberer:
         r'^note\s*:?\s*$',  # "Note:"
         r'^example\s*:?\s*$',  # "Example:"
     ]
+    # Leading words the anchored indicators above can start with; anything else
+    # can only match the "... can be expressed as" pattern
+    SUBSECTION_FIRST_WORDS = frozenset({
+        'main', 'specific', 'general', 'primary', 'secondary', 'null',
+        'alternative', 'where', 'note', 'example',
+    })
+    # All indicators as one alternation. IGNORECASE stays: the text is already
+    # lower case, but the flag also folds dotless i and long s into i and s.
+    _SUBSECTION_INDICATOR_RE = re.compile(
+        '|'.join('(?:%s)' % pattern for pattern in SUBSECTION_INDICATORS), re.IGNORECASE
+    )
     
     # Patterns that indicate this is a definition term (should be under definitions section)
     DEFINITION_TERMS = [
@@ -1022,6 +1939,46 @@ class HeadingNumberer:
         'community funding', 'private funding', 'government funding',
     ]
     
+    # Full section titles that start a NEW main section (never a subsection),
+    # matched anywhere in the normalized heading
+    MAIN_SECTION_KEYWORDS = frozenset({
+        'chapter summary', 'summary of the chapter', 'conclusion of the chapter',
+        'delimitation of the study', 'limitations of the study', 'delimitations',
+        'significance of the study', 'scope of the study', 'organization of the study',
+        'structure of the study', 'structure of the thesis', 'structure of the dissertation',
+        'statement of the problem', 'problem statement',
+        'conceptual review', 'conceptual framework',
+        'theoretical review', 'theoretical framework',
+        'empirical review', 'empirical studies', 'review of empirical',
+        'research design', 'research methodology', 'methodology',
+        'data presentation', 'data analysis and interpretation',
+        'summary conclusion and recommendation', 'summary and conclusion',
+        'recommendations for further', 'recommendations',
+    })
+    
+    # First characters of every heading the chapter/appendix/unnumbered checks accept
+    _SPECIAL_FIRST_CHARS = frozenset(
+        title[0] for title in UNNUMBERED_SECTIONS | CHAPTER_TITLE_SECTIONS | {'CHAPTER', 'APPENDIX'}
+    )
+    
+    # Keyword lookups compiled from the tables above: one scan per heading
+    # instead of a substring test per keyword
+    _find_parent_keys = staticmethod(_compile_keyword_finder(PARENT_CHILD_PATTERNS))
+    _PARENT_ORDER = {key: i for i, key in enumerate(PARENT_CHILD_PATTERNS)}
+    _CHILD_SEARCH = {
+        key: re.compile('|'.join(re.escape(child) for child in children))
+        for key, children in PARENT_CHILD_PATTERNS.items()
+    }
+    # in_parent_section always holds a parent key, so the common lookup is O(1)
+    _CHILD_INDEX = _compile_child_index(PARENT_CHILD_PATTERNS, _find_parent_keys.__func__)
+    _MAIN_SECTION_RE = re.compile('|'.join(re.escape(k) for k in MAIN_SECTION_KEYWORDS))
+    _find_definition_terms = staticmethod(_compile_keyword_finder(DEFINITION_TERMS))
+    # Every substring of every definition term, for the "text in term" check
+    _DEFINITION_SUBSTRINGS = frozenset(
+        term[i:j] for term in DEFINITION_TERMS
+        for i in range(len(term) + 1) for j in range(i, len(term) + 1)
+    )
+    
     def __init__(self):
         self.reset()
         self.hierarchy_corrector = HierarchyCorrector()
@@ -1042,50 +1999,52 @@ class HeadingNumberer:
         
     def _normalize_text(self, text):
         """Normalize text for comparison (lowercase, remove punctuation, extra spaces)."""
-        clean = re.sub(r'^#+\s*', '', text).strip().lower()
-        clean = re.sub(r'\*\*', '', clean)  # Remove markdown bold
-        clean = re.sub(r'[\d\.]+\s*', '', clean)  # Remove existing numbers
-        clean = re.sub(r'[^\w\s]', ' ', clean)  # Remove punctuation
-        clean = re.sub(r'\s+', ' ', clean).strip()  # Normalize whitespace
-        return clean
+        return _normalize_heading(text)
     
-    def _is_child_of_parent(self, heading_text, parent_text):
+    def _is_child_of_parent(self, heading_text, parent_text, heading_norm=None):
         """
         Check if heading_text should be a child of parent_text based on semantic patterns.
         
         Returns:
             bool: True if heading should be a subsection of parent
         """
-        heading_norm = self._normalize_text(heading_text)
+        if heading_norm is None:
+            heading_norm = self._normalize_text(heading_text)
+        
+        child_re = self._CHILD_INDEX.get(parent_text)
+        if child_re is not None:
+            return child_re.search(heading_norm) is not None
+        
         parent_norm = self._normalize_text(parent_text)
         
         # Check predefined parent-child patterns
-        for parent_key, children in self.PARENT_CHILD_PATTERNS.items():
-            if parent_key in parent_norm:
-                for child_pattern in children:
-                    if child_pattern in heading_norm:
-                        return True
+        for parent_key in self._find_parent_keys(parent_norm):
+            if self._CHILD_SEARCH[parent_key].search(heading_norm):
+                return True
         
         return False
     
-    def _is_subsection_indicator(self, text):
+    def _is_subsection_indicator(self, text, text_norm=None):
         """Check if text has patterns indicating it should be a subsection."""
-        text_lower = self._normalize_text(text)
-        
-        for pattern in self.SUBSECTION_INDICATORS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                return True
+        text_lower = self._normalize_text(text) if text_norm is None else text_norm
+        
+        # Fast reject before the regex loop. Normalized text is lower case with
+        # single spaces; the fold maps the only non-ASCII letters IGNORECASE
+        # still equates with letters of the indicator words.
+        if (' can ' not in text_lower
+                and text_lower.partition(' ')[0].translate(_IGNORECASE_FOLD)
+                not in self.SUBSECTION_FIRST_WORDS):
+            return False
         
-        return False
+        return self._SUBSECTION_INDICATOR_RE.search(text_lower) is not None
     
-    def _is_definition_term(self, text):
+    def _is_definition_term(self, text, text_norm=None):
         """Check if text looks like a definition term that should be under Definitions section."""
-        text_lower = self._normalize_text(text)
+        text_lower = self._normalize_text(text) if text_norm is None else text_norm
         
         # Check if this matches known definition terms
-        for term in self.DEFINITION_TERMS:
-            if term in text_lower or text_lower in term:
-                return True
+        if text_lower in self._DEFINITION_SUBSTRINGS or self._find_definition_terms(text_lower):
+            return True
         
         # Short titles (1-3 words) after a definitions section are likely definition terms
         if self.in_parent_section and 'definition' in self.in_parent_section:
@@ -1095,70 +2054,59 @@ class HeadingNumberer:
         
         return False
     
-    def _detect_parent_section(self, text):
+    def _detect_parent_section(self, text, text_norm=None):
         """
         Detect if this heading starts a parent section that will have children.
         
         Returns:
             str or None: The parent section key if detected, None otherwise
         """
-        text_norm = self._normalize_text(text)
+        if text_norm is None:
+            text_norm = self._normalize_text(text)
         
-        for parent_key in self.PARENT_CHILD_PATTERNS.keys():
-            if parent_key in text_norm:
-                return parent_key
+        found = self._find_parent_keys(text_norm)
+        if found:
+            # First key in table order, as before
+            return min(found, key=self._PARENT_ORDER.__getitem__)
         
         return None
     
-    def _should_be_subsection(self, text):
+    def _should_be_subsection(self, text, text_norm=None):
         """
         Determine if this heading should be a subsection of the previous heading.
         Uses semantic analysis to detect parent-child relationships.
+        text_norm is the heading's normalized text, if the caller already has it.
         
         Returns:
             bool: True if this should be a subsection
         """
-        text_norm = self._normalize_text(text)
+        if text_norm is None:
+            text_norm = self._normalize_text(text)
         
         # Check for keywords that indicate a NEW main section (should NOT be subsection)
         # These are full section titles, not partial matches
-        main_section_keywords = [
-            'chapter summary', 'summary of the chapter', 'conclusion of the chapter',
-            'delimitation of the study', 'limitations of the study', 'delimitations',
-            'significance of the study', 'scope of the study', 'organization of the study',
-            'structure of the study', 'structure of the thesis', 'structure of the dissertation',
-            'statement of the problem', 'problem statement',
-            'conceptual review', 'conceptual framework',
-            'theoretical review', 'theoretical framework',
-            'empirical review', 'empirical studies', 'review of empirical',
-            'research design', 'research methodology', 'methodology',
-            'data presentation', 'data analysis and interpretation',
-            'summary conclusion and recommendation', 'summary and conclusion',
-            'recommendations for further', 'recommendations',
-        ]
-        for keyword in main_section_keywords:
-            if keyword in text_norm:
-                # This is a main section - exit any parent context
-                self.in_parent_section = None
-                self.parent_section_number = ''
-                return False
+        if self._MAIN_SECTION_RE.search(text_norm):
+            # This is a main section - exit any parent context
+            self.in_parent_section = None
+            self.parent_section_number = ''
+            return False
         
         # Check if it's a known subsection indicator
-        if self._is_subsection_indicator(text):
+        if self._is_subsection_indicator(text, text_norm):
             return True
         
         # Check if current parent section expects this as a child
         if self.in_parent_section:
-            if self._is_child_of_parent(text, self.in_parent_section):
+            if self._is_child_of_parent(text, self.in_parent_section, text_norm):
                 return True
             
             # Definition terms under definitions section
-            if 'definition' in self.in_parent_section and self._is_definition_term(text):
+            if 'definition' in self.in_parent_section and self._is_definition_term(text, text_norm):
                 return True
         
         # Check if it's a child of the last heading
         if self.last_heading_normalized:
-            if self._is_child_of_parent(text, self.last_heading_text):
+            if self._is_child_of_parent(text, self.last_heading_text, text_norm):
                 return True
         
         return False
@@ -1173,31 +2121,29 @@ class HeadingNumberer:
         Returns:
             int: Chapter number, or 0 if not a chapter heading
         """
-        text_upper = text.upper().strip()
+        text_upper = text.upper()
+        # Stripping below only removes characters, so no 'CHAPTER' means no chapter
+        if 'CHAPTER' not in text_upper:
+            return 0
+        text_upper = text_upper.strip()
         
         # Remove markdown heading markers
-        text_upper = re.sub(r'^#+\s*', '', text_upper).strip()
-        
-        # Pattern: CHAPTER + word (ONE, TWO, etc.)
-        match = re.match(r'^CHAPTER\s+([A-Z]+)\b', text_upper)
-        if match:
-            word = match.group(1)
-            if word in self.WORD_TO_INT:
-                return self.WORD_TO_INT[word]
-        
-        # Pattern: CHAPTER + Roman numeral
-        match = re.match(r'^CHAPTER\s+([IVXLCDM]+)\b', text_upper)
-        if match:
-            roman = match.group(1)
-            if roman in self.ROMAN_TO_INT:
-                return self.ROMAN_TO_INT[roman]
+        text_upper = _MD_PREFIX_RE.sub('', text_upper).strip()
         
-        # Pattern: CHAPTER + digit
-        match = re.match(r'^CHAPTER\s+(\d+)', text_upper)
-        if match:
-            return int(match.group(1))
-        
-        return 0
+        return self._chapter_number(text_upper)
+    
+    def _chapter_number(self, text_upper):
+        """parse_chapter_number for text already upper-cased and stripped of '#' markers."""
+        if not text_upper.startswith('CHAPTER'):
+            return 0
+        match = _CHAPTER_TAIL_RE.match(text_upper, 7)
+        if match is None:
+            return 0
+        word, digits = match.groups()
+        if word is None:
+            return int(digits)
+        # Number words and Roman numerals share one lookup (their keys are disjoint)
+        return _CHAPTER_WORDS.get(word, 0)
     
     def is_chapter_heading(self, text):
         """Check if text is a chapter heading."""
@@ -1208,17 +2154,17 @@ class HeadingNumberer:
         Check if text is a chapter title section (ALL CAPS section after chapter).
         These typically don't get numbered.
         """
-        clean = re.sub(r'^#+\s*', '', text).strip().upper()
+        clean = _MD_PREFIX_RE.sub('', text).strip().upper()
         return clean in self.CHAPTER_TITLE_SECTIONS
     
     def is_unnumbered_section(self, text):
         """Check if text is a front matter or special section that shouldn't be numbered."""
-        clean = re.sub(r'^#+\s*', '', text).strip().upper()
+        clean = _MD_PREFIX_RE.sub('', text).strip().upper()
         return clean in self.UNNUMBERED_SECTIONS
     
     def is_appendix_heading(self, text):
         """Check if text starts an appendix section."""
-        clean = re.sub(r'^#+\s*', '', text).strip().upper()
+        clean = _MD_PREFIX_RE.sub('', text).strip().upper()
         return clean.startswith('APPENDIX') or clean.startswith('APPENDICES')
     
     def already_has_number(self, text):
@@ -1226,9 +2172,9 @@ class HeadingNumberer:
         Check if heading already has a hierarchical number.
         Matches patterns like: 1.1, 2.1.1, A.1, etc.
         """
-        clean = re.sub(r'^#+\s*', '', text).strip()
+        clean = _MD_PREFIX_RE.sub('', text).strip()
         # Match: "1.2 Title" or "1.2.3 Title" or "A.1 Title"
-        return bool(re.match(r'^(\d+\.)+\d+\s+', clean) or re.match(r'^[A-Z]\.(\d+\.)*\d+\s+', clean))
+        return _EXISTING_NUM_RE.match(clean) is not None
     
     def extract_existing_number(self, text):
         """
@@ -1237,15 +2183,12 @@ class HeadingNumberer:
         Returns:
             tuple: (number_string, title) or (None, text) if no number
         """
-        clean = re.sub(r'^#+\s*', '', text).strip()
-        
-        # Match hierarchical number
-        match = re.match(r'^((?:\d+\.)+\d+)\s+(.+)$', clean)
-        if match:
-            return match.group(1), match.group(2)
-        
-        # Match appendix number
-        match = re.match(r'^([A-Z]\.(?:\d+\.)*\d+)\s+(.+)$', clean)
+        return self._split_existing_number(_MD_PREFIX_RE.sub('', text).strip())
+    
+    def _split_existing_number(self, clean):
+        """extract_existing_number for text already stripped of '#' markers."""
+        # Match hierarchical or appendix number
+        match = _EXISTING_NUM_TITLE_RE.match(clean)
         if match:
             return match.group(1), match.group(2)
         
@@ -1258,7 +2201,7 @@ class HeadingNumberer:
         Returns:
             int: 1 for #, 2 for ##, 3 for ###, 0 if no markers
         """
-        match = re.match(r'^(#+)\s*', text)
+        match = _MD_LEVEL_RE.match(text)
         if match:
             return len(match.group(1))
         return 0
@@ -1270,7 +2213,7 @@ class HeadingNumberer:
         Returns:
             int: 1, 2, or 3 indicating the heading level
         """
-        clean = re.sub(r'^#+\s*', '', text).strip()
+        clean = _MD_PREFIX_RE.sub('', text).strip()
         clean_upper = clean.upper()
         
         # Chapter headings and chapter titles are level 1
@@ -1327,56 +2270,67 @@ class HeadingNumberer:
         # Preprocess: apply hierarchy correction to heading lines if needed
         # (Assume text is a single heading, but if batch, use correct_lines)
         # This is a placeholder for batch correction integration
-        md_level = self.get_heading_level_from_markdown(text)
-        clean_text = re.sub(r'^#+\s*', '', text).strip()
-        
-        # Check for chapter heading
-        chapter_num = self.parse_chapter_number(text)
-        if chapter_num > 0:
-            self.current_chapter = chapter_num
-            self.current_section = 0
-            self.current_subsection = 0
-            self.current_subsubsection = 0
-            self.in_appendix = False
-            self.in_parent_section = None
-            self.parent_section_number = ''
-            self.last_heading_text = ''
-            self.last_heading_normalized = ''
-            result['level'] = 1
-            result['chapter'] = chapter_num
-            return result  # Don't number the chapter heading itself
-        
-        # Check for appendix
-        if self.is_appendix_heading(text):
-            self.in_appendix = True
-            self.current_section = 0
-            self.current_subsection = 0
-            self.in_parent_section = None
-            result['level'] = 1
-            return result  # Don't number appendix heading itself
-        
-        # Check for unnumbered sections (front matter)
-        if self.is_unnumbered_section(text):
-            result['level'] = 1
-            return result
-        
-        # Check for chapter title sections (ALL CAPS after chapter)
-        if self.is_chapter_title(text):
-            result['level'] = 1
-            return result  # Keep as is without numbering
+        # Split off the markdown markers once; the checks below all work on clean_text
+        md_level, clean_text = _split_md_prefix(text)
+        clean_upper = clean_text.upper()
+        
+        # Chapter, appendix and front-matter headings all start with one of a few
+        # capitals, so numbered headings like "2.3 Sampling" skip these checks
+        if clean_upper[:1] in self._SPECIAL_FIRST_CHARS or text[:1].isspace():
+            # Check for chapter heading (parse_chapter_number strips before the markers)
+            if text[:1].isspace():
+                chapter_num = self.parse_chapter_number(text)
+            else:
+                chapter_num = self._chapter_number(clean_upper)
+            if chapter_num > 0:
+                self.current_chapter = chapter_num
+                self.current_section = 0
+                self.current_subsection = 0
+                self.current_subsubsection = 0
+                self.in_appendix = False
+                self.in_parent_section = None
+                self.parent_section_number = ''
+                self.last_heading_text = ''
+                self.last_heading_normalized = ''
+                result['level'] = 1
+                result['chapter'] = chapter_num
+                return result  # Don't number the chapter heading itself
+            
+            # Check for appendix
+            if clean_upper.startswith('APPENDIX') or clean_upper.startswith('APPENDICES'):
+                self.in_appendix = True
+                self.current_section = 0
+                self.current_subsection = 0
+                self.in_parent_section = None
+                result['level'] = 1
+                return result  # Don't number appendix heading itself
+            
+            # Check for unnumbered sections (front matter)
+            if clean_upper in self.UNNUMBERED_SECTIONS:
+                result['level'] = 1
+                return result
+            
+            # Check for chapter title sections (ALL CAPS after chapter)
+            if clean_upper in self.CHAPTER_TITLE_SECTIONS:
+                result['level'] = 1
+                return result  # Keep as is without numbering
         
         # If no chapter context yet, don't number
         if self.current_chapter == 0 and not self.in_appendix:
             return result
         
         # Check if already has proper numbering - extract existing number and title
-        existing_num, title = self.extract_existing_number(text)
+        existing_num, title = self._split_existing_number(clean_text)
+        
+        # Normalized once; text and clean_text normalize alike (the '#' markers
+        # are dropped either way)
+        text_norm = self._normalize_text(clean_text)
         
         # Semantic hierarchy detection - check if this should be a subsection
-        should_be_child = self._should_be_subsection(text)
+        should_be_child = self._should_be_subsection(text, text_norm)
         
         # Detect if this heading starts a new parent section
-        detected_parent = self._detect_parent_section(text)
+        detected_parent = self._detect_parent_section(text, text_norm)
         
         # Determine target level using semantic analysis
         if target_level is None:
@@ -1398,24 +2352,25 @@ class HeadingNumberer:
         result['level'] = target_level
         
         # Generate new number based on level
+        # (counters are read into locals once and written back)
+        number_prefix = self.appendix_letter if self.in_appendix else self.current_chapter
         if target_level == 1 or target_level == 2:
             # Level 1/2 treated as X.Y (main section within chapter)
             # Check if we're leaving a parent section
-            if self.in_parent_section and not should_be_child:
-                # Moving to a new section - reset parent context if heading is different type
-                new_parent = self._detect_parent_section(text)
-                if new_parent != self.in_parent_section:
+            in_parent_section = self.in_parent_section
+            if in_parent_section and not should_be_child:
+                # Moving to a new section - reset parent context if heading is
+                # different type (detected_parent is this heading's parent key)
+                if detected_parent != in_parent_section:
                     self.in_parent_section = None
                     self.parent_section_number = ''
             
-            self.current_section += 1
+            section = self.current_section + 1
+            self.current_section = section
             self.current_subsection = 0
             self.current_subsubsection = 0
             
-            if self.in_appendix:
-                new_number = f"{self.appendix_letter}.{self.current_section}"
-            else:
-                new_number = f"{self.current_chapter}.{self.current_section}"
+            new_number = f"{number_prefix}.{section}"
             
             # Update parent section tracking if this starts a parent section
             if detected_parent:
@@ -1423,24 +2378,21 @@ class HeadingNumberer:
                 self.parent_section_number = new_number
                 
         else:  # target_level >= 3
-            # Level 3: X.Y.Z (subsection)
-            if self.current_section == 0:
-                # If no section yet, start with section 1
-                self.current_section = 1
-            self.current_subsection += 1
+            # Level 3: X.Y.Z (subsection); if no section yet, start with section 1
+            section = self.current_section or 1
+            subsection = self.current_subsection + 1
+            self.current_section = section
+            self.current_subsection = subsection
             self.current_subsubsection = 0
             
-            if self.in_appendix:
-                new_number = f"{self.appendix_letter}.{self.current_section}.{self.current_subsection}"
-            else:
-                new_number = f"{self.current_chapter}.{self.current_section}.{self.current_subsection}"
+            new_number = f"{number_prefix}.{section}.{subsection}"
         
         result['number'] = new_number
         self.last_level = target_level
         
         # Update heading tracking for next iteration
         self.last_heading_text = clean_text
-        self.last_heading_normalized = self._normalize_text(clean_text)
+        self.last_heading_normalized = text_norm
         
         # Apply new number if different from existing
         if existing_num != new_number:
@@ -1463,45 +2415,36 @@ class HeadingNumberer:
         """
         self.reset()
         
-        # Pre-process lines to correct hierarchical numbering issues
+        # Correct hierarchical numbering issues as the lines are stripped below
         # This handles cases where numbering already exists but is incorrect (e.g. 3.6 WEEK TWO, 3.7 DAY ONE)
         if hasattr(self, 'hierarchy_corrector') and self.hierarchy_corrector:
-            lines = self.hierarchy_corrector.correct_lines(lines)
+            lines = self.hierarchy_corrector.iter_corrected(lines)
             
-        results = []
+        match_heading = _HEADING_LINE_RE.match
         
-        for i, line in enumerate(lines):
-            line = line.strip() if isinstance(line, str) else str(line).strip()
-            
-            # Skip empty lines
-            if not line:
-                results.append({
-                    'original': line,
-                    'numbered': line,
-                    'is_heading': False,
-                    'line_num': i
-                })
-                continue
-            
-            # Check if this is a heading (starts with # or matches heading patterns)
-            is_heading = False
-            
-            if line.startswith('#'):
-                is_heading = True
-            elif re.match(r'^[A-Z][A-Z\s]+$', line) and len(line) <= 60:
-                # ALL CAPS line, likely a heading
-                is_heading = True
-            elif re.match(r'^(\d+\.)+\d*\s+[A-Z]', line):
-                # Numbered heading like "1.2 Background"
-                is_heading = True
-            
-            if is_heading:
-                numbered_result = self.number_heading(line)
+        # Strip every line in one batch up front; only headings go through
+        # number_heading below. Records stay plain dicts: holding only str/int/bool
+        # values they are not tracked by the cyclic GC, unlike slotted objects.
+        stripped = [line.strip() if isinstance(line, str) else str(line).strip() for line in lines]
+        
+        # Numbered in order on the calling thread. Chapters could be numbered
+        # independently, but /format_batch already spreads whole documents over
+        # FORMAT_WORKERS processes, and a chapter's headings are far too few to
+        # repay shipping them to a pool.
+        results = []
+        append = results.append
+        number_heading = self.number_heading
+        for i, line in enumerate(stripped):
+            # First-character test rejects most body text without a regex call
+            first = line[:1]
+            if ((first in _HEADING_FIRST_CHARS or first.isdecimal())
+                    and match_heading(line) is not None):
+                numbered_result = number_heading(line)
                 numbered_result['is_heading'] = True
                 numbered_result['line_num'] = i
-                results.append(numbered_result)
+                append(numbered_result)
             else:
-                results.append({
+                append({
                     'original': line,
                     'numbered': line,
                     'is_heading': False,
@@ -1515,6 +2458,22 @@ class HeadingNumberer:
 # FIGURE DETECTION AND FORMATTING SYSTEM
 # ============================================================================
 
+def _compile_alternation(named_patterns, flags):
+    """
+    Join compiled patterns into one alternation, each wrapped in a group named
+    after it. Returns the regex and, per name, the index of that pattern's own
+    first group in the combined match (match.lastgroup names the pattern hit).
+    """
+    parts = []
+    first_group = {}
+    groups = 0
+    for name, pattern in named_patterns:
+        parts.append('(?P<%s>%s)' % (name, pattern.pattern))
+        first_group[name] = groups + 2
+        groups += 1 + pattern.groups
+    return re.compile('|'.join(parts), flags), first_group
+
+
 class FigureFormatter:
     """
     Detect, validate, and format figures in academic documents.
@@ -1651,12 +2610,28 @@ class FigureFormatter:
         re.IGNORECASE
     )
     
+    # Patterns M and N in one scan, for extract_inline_references
+    INLINE_REFERENCE_SCAN = re.compile(
+        '%s|%s' % (INLINE_REFERENCE_PATTERN.pattern, PARENTHESES_PATTERN.pattern), re.IGNORECASE
+    )
+    
     # Pattern O: Extract figure numbers for validation
     FIGURE_NUMBER_PATTERN = re.compile(
         r'(?:Figure|Fig(?:\.|\s+)?)\s*(\d+(?:\.\d+)?)',
         re.IGNORECASE
     )
     
+    # detect_figures: the caption patterns above as one alternation, tried in
+    # this order at each position (only FIGURE_TITLE/LIST use ^ and $)
+    FIGURE_SCAN_PATTERN, _FIGURE_SCAN_GROUPS = _compile_alternation((
+        ('FIGURE_TITLE_PATTERN', FIGURE_TITLE_PATTERN),
+        ('FIG_DECIMAL_PATTERN', FIG_DECIMAL_PATTERN),
+        ('NO_SPACE_PATTERN', NO_SPACE_PATTERN),
+        ('LIST_FIGURE_PATTERN', LIST_FIGURE_PATTERN),
+        ('TECHNICAL_FIGURE_PATTERN', TECHNICAL_FIGURE_PATTERN),
+        ('WHITESPACE_VARIATION_PATTERN', WHITESPACE_VARIATION_PATTERN),
+    ), re.IGNORECASE | re.MULTILINE)
+    
     # ============================================================
     # FIGURE TYPE DETECTION PATTERNS
     # ============================================================
@@ -1685,6 +2660,25 @@ class FigureFormatter:
         re.IGNORECASE
     )
     
+    # Title keywords per figure type, checked in this order by _classify_figure_type
+    FIGURE_TYPE_KEYWORDS = (
+        ('conceptual_framework', ('framework', 'model', 'paradigm')),
+        ('statistical_chart', ('chart', 'graph', 'histogram', 'plot')),
+        ('process_flow', ('flow', 'diagram', 'workflow', 'process')),
+        ('map', ('map', 'location', 'geographic')),
+        ('photograph', ('photo', 'photograph', 'image', 'picture')),
+        ('technical_interface', ('dashboard', 'interface', 'screen', 'ui')),
+        ('technical_operation', ('blast', 'operation', 'equipment', 'machinery')),
+        ('structure', ('structure', 'architecture', 'layout')),
+    )
+    # One scan finds every keyword in a title
+    _find_figure_type_terms = staticmethod(_compile_keyword_finder(
+        term for _, terms in FIGURE_TYPE_KEYWORDS for term in terms
+    ))
+    _FIGURE_TYPE_RANK = {
+        term: rank for rank, (_, terms) in enumerate(FIGURE_TYPE_KEYWORDS) for term in terms
+    }
+    
     # ============================================================
     # ENHANCED CAPTION DETECTION PATTERNS
     # ============================================================
@@ -1714,6 +2708,19 @@ class FigureFormatter:
         # No-space format: Fig4.18:, Figure2.1:
         re.compile(r'^(?:Figure|Fig\.?)(\d+(?:\.\d+)*)\s*:', re.IGNORECASE),
     ]
+    # All of the above in one regex, for "is this a caption" checks
+    CAPTION_PATTERN = re.compile(
+        '|'.join('(?:%s)' % pattern.pattern for pattern in CAPTION_PATTERNS), re.IGNORECASE
+    )
+    # Tried in order by detect_figure_caption for the number and title
+    CAPTION_EXTRACTION_PATTERNS = (
+        FIGURE_TITLE_PATTERN,
+        FIG_DECIMAL_PATTERN,
+        NO_SPACE_PATTERN,
+        TECHNICAL_FIGURE_PATTERN,
+    )
+    # Fallback: first number anywhere in the caption
+    FALLBACK_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
     
     def __init__(self):
         self.reset()
@@ -1722,14 +2729,16 @@ class FigureFormatter:
         """Reset all tracking for a new document."""
         self.figures = []  # All detected figures with metadata
         self.figure_numbers = []  # Just the numbers for validation
+        self._figure_number_set = set()  # Membership index for figure_numbers
         self.figure_entries = []  # Entries for List of Figures
         self.current_chapter = 0  # For chapter-based numbering
         self.numbering_issues = []  # Track gaps, duplicates, etc.
         
     def detect_figures(self, text):
         """
-        Detect all figure references in a block of text using multi-pass detection.
-        Uses multiple patterns to catch all variations.
+        Detect all figure references in a block of text.
+        A single scan with FIGURE_SCAN_PATTERN reports each reference once, under
+        the first of its patterns that matches there.
         
         Args:
             text: Document text content
@@ -1738,50 +2747,40 @@ class FigureFormatter:
             list: List of detected figures with metadata
         """
         figures = []
-        seen_positions = set()  # Avoid duplicates
-        
-        # Multi-pass detection with different patterns
-        detection_patterns = [
-            # Pass 1: Standard figure titles/captions
-            ('FIGURE_TITLE_PATTERN', self.FIGURE_TITLE_PATTERN),
-            # Pass 2: Fig X.YY: format specifically
-            ('FIG_DECIMAL_PATTERN', self.FIG_DECIMAL_PATTERN),
-            # Pass 3: No-space format (Fig4.18:)
-            ('NO_SPACE_PATTERN', self.NO_SPACE_PATTERN),
-            # Pass 4: List figures
-            ('LIST_FIGURE_PATTERN', self.LIST_FIGURE_PATTERN),
-            # Pass 5: Technical figures
-            ('TECHNICAL_FIGURE_PATTERN', self.TECHNICAL_FIGURE_PATTERN),
-            # Pass 6: Whitespace variations
-            ('WHITESPACE_VARIATION_PATTERN', self.WHITESPACE_VARIATION_PATTERN),
-        ]
         
-        for pattern_name, pattern in detection_patterns:
-            for match in pattern.finditer(text):
-                # Skip if we've already detected this position
-                pos_key = (match.start(), match.end())
-                if pos_key in seen_positions:
-                    continue
-                seen_positions.add(pos_key)
-                
-                figure_num = match.group(1)
-                title = match.group(2).strip() if len(match.groups()) > 1 and match.group(2) else ''
-                
-                figures.append({
-                    'number': figure_num,
-                    'title': title,
-                    'full_match': match.group(0),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'type': 'caption',
-                    'figure_type': self._classify_figure_type(title),
-                    'pattern_used': pattern_name
-                })
+        # Every scan pattern (and FIGURE_NUMBER_PATTERN) needs "fig" in some
+        # case; a C-level substring test skips the regexes for text without it.
+        # IGNORECASE also lets "i" match dotless i and dotted capital I.
+        lowered = text.lower()
+        if 'fig' not in lowered and 'f\u0131g' not in lowered and 'fi\u0307g' not in lowered:
+            return figures
+        
+        scan_groups = self._FIGURE_SCAN_GROUPS
+        
+        for match in self.FIGURE_SCAN_PATTERN.finditer(text):
+            pattern_name = match.lastgroup
+            first = scan_groups[pattern_name]
+            figure_num = match.group(first)
+            # WHITESPACE_VARIATION_PATTERN has no title group
+            title = '' if pattern_name == 'WHITESPACE_VARIATION_PATTERN' else (match.group(first + 1) or '').strip()
+            
+            figures.append({
+                'number': figure_num,
+                'title': title,
+                'full_match': match.group(0),
+                'start': match.start(),
+                'end': match.end(),
+                'type': 'caption',
+                'figure_type': self._classify_figure_type(title),
+                'pattern_used': pattern_name
+            })
         
         # Track all figure numbers for validation using comprehensive pattern
+        seen = self._figure_number_set
         for match in self.FIGURE_NUMBER_PATTERN.finditer(text):
             num = match.group(1)
-            if num not in self.figure_numbers:
+            if num not in seen:
+                seen.add(num)
                 self.figure_numbers.append(num)
         
         return figures
@@ -1802,59 +2801,40 @@ class FigureFormatter:
         text = paragraph_text.strip()
         
         # First check with standard caption patterns
-        for pattern in self.CAPTION_PATTERNS:
-            if pattern.match(text):
-                # Try multiple extraction patterns for the number and title
-                extraction_patterns = [
-                    self.FIGURE_TITLE_PATTERN,
-                    self.FIG_DECIMAL_PATTERN,
-                    self.NO_SPACE_PATTERN,
-                    self.TECHNICAL_FIGURE_PATTERN,
-                ]
-                
-                for extract_pattern in extraction_patterns:
-                    match = extract_pattern.match(text)
-                    if match:
-                        return {
-                            'number': match.group(1),
-                            'title': match.group(2).strip() if len(match.groups()) > 1 and match.group(2) else '',
-                            'full_text': text,
-                            'figure_type': self._classify_figure_type(text)
-                        }
-                
-                # Fallback: extract using general number pattern
-                num_match = re.search(r'(\d+(?:\.\d+)?)', text)
-                return {
-                    'number': num_match.group(1) if num_match else '?',
-                    'title': text,
-                    'full_text': text,
-                    'figure_type': 'unknown'
-                }
+        if self.CAPTION_PATTERN.match(text):
+            # Try multiple extraction patterns for the number and title
+            for extract_pattern in self.CAPTION_EXTRACTION_PATTERNS:
+                match = extract_pattern.match(text)
+                if match:
+                    return {
+                        'number': match.group(1),
+                        'title': match.group(2).strip() if len(match.groups()) > 1 and match.group(2) else '',
+                        'full_text': text,
+                        'figure_type': self._classify_figure_type(text)
+                    }
+            
+            # Fallback: extract using general number pattern
+            num_match = self.FALLBACK_NUMBER_PATTERN.search(text)
+            return {
+                'number': num_match.group(1) if num_match else '?',
+                'title': text,
+                'full_text': text,
+                'figure_type': 'unknown'
+            }
         
         return None
     
-    def _classify_figure_type(self, title):
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _classify_figure_type(title):
         """Classify the type of figure based on title content."""
-        title_lower = title.lower()
-        
-        if any(term in title_lower for term in ['framework', 'model', 'paradigm']):
-            return 'conceptual_framework'
-        elif any(term in title_lower for term in ['chart', 'graph', 'histogram', 'plot']):
-            return 'statistical_chart'
-        elif any(term in title_lower for term in ['flow', 'diagram', 'workflow', 'process']):
-            return 'process_flow'
-        elif any(term in title_lower for term in ['map', 'location', 'geographic']):
-            return 'map'
-        elif any(term in title_lower for term in ['photo', 'photograph', 'image', 'picture']):
-            return 'photograph'
-        elif any(term in title_lower for term in ['dashboard', 'interface', 'screen', 'ui']):
-            return 'technical_interface'
-        elif any(term in title_lower for term in ['blast', 'operation', 'equipment', 'machinery']):
-            return 'technical_operation'
-        elif any(term in title_lower for term in ['structure', 'architecture', 'layout']):
-            return 'structure'
-        else:
+        # Captions repeat (LOF entries, re-scans), so results are cached per title
+        found = FigureFormatter._find_figure_type_terms(title.lower())
+        if not found:
             return 'general'
+        # Earliest category in FIGURE_TYPE_KEYWORDS with a term in the title
+        rank = min(map(FigureFormatter._FIGURE_TYPE_RANK.__getitem__, found))
+        return FigureFormatter.FIGURE_TYPE_KEYWORDS[rank][0]
     
     def validate_numbering(self):
         """
@@ -1869,22 +2849,11 @@ class FigureFormatter:
         if not self.figure_numbers:
             return {'valid': True, 'issues': []}
         
-        # Parse numbers (handle both "1" and "1.1" formats)
-        parsed_numbers = []
-        for num in self.figure_numbers:
-            if '.' in num:
-                parts = num.split('.')
-                parsed_numbers.append((int(parts[0]), int(parts[1]), num))
-            else:
-                parsed_numbers.append((int(num), 0, num))
-        
-        # Sort by chapter then sub-number
-        parsed_numbers.sort(key=lambda x: (x[0], x[1]))
+        # Main figure numbers (the part before any ".": "3" and "3.1" give 3)
+        main_numbers = {int(num.partition('.')[0]) for num in self.figure_numbers}
         
         # Check for gaps in main figure numbers
-        main_numbers = sorted(set(n[0] for n in parsed_numbers))
-        expected = list(range(1, max(main_numbers) + 1)) if main_numbers else []
-        missing = [n for n in expected if n not in main_numbers]
+        missing = [n for n in range(1, max(main_numbers) + 1) if n not in main_numbers]
         
         if missing:
             self.numbering_issues.append({
@@ -1980,7 +2949,7 @@ class FigureFormatter:
             return False
         
         text = text.strip()
-        return any(pattern.match(text) for pattern in self.CAPTION_PATTERNS)
+        return self.CAPTION_PATTERN.match(text) is not None
     
     def extract_inline_references(self, text):
         """
@@ -1993,17 +2962,14 @@ class FigureFormatter:
         Returns:
             list: List of referenced figure numbers
         """
-        references = []
-        
-        # Pattern B: Inline references
-        for match in self.INLINE_REFERENCE_PATTERN.finditer(text):
-            references.append(match.group(1))
-        
-        # Pattern C: Parenthetical references
-        for match in self.PARENTHESES_PATTERN.finditer(text):
-            references.append(match.group(1))
+        # Inline ("see Figure 2") and parenthetical ("(Fig. 3)") references in
+        # one scan; their matches cannot overlap, so none are lost
+        references = {
+            match.group(1) or match.group(2)
+            for match in self.INLINE_REFERENCE_SCAN.finditer(text)
+        }
         
-        return list(set(references))  # Remove duplicates
+        return list(references)
     
     def renumber_figures(self, start_from=1):
         """
@@ -2832,6 +3798,47 @@ class ImpliedBulletDetector:
         return blocks
 
 
+# Compiled once for PatternEngine.analyze_line, which runs on every line of input
+_LINE_PATTERNS = {
+    'title_case': re.compile(r'^[A-Z][a-z]+(?:\s+[A-Za-z][a-z]*)*$'),
+    'table_start': re.compile(r'START', re.IGNORECASE),
+    'table_end': re.compile(r'END', re.IGNORECASE),
+    'table_separator': re.compile(r'^\|[\s\-:]+\|'),
+    'page_word': re.compile(r'page|p\.|pg\.', re.IGNORECASE),
+    'bare_page_number': re.compile(r'^\s*-?\s*\d+\s*-?\s*$'),
+    'header_word': re.compile(r'header|running head', re.IGNORECASE),
+    'footer_word': re.compile(r'footer', re.IGNORECASE),
+    'author_marker': re.compile(r'\bby\b|authors?:', re.IGNORECASE),
+    'email_at': re.compile(r'@'),
+    'affiliation_word': re.compile(r'department|school|college|university|institute', re.IGNORECASE),
+    'currency_start': re.compile(r'^\$\d+'),
+    'inline_math': re.compile(r'\$[^$]+\$'),
+    'notes_heading': re.compile(r'^\s*(?:endnotes?|footnotes?)\s*$', re.IGNORECASE),
+    'bullet_start': re.compile(r'^[\*\-•]\s'),
+    'table_caption': re.compile(r'^Table\s+\d+', re.IGNORECASE),
+    'table_separator_row': re.compile(r'^\|[-\s:]+\|'),
+    'figure_start': re.compile(r'^[Ff]igure'),
+    'appendix_heading': re.compile(r'^APPENDIX\s+[A-Z]$', re.IGNORECASE),
+    'appendix_subsection': re.compile(r'^[A-Z]\.\d+\.\d+'),
+    'appendix_section': re.compile(r'^[A-Z]\.\d+'),
+    'regression_equation': re.compile(r'[Yy]\s*=\s*[βα]'),
+    'r_squared': re.compile(r'[Rr]²'),
+    'p_value': re.compile(r'[Pp]\s*[<>=]'),
+    'trailing_number': re.compile(r'(\d+)\s*$'),
+    'acronym_definition': re.compile(r'[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\s+\([A-Z]{2,}\)'),
+    'beta_value': re.compile(r'β\s*='),
+    'f_statistic': re.compile(r'[Ff]\s*\('),
+    'r_value': re.compile(r'[Rr]²?\s*='),
+    'confidence_interval': re.compile(r'CI\s*='),
+    'section_letter': re.compile(r'^Section\s+[A-Z]', re.IGNORECASE),
+    'bold_term_definition': re.compile(r'\*\*([^*]+)\*\*:\s*(.+)'),
+    'table_reference': re.compile(r'[Tt]able\s+\d+'),
+    'figure_reference': re.compile(r'[Ff]igure\s+\d+'),
+    'section_reference': re.compile(r'[Ss]ection\s+\d+'),
+    'page_reference': re.compile(r'[Pp]age\s+\d+'),
+}
+
+
 class PatternEngine:
     """Ultra-fast pattern matching engine for document analysis"""
     
@@ -4896,7 +5903,7 @@ class PatternEngine:
         is_short = length < 100
         is_very_short = length < 60
         is_all_caps = trimmed == trimmed.upper() and any(c.isalpha() for c in trimmed) and length > 2
-        is_title_case = re.match(r'^[A-Z][a-z]+(?:\s+[A-Za-z][a-z]*)*$', trimmed) is not None
+        is_title_case = _LINE_PATTERNS['title_case'].match(trimmed) is not None
         has_period = trimmed.endswith('.')
         word_count = len(trimmed.split())
         
@@ -4906,9 +5913,9 @@ class PatternEngine:
         # Priority 1: Check for table patterns (highest priority to preserve structure)
         for pattern in self.patterns['table_marker']:
             if pattern.match(trimmed):
-                if re.search(r'START', trimmed, re.IGNORECASE):
+                if _LINE_PATTERNS['table_start'].search(trimmed):
                     analysis['type'] = 'table_start'
-                elif re.search(r'END', trimmed, re.IGNORECASE):
+                elif _LINE_PATTERNS['table_end'].search(trimmed):
                     analysis['type'] = 'table_end'
                 else:
                     analysis['type'] = 'table_caption'
@@ -4918,7 +5925,7 @@ class PatternEngine:
         for pattern in self.patterns['table_row']:
             if pattern.match(trimmed):
                 # Check if it's a separator row
-                if re.match(r'^\|[\s\-:]+\|', trimmed):
+                if _LINE_PATTERNS['table_separator'].match(trimmed):
                     analysis['type'] = 'table_separator'
                 else:
                     analysis['type'] = 'table_row'
@@ -5108,11 +6115,11 @@ class PatternEngine:
                 analysis['type'] = 'page_metadata'
                 analysis['confidence'] = 0.90
                 # Determine subtype
-                if re.search(r'page|p\.|pg\.', trimmed, re.IGNORECASE) or re.match(r'^\s*-?\s*\d+\s*-?\s*$', trimmed):
+                if _LINE_PATTERNS['page_word'].search(trimmed) or _LINE_PATTERNS['bare_page_number'].match(trimmed):
                     analysis['subtype'] = 'page_number'
-                elif re.search(r'header|running head', trimmed, re.IGNORECASE):
+                elif _LINE_PATTERNS['header_word'].search(trimmed):
                     analysis['subtype'] = 'header'
-                elif re.search(r'footer', trimmed, re.IGNORECASE):
+                elif _LINE_PATTERNS['footer_word'].search(trimmed):
                     analysis['subtype'] = 'footer'
                 else:
                     analysis['subtype'] = 'document_metadata'
@@ -5124,11 +6131,11 @@ class PatternEngine:
                 analysis['type'] = 'academic_metadata'
                 analysis['confidence'] = 0.80
                 # Determine subtype
-                if re.search(r'\bby\b|authors?:', trimmed, re.IGNORECASE):
+                if _LINE_PATTERNS['author_marker'].search(trimmed):
                     analysis['subtype'] = 'author'
-                elif re.search(r'@', trimmed):
+                elif _LINE_PATTERNS['email_at'].search(trimmed):
                     analysis['subtype'] = 'contact'
-                elif re.search(r'department|school|college|university|institute', trimmed, re.IGNORECASE):
+                elif _LINE_PATTERNS['affiliation_word'].search(trimmed):
                     analysis['subtype'] = 'affiliation'
                 else:
                     analysis['subtype'] = 'metadata'
@@ -5138,7 +6145,7 @@ class PatternEngine:
         for pattern in self.patterns['math_expression']:
             if pattern.search(trimmed):
                 # Avoid false positives with currency
-                if re.match(r'^\$\d+', trimmed) and not re.search(r'\$[^$]+\$', trimmed):
+                if _LINE_PATTERNS['currency_start'].match(trimmed) and not _LINE_PATTERNS['inline_math'].search(trimmed):
                     continue  # This is likely currency, not math
                 analysis['type'] = 'math_expression'
                 # Determine subtype
@@ -5158,7 +6165,7 @@ class PatternEngine:
             if pattern.match(trimmed):
                 analysis['type'] = 'footnote_endnote'
                 # Determine subtype
-                if re.match(r'^\s*(?:endnotes?|footnotes?)\s*$', trimmed, re.IGNORECASE):
+                if _LINE_PATTERNS['notes_heading'].match(trimmed):
                     analysis['subtype'] = 'section_header'
                     analysis['confidence'] = 0.95
                 else:
@@ -5168,7 +6175,7 @@ class PatternEngine:
         
         # Priority 14: Check for inline formatting (bold/italic)
         # Check for markdown-style formatting but exclude lines that start with list markers
-        if not re.match(r'^[\*\-•]\s', trimmed):  # Not a bullet list
+        if not _LINE_PATTERNS['bullet_start'].match(trimmed):  # Not a bullet list
             for pattern in self.patterns['inline_formatting']:
                 matches = pattern.findall(trimmed)
                 if matches and any(m for m in matches if any(g for g in (m if isinstance(m, tuple) else (m,)) if g)):
@@ -5212,9 +6219,9 @@ class PatternEngine:
         for pattern in self.patterns['academic_table']:
             if pattern.match(trimmed):
                 analysis['type'] = 'academic_table'
-                if re.match(r'^Table\s+\d+', trimmed, re.IGNORECASE):
+                if _LINE_PATTERNS['table_caption'].match(trimmed):
                     analysis['subtype'] = 'caption'
-                elif re.match(r'^\|[-\s:]+\|', trimmed):
+                elif _LINE_PATTERNS['table_separator_row'].match(trimmed):
                     analysis['subtype'] = 'separator'
                 elif '**' in trimmed:
                     analysis['subtype'] = 'header_row'
@@ -5242,7 +6249,7 @@ class PatternEngine:
         for pattern in self.patterns['figure_equation']:
             if pattern.match(trimmed) or pattern.search(trimmed):
                 analysis['type'] = 'figure_equation'
-                if re.match(r'^[Ff]igure', trimmed):
+                if _LINE_PATTERNS['figure_start'].match(trimmed):
                     analysis['subtype'] = 'figure_caption'
                 elif '$$' in trimmed or 'equation' in trimmed.lower():
                     analysis['subtype'] = 'equation_block'
@@ -5266,13 +6273,13 @@ class PatternEngine:
         for pattern in self.patterns['appendix_format']:
             if pattern.match(trimmed):
                 analysis['type'] = 'appendix_format'
-                if re.match(r'^APPENDIX\s+[A-Z]$', trimmed, re.IGNORECASE):
+                if _LINE_PATTERNS['appendix_heading'].match(trimmed):
                     analysis['subtype'] = 'appendix_header'
                     analysis['level'] = 1
-                elif re.match(r'^[A-Z]\.\d+\.\d+', trimmed):
+                elif _LINE_PATTERNS['appendix_subsection'].match(trimmed):
                     analysis['subtype'] = 'appendix_subsection'
                     analysis['level'] = 3
-                elif re.match(r'^[A-Z]\.\d+', trimmed):
+                elif _LINE_PATTERNS['appendix_section'].match(trimmed):
                     analysis['subtype'] = 'appendix_section'
                     analysis['level'] = 2
                 else:
@@ -5294,11 +6301,11 @@ class PatternEngine:
             if pattern.search(trimmed):
                 analysis['type'] = 'math_model'
                 analysis['confidence'] = 0.85
-                if re.search(r'[Yy]\s*=\s*[βα]', trimmed):
+                if _LINE_PATTERNS['regression_equation'].search(trimmed):
                     analysis['subtype'] = 'regression_model'
-                elif re.search(r'[Rr]²', trimmed):
+                elif _LINE_PATTERNS['r_squared'].search(trimmed):
                     analysis['subtype'] = 'r_squared'
-                elif re.search(r'[Pp]\s*[<>=]', trimmed):
+                elif _LINE_PATTERNS['p_value'].search(trimmed):
                     analysis['subtype'] = 'p_value'
                 else:
                     analysis['subtype'] = 'statistical_notation'
@@ -5339,7 +6346,7 @@ class PatternEngine:
                 analysis['type'] = 'toc_entry'
                 analysis['confidence'] = 0.95
                 # Extract page number if present
-                page_match = re.search(r'(\d+)\s*$', trimmed)
+                page_match = _LINE_PATTERNS['trailing_number'].search(trimmed)
                 if page_match:
                     analysis['page_number'] = int(page_match.group(1))
                 return analysis
@@ -5360,7 +6367,7 @@ class PatternEngine:
             match = pattern.search(trimmed)
             if match:
                 # Only classify if it looks like a definition
-                if re.search(r'[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\s+\([A-Z]{2,}\)', trimmed):
+                if _LINE_PATTERNS['acronym_definition'].search(trimmed):
                     analysis['type'] = 'abbreviation'
                     analysis['subtype'] = 'definition'
                     analysis['confidence'] = 0.85
@@ -5397,15 +6404,15 @@ class PatternEngine:
                 analysis['confidence'] = 0.85
                 # Identify specific stat types
                 stats_found = []
-                if re.search(r'β\s*=', trimmed):
+                if _LINE_PATTERNS['beta_value'].search(trimmed):
                     stats_found.append('beta')
-                if re.search(r'[Pp]\s*[<>=]', trimmed):
+                if _LINE_PATTERNS['p_value'].search(trimmed):
                     stats_found.append('p_value')
-                if re.search(r'[Ff]\s*\(', trimmed):
+                if _LINE_PATTERNS['f_statistic'].search(trimmed):
                     stats_found.append('f_statistic')
-                if re.search(r'[Rr]²?\s*=', trimmed):
+                if _LINE_PATTERNS['r_value'].search(trimmed):
                     stats_found.append('r_value')
-                if re.search(r'CI\s*=', trimmed):
+                if _LINE_PATTERNS['confidence_interval'].search(trimmed):
                     stats_found.append('confidence_interval')
                 analysis['stats_types'] = stats_found
                 return analysis
@@ -5414,7 +6421,7 @@ class PatternEngine:
         for pattern in self.patterns['questionnaire']:
             if pattern.match(trimmed) or pattern.search(trimmed):
                 analysis['type'] = 'questionnaire'
-                if re.match(r'^Section\s+[A-Z]', trimmed, re.IGNORECASE):
+                if _LINE_PATTERNS['section_letter'].match(trimmed):
                     analysis['subtype'] = 'section_header'
                 elif '□' in trimmed or '☐' in trimmed:
                     analysis['subtype'] = 'checkbox_item'
@@ -5430,7 +6437,7 @@ class PatternEngine:
             if pattern.match(trimmed):
                 analysis['type'] = 'glossary_entry'
                 # Extract term and definition
-                term_match = re.match(r'\*\*([^*]+)\*\*:\s*(.+)', trimmed)
+                term_match = _LINE_PATTERNS['bold_term_definition'].match(trimmed)
                 if term_match:
                     analysis['term'] = term_match.group(1)
                     analysis['definition'] = term_match.group(2)
@@ -5442,13 +6449,13 @@ class PatternEngine:
             if pattern.search(trimmed):
                 analysis['type'] = 'cross_reference'
                 refs_found = []
-                if re.search(r'[Tt]able\s+\d+', trimmed):
+                if _LINE_PATTERNS['table_reference'].search(trimmed):
                     refs_found.append('table')
-                if re.search(r'[Ff]igure\s+\d+', trimmed):
+                if _LINE_PATTERNS['figure_reference'].search(trimmed):
                     refs_found.append('figure')
-                if re.search(r'[Ss]ection\s+\d+', trimmed):
+                if _LINE_PATTERNS['section_reference'].search(trimmed):
                     refs_found.append('section')
-                if re.search(r'[Pp]age\s+\d+', trimmed):
+                if _LINE_PATTERNS['page_reference'].search(trimmed):
                     refs_found.append('page')
                 analysis['reference_types'] = refs_found
                 analysis['confidence'] = 0.80
@@ -6419,7 +7426,7 @@ def format_questionnaire_in_word(doc, questionnaire_data):
         font.bold = True
         pf = style.paragraph_format
         pf.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        pf.space_after = Pt(12)
+        pf.space_after = PT_12
     
     # Section Header Style
     if 'Questionnaire Section' not in styles:
@@ -6430,8 +7437,8 @@ def format_questionnaire_in_word(doc, questionnaire_data):
         font.size = Pt(14)
         font.bold = True
         pf = style.paragraph_format
-        pf.space_before = Pt(12)
-        pf.space_after = Pt(6)
+        pf.space_before = PT_12
+        pf.space_after = PT_6
         
     # Question Style
     if 'Question Text' not in styles:
@@ -6439,10 +7446,10 @@ def format_questionnaire_in_word(doc, questionnaire_data):
         style.base_style = styles['Normal']
         font = style.font
         font.name = 'Times New Roman'
-        font.size = Pt(12)
+        font.size = PT_12
         font.bold = True
         pf = style.paragraph_format
-        pf.space_after = Pt(3)
+        pf.space_after = PT_3
         
     # Option Style
     if 'Question Option' not in styles:
@@ -6450,9 +7457,9 @@ def format_questionnaire_in_word(doc, questionnaire_data):
         style.base_style = styles['Normal']
         font = style.font
         font.name = 'Times New Roman'
-        font.size = Pt(12)
+        font.size = PT_12
         pf = style.paragraph_format
-        pf.left_indent = Inches(0.25)
+        pf.left_indent = INCH_QUARTER
         pf.space_after = Pt(2)
 
     # Add Title
@@ -6463,7 +7470,7 @@ def format_questionnaire_in_word(doc, questionnaire_data):
     if questionnaire_data.get('instructions'):
         for instruction in questionnaire_data['instructions']:
             p = doc.add_paragraph(instruction)
-            p.paragraph_format.space_after = Pt(12)
+            p.paragraph_format.space_after = PT_12
             p.italic = True
             
     # Process Sections
@@ -6527,7 +7534,7 @@ def format_questionnaire_in_word(doc, questionnaire_data):
                             run.font.size = Pt(14)
                     
                     # Add spacing after table
-                    doc.add_paragraph().paragraph_format.space_after = Pt(12)
+                    doc.add_paragraph().paragraph_format.space_after = PT_12
 
             elif q_type == 'scale' and question.get('scale'):
                 # Create Likert Scale Table (Single Question)
@@ -6553,7 +7560,7 @@ def format_questionnaire_in_word(doc, questionnaire_data):
                         run.font.size = Pt(14)
                     
                     # Add spacing after table
-                    doc.add_paragraph().paragraph_format.space_after = Pt(6)
+                    doc.add_paragraph().paragraph_format.space_after = PT_6
             
             elif q_type in ['multiple_choice', 'single_select', 'radio']:
                 options = question.get('options', [])
@@ -6565,7 +7572,7 @@ def format_questionnaire_in_word(doc, questionnaire_data):
                 if is_short and total_len < 80 and len(options) > 1:
                     # Horizontal Layout
                     p = doc.add_paragraph(style='Question Option')
-                    p.paragraph_format.left_indent = Inches(0.25)
+                    p.paragraph_format.left_indent = INCH_QUARTER
                     
                     for i, option in enumerate(options):
                         run = p.add_run('○ ')
@@ -6599,7 +7606,7 @@ def format_questionnaire_in_word(doc, questionnaire_data):
                 if is_short and total_len < 80 and len(options) > 1:
                     # Horizontal Layout
                     p = doc.add_paragraph(style='Question Option')
-                    p.paragraph_format.left_indent = Inches(0.25)
+                    p.paragraph_format.left_indent = INCH_QUARTER
                     
                     for i, option in enumerate(options):
                         run = p.add_run('☐ ')
@@ -6620,9 +7627,9 @@ def format_questionnaire_in_word(doc, questionnaire_data):
             elif q_type == 'open_ended':
                 # Add lines for writing
                 p = doc.add_paragraph()
-                p.paragraph_format.left_indent = Inches(0.25)
+                p.paragraph_format.left_indent = INCH_QUARTER
                 p.add_run('_' * 60)
-                p.paragraph_format.space_after = Pt(6)
+                p.paragraph_format.space_after = PT_6
                 
     return doc
 
@@ -7187,8 +8194,8 @@ class DocumentProcessor:
         """Process Word document line by line, preserving table and image positions"""
         doc = Document(file_path)
         
-        # Step 0: Extract all images from document FIRST
-        self.extracted_images = self.image_extractor.extract_all_images(file_path)
+        # Step 0: Extract all images from document FIRST (reuses the parsed document)
+        self.extracted_images = self.image_extractor.extract_all_images(doc)
         logger.info(f"Extracted {len(self.extracted_images)} images from document")
         
         # Step 0.5: COVER PAGE DETECTION - Extract cover page info from first page only
@@ -7209,7 +8216,8 @@ class DocumentProcessor:
         
         # Step 0.7: QUESTIONNAIRE DETECTION
         # Check if the document is a questionnaire
-        full_text = '\n'.join([p.text for p in doc.paragraphs])
+        paragraphs = doc.paragraphs
+        full_text = '\n'.join([p.text for p in paragraphs])
         q_data = self.questionnaire_processor.detect_questionnaire(full_text)
         if q_data['is_questionnaire']:
             self.questionnaire_data = self.questionnaire_processor.parse_questionnaire_structure(full_text)
@@ -7218,125 +8226,134 @@ class DocumentProcessor:
         
         # Create image position lookup for tracking
         image_positions = {}
+        table_image_positions = {}  # (table, row, cell) -> images
         for img in self.extracted_images:
-            if img['position_type'] == 'paragraph':
-                key = img['paragraph_index']
+            if img.position_type == 'paragraph':
+                key = img.paragraph_index
                 if key not in image_positions:
                     image_positions[key] = []
                 image_positions[key].append(img)
+            elif img.position_type == 'table':
+                loc = img.table_location
+                key = (loc['table_index'], loc['row_index'], loc['cell_index'])
+                if key not in table_image_positions:
+                    table_image_positions[key] = []
+                table_image_positions[key].append(img)
         
         # Extract all content in document order (paragraphs and tables)
         lines = []
         paragraph_index = 0
         
+        # Resolve body elements to their python-docx wrappers once, instead of
+        # rebuilding doc.paragraphs / doc.tables for every element
+        paragraph_by_element = {para._element: para for para in paragraphs}
+        table_by_element = {table._element: (i, table) for i, table in enumerate(doc.tables)}
+        style_names = {}  # style id -> style name
+        
         # Iterate through document body elements in order
         for element in doc.element.body:
             # Check if element is a paragraph
             if element.tag.endswith('p'):
                 # Find the corresponding paragraph object
-                for para in doc.paragraphs:
-                    if para._element is element:
-                        # SKIP COVER PAGE PARAGRAPHS - they will be replaced with standardized cover
-                        if has_cover_page and paragraph_index < cover_end_idx:
-                            paragraph_index += 1
-                            break
-                        
-                        # SKIP CERTIFICATION PAGE PARAGRAPHS - they will be replaced with standardized certification
-                        if has_cert and self.certification_start_index <= paragraph_index < self.certification_end_index:
+                para = paragraph_by_element.get(element)
+                if para is not None:
+                    # SKIP COVER PAGE PARAGRAPHS - they will be replaced with standardized cover
+                    if has_cover_page and paragraph_index < cover_end_idx:
+                        paragraph_index += 1
+                        continue
+                    
+                    # SKIP CERTIFICATION PAGE PARAGRAPHS - they will be replaced with standardized certification
+                    if has_cert and self.certification_start_index <= paragraph_index < self.certification_end_index:
+                        paragraph_index += 1
+                        continue
+                    
+                    text = para.text.strip()
+                    
+                    # Check for automatic numbering/bullets (Word automatic lists)
+                    # If present, prepend a bullet so PatternEngine detects it as a list
+                    try:
+                        if para._element.pPr is not None and para._element.pPr.numPr is not None:
+                            # Check if text already has a bullet-like start (manual numbering)
+                            if text and not re.match(r'^[\s•○●▪■□◆◇→➔➜➤➢–—*⁎⁑※✱✲✳✴☐☑✓✔✗✘⓿①②③④⑤⑥⑦⑧⑨❶❷❸❹❺❻❼❽❾❿➀-➉✦✧★☆♥♡◉◎▸▹►◂◃◄⦿⁍-]', text):
+                                text = f"• {text}"
+                    except Exception:
+                        pass
+                    
+                    # Check if this paragraph has images (skip cover page images)
+                    if paragraph_index in image_positions:
+                        for img in image_positions[paragraph_index]:
+                            # Insert image placeholder
+                            lines.append({
+                                'text': f'[IMAGE:{img.image_id}]',
+                                'style': 'Image',
+                                'bold': False,
+                                'font_size': 12,
+                                'type': 'image_placeholder',
+                                'image_id': img.image_id,
+                            })
+                            logger.debug("Added image placeholder for %s at paragraph %d", img.image_id, paragraph_index)
+                    
+                    if text:
+                        # Skip AI meta-commentary
+                        if self.engine.detect_ai_generated_content(text):
                             paragraph_index += 1
-                            break
-                        
-                        text = para.text.strip()
-                        
-                        # Check for automatic numbering/bullets (Word automatic lists)
-                        # If present, prepend a bullet so PatternEngine detects it as a list
-                        try:
-                            if para._element.pPr is not None and para._element.pPr.numPr is not None:
-                                # Check if text already has a bullet-like start (manual numbering)
-                                if text and not re.match(r'^[\s•○●▪■□◆◇→➔➜➤➢–—*⁎⁑※✱✲✳✴☐☑✓✔✗✘⓿①②③④⑤⑥⑦⑧⑨❶❷❸❹❺❻❼❽❾❿➀-➉✦✧★☆♥♡◉◎▸▹►◂◃◄⦿⁍-]', text):
-                                    text = f"• {text}"
-                        except Exception:
-                            pass
-                        
-                        # Check if this paragraph has images (skip cover page images)
-                        if paragraph_index in image_positions:
-                            for img in image_positions[paragraph_index]:
-                                # Insert image placeholder
-                                lines.append({
-                                    'text': f'[IMAGE:{img["image_id"]}]',
-                                    'style': 'Image',
-                                    'bold': False,
-                                    'font_size': 12,
-                                    'type': 'image_placeholder',
-                                    'image_id': img['image_id'],
-                                })
-                                logger.info(f"Added image placeholder for {img['image_id']} at paragraph {paragraph_index}")
-                        
-                        if text:
-                            # Skip AI meta-commentary
-                            if self.engine.detect_ai_generated_content(text):
-                                paragraph_index += 1
-                                break
-                                
-                            # Clean AI artifacts
-                            text, metadata = self.engine.clean_ai_content(text)
-
-                            font_size = 12  # Default
-                            is_bold = False
-                            if para.runs:
-                                is_bold = any(run.bold for run in para.runs if run.bold)
-                                if para.runs[0].font.size:
-                                    font_size = para.runs[0].font.size.pt
+                            continue
                             
-                            # Merge metadata from clean_ai_content
-                            if metadata.get('bold'):
-                                is_bold = True
-                                
-                            style = para.style.name if para.style else 'Normal'
-                            if metadata.get('heading_level'):
-                                style = f'Heading {metadata["heading_level"]}'
+                        # Clean AI artifacts
+                        text, metadata = self.engine.clean_ai_content(text)
+
+                        font_size = 12  # Default
+                        is_bold = False
+                        runs = para.runs
+                        if runs:
+                            is_bold = any(run.bold for run in runs if run.bold)
+                            if runs[0].font.size:
+                                font_size = runs[0].font.size.pt
+                        
+                        # Merge metadata from clean_ai_content
+                        if metadata.get('bold'):
+                            is_bold = True
                             
-                            lines.append({
-                                'text': text,
-                                'style': style,
-                                'bold': is_bold,
-                                'font_size': font_size,
-                            })
+                        style_id = para._p.style
+                        if style_id not in style_names:
+                            style_names[style_id] = para.style.name if para.style else 'Normal'
+                        style = style_names[style_id]
+                        if metadata.get('heading_level'):
+                            style = f'Heading {metadata["heading_level"]}'
                         
-                        paragraph_index += 1
-                        break
+                        lines.append({
+                            'text': text,
+                            'style': style,
+                            'bold': is_bold,
+                            'font_size': font_size,
+                        })
+                    
+                    paragraph_index += 1
+                    continue
             
             # Check if element is a table
             elif element.tag.endswith('tbl'):
                 # Find the corresponding table object
-                table_index = 0
-                for table in doc.tables:
-                    if table._element is element:
-                        lines.append({'text': '[TABLE START]', 'style': 'Table', 'bold': False, 'font_size': 12})
-                        
-                        # Check for images in table cells
-                        for row_idx, row in enumerate(table.rows):
-                            row_cells = []
-                            for cell_idx, cell in enumerate(row.cells):
-                                cell_text = cell.text.strip()
-                                
-                                # Check for images in this cell
-                                for img in self.extracted_images:
-                                    if img['position_type'] == 'table':
-                                        loc = img['table_location']
-                                        if (loc['table_index'] == table_index and 
-                                            loc['row_index'] == row_idx and 
-                                            loc['cell_index'] == cell_idx):
-                                            cell_text = f'[IMAGE:{img["image_id"]}] {cell_text}'
-                                
-                                row_cells.append(cell_text)
+                if element in table_by_element:
+                    table_index, table = table_by_element[element]
+                    lines.append({'text': '[TABLE START]', 'style': 'Table', 'bold': False, 'font_size': 12})
+                    
+                    # Check for images in table cells
+                    for row_idx, row in enumerate(table.rows):
+                        row_cells = []
+                        for cell_idx, cell in enumerate(row.cells):
+                            cell_text = cell.text.strip()
+                            
+                            # Check for images in this cell
+                            for img in table_image_positions.get((table_index, row_idx, cell_idx), ()):
+                                cell_text = f'[IMAGE:{img.image_id}] {cell_text}'
                             
-                            row_text = ' | '.join(row_cells)
-                            lines.append({'text': f'| {row_text} |', 'style': 'Table', 'bold': False, 'font_size': 12})
+                            row_cells.append(cell_text)
                         
-                        lines.append({'text': '[TABLE END]', 'style': 'Table', 'bold': False, 'font_size': 12})
-                        break
-                    table_index += 1
+                        row_text = ' | '.join(row_cells)
+                        lines.append({'text': f'| {row_text} |', 'style': 'Table', 'bold': False, 'font_size': 12})
+                    
+                    lines.append({'text': '[TABLE END]', 'style': 'Table', 'bold': False, 'font_size': 12})
         
         return self.process_lines(lines), self.extracted_images
     
@@ -7407,12 +8424,17 @@ class DocumentProcessor:
         # Reset heading numberer for new document
         self.heading_numberer.reset()
         
+        # Line texts as one flat column, so the prev/next lookups below are
+        # plain list indexing instead of per-neighbour dict unpacking
+        texts = [line_data['text'] if isinstance(line_data, dict) else line_data for line_data in lines]
+        last_index = len(lines) - 1
+        
         # Analyze each line
         for i, line_data in enumerate(lines):
-            text = line_data['text'] if isinstance(line_data, dict) else line_data
+            text = texts[i]
             
-            prev_line = lines[i-1]['text'] if i > 0 and isinstance(lines[i-1], dict) else (lines[i-1] if i > 0 else '')
-            next_line = lines[i+1]['text'] if i < len(lines) - 1 and isinstance(lines[i+1], dict) else (lines[i+1] if i < len(lines) - 1 else '')
+            prev_line = texts[i-1] if i > 0 else ''
+            next_line = texts[i+1] if i < last_index else ''
             
             if isinstance(prev_line, dict):
                 prev_line = prev_line.get('text', '')
@@ -8373,7 +9395,7 @@ class WordGenerator:
         fldChar2.set(qn('w:fldCharType'), 'end')
         run._r.append(fldChar2)
         
-    def generate(self, structured_data, output_path, images=None, cover_page_data=None, certification_data=None, questionnaire_data=None):
+    def generate(self, structured_data, output_path, images=None, cover_page_data=None, certification_data=None, questionnaire_data=None, force_update=False):
         """Generate Word document from structured data with images
         
         Args:
@@ -8383,20 +9405,22 @@ class WordGenerator:
             cover_page_data: Dict with extracted cover page information (or None)
             certification_data: Dict with extracted certification page information (or None)
             questionnaire_data: Dict with extracted questionnaire structure (or None)
+            force_update: Regenerate TOC/LOF/LOT on the server with Word/LibreOffice
+                instead of leaving it to Word when the document is opened
         """
-        self.doc = Document()
+        self.doc = load_template()
         
         # Set default margins to 1 inch (2.54 cm)
         for section in self.doc.sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
+            section.top_margin = INCH_1
+            section.bottom_margin = INCH_1
+            section.left_margin = INCH_1
+            section.right_margin = INCH_1
             
         # Store images for insertion
         if images:
             self.images = images
-            self.image_lookup = {img['image_id']: img for img in images}
+            self.image_lookup = {img.image_id: img for img in images}
             
         # Initialize image inserter
         self.image_inserter = ImageInserter(self.doc, self.images)
@@ -8409,17 +9433,17 @@ class WordGenerator:
         if questionnaire_data and questionnaire_data.get('is_questionnaire'):
             logger.info("Generating questionnaire document...")
             self.doc = format_questionnaire_in_word(self.doc, questionnaire_data)
-            self.doc.save(output_path)
+            save_docx(self.doc, output_path)
             return output_path
             
         # --- STANDARD DOCUMENT GENERATION ---
         
         # 1. Generate Cover Page (if data available)
         if cover_page_data:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
+            section.top_margin = INCH_1
+            section.bottom_margin = INCH_1
+            section.left_margin = INCH_1
+            section.right_margin = INCH_1
             
         self._setup_styles()
         
@@ -8431,20 +9455,20 @@ class WordGenerator:
                 style.base_style = styles['Normal']
                 font = style.font
                 font.name = 'Times New Roman'
-                font.size = Pt(12)
+                font.size = PT_12
                 pf = style.paragraph_format
                 pf.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
                 pf.line_spacing = 1.5
-                pf.space_after = Pt(0)
-                pf.left_indent = Pt(0)
-                pf.first_line_indent = Pt(0)
+                pf.space_after = PT_0
+                pf.left_indent = PT_0
+                pf.first_line_indent = PT_0
         except Exception as e:
             logger.warning(f"Could not create AcademicBody style: {e}")
         
         # Store images for reinsertion
         if images:
             self.images = images
-            self.image_lookup = {img['image_id']: img for img in images}
+            self.image_lookup = {img.image_id: img for img in images}
             self.image_inserter = ImageInserter(self.doc, images)
             logger.info(f"WordGenerator initialized with {len(images)} images")
         
@@ -8592,17 +9616,23 @@ class WordGenerator:
             self._add_section(section)
             rendered_section_count += 1
         
+        # Word fills in the TOC/LOF/LOT when the file is opened, unless the
+        # caller asked for them to be computed here
+        if needs_toc and not force_update:
+            request_field_update_on_open(self.doc)
+        
         # Save document first
-        self.doc.save(output_path)
+        save_docx(self.doc, output_path)
         logger.info(f"Document saved to {output_path}")
         
         # Update TOC using Microsoft Word COM automation
-        if needs_toc:
+        if needs_toc and force_update:
             toc_updated = update_toc_with_word(output_path)
             if toc_updated:
                 logger.info("Table of Contents updated automatically")
             else:
-                logger.warning("TOC could not be auto-updated - user will need to update manually in Word")
+                logger.warning("TOC could not be auto-updated - Word will update it when the document is opened")
+                set_docx_update_fields(output_path)
         
         return output_path
     
@@ -8741,7 +9771,7 @@ class WordGenerator:
         faculty_run = faculty_para.add_run(faculty_text.upper())
         faculty_run.bold = True
         faculty_run.font.name = 'Times New Roman'
-        faculty_run.font.size = Pt(11)
+        faculty_run.font.size = PT_11
         
         # CENTER CELL: Logo
         logo_cell = header_table.cell(0, 1)
@@ -8764,10 +9794,10 @@ class WordGenerator:
         dept_run = dept_para.add_run(f"DEPARTMENT OF {dept_text.upper()}")
         dept_run.bold = True
         dept_run.font.name = 'Times New Roman'
-        dept_run.font.size = Pt(11)
+        dept_run.font.size = PT_11
         
         # Spacing after header
-        self.doc.add_paragraph().paragraph_format.space_after = Pt(18)
+        self.doc.add_paragraph().paragraph_format.space_after = PT_18
         
         # ========== 3. TOPIC BOX (MANDATORY - thick black outline, square, centered) ==========
         topic_text = data.get('topic') or 'RESEARCH TOPIC'
@@ -8775,7 +9805,7 @@ class WordGenerator:
                             bold=True, all_caps=True, width_inches=5.5, padding_pt=15)
         
         # Spacing after topic
-        self.doc.add_paragraph().paragraph_format.space_after = Pt(12)
+        self.doc.add_paragraph().paragraph_format.space_after = PT_12
         
         # ========== 4. SUBMISSION STATEMENT ==========
         degree_text = data.get('degree') or 'Master'
@@ -8802,7 +9832,7 @@ class WordGenerator:
         if reg_num:
             add_centered_text(self.doc, f"({reg_num})", font_size=11, space_before=3, space_after=12)
         else:
-            self.doc.add_paragraph().paragraph_format.space_after = Pt(12)
+            self.doc.add_paragraph().paragraph_format.space_after = PT_12
         
         # ========== 8. SUPERVISOR BOXES (MANDATORY - two columns) ==========
         supervisor = data.get('supervisor') or ''
@@ -8829,7 +9859,7 @@ class WordGenerator:
         sup_h_run.bold = True
         sup_h_run.underline = True
         sup_h_run.font.name = 'Times New Roman'
-        sup_h_run.font.size = Pt(11)
+        sup_h_run.font.size = PT_11
         
         cosup_header_cell = sup_table.cell(0, 1)
         cosup_header_para = cosup_header_cell.paragraphs[0]
@@ -8843,7 +9873,7 @@ class WordGenerator:
         cosup_h_run.bold = True
         cosup_h_run.underline = True
         cosup_h_run.font.name = 'Times New Roman'
-        cosup_h_run.font.size = Pt(11)
+        cosup_h_run.font.size = PT_11
         
         # Row 1: Names (show placeholder if empty)
         sup_name_cell = sup_table.cell(1, 0)
@@ -8852,7 +9882,7 @@ class WordGenerator:
         sup_display = supervisor if supervisor else '________________'
         sup_n_run = sup_name_para.add_run(sup_display)
         sup_n_run.font.name = 'Times New Roman'
-        sup_n_run.font.size = Pt(11)
+        sup_n_run.font.size = PT_11
         
         cosup_name_cell = sup_table.cell(1, 1)
         cosup_name_para = cosup_name_cell.paragraphs[0]
@@ -8860,7 +9890,7 @@ class WordGenerator:
         cosup_display = co_supervisor if co_supervisor else '________________'
         cosup_n_run = cosup_name_para.add_run(cosup_display)
         cosup_n_run.font.name = 'Times New Roman'
-        cosup_n_run.font.size = Pt(11)
+        cosup_n_run.font.size = PT_11
         
         # Spacing before date
         self.doc.add_paragraph().paragraph_format.space_after = Pt(24)
@@ -8921,33 +9951,33 @@ class WordGenerator:
             line_cell = table.cell(0, 0)
             line_para = line_cell.paragraphs[0]
             line_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            line_para.paragraph_format.space_before = Pt(18)
-            line_para.paragraph_format.space_after = Pt(3)
+            line_para.paragraph_format.space_before = PT_18
+            line_para.paragraph_format.space_after = PT_3
             line_run = line_para.add_run('_' * 25)
             line_run.font.name = 'Times New Roman'
-            line_run.font.size = Pt(12)
+            line_run.font.size = PT_12
             
             # Row 1: Name
             name_cell = table.cell(1, 0)
             name_para = name_cell.paragraphs[0]
             name_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            name_para.paragraph_format.space_before = Pt(3)
-            name_para.paragraph_format.space_after = Pt(0)
+            name_para.paragraph_format.space_before = PT_3
+            name_para.paragraph_format.space_after = PT_0
             name_display = name if name else '________________'
             name_run = name_para.add_run(name_display)
             name_run.font.name = 'Times New Roman'
-            name_run.font.size = Pt(12)
+            name_run.font.size = PT_12
             name_run.bold = True
             
             # Row 2: Title
             title_cell = table.cell(2, 0)
             title_para = title_cell.paragraphs[0]
             title_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            title_para.paragraph_format.space_before = Pt(0)
-            title_para.paragraph_format.space_after = Pt(6)
+            title_para.paragraph_format.space_before = PT_0
+            title_para.paragraph_format.space_after = PT_6
             title_run = title_para.add_run(f'({title})')
             title_run.font.name = 'Times New Roman'
-            title_run.font.size = Pt(11)
+            title_run.font.size = PT_11
             title_run.italic = True
             
             return table
@@ -8966,37 +9996,37 @@ class WordGenerator:
         # Use Heading 1 style format: Times New Roman, 12pt, bold, centered, black
         cert_heading = self.doc.add_heading('CERTIFICATION', level=1)
         cert_heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        cert_heading.paragraph_format.space_before = Pt(12)
-        cert_heading.paragraph_format.space_after = Pt(6)
+        cert_heading.paragraph_format.space_before = PT_12
+        cert_heading.paragraph_format.space_after = PT_6
         cert_heading.paragraph_format.line_spacing = 1.5
         for run in cert_heading.runs:
             run.font.name = 'Times New Roman'
-            run.font.size = Pt(12)
+            run.font.size = PT_12
             run.font.bold = True
             run.font.color.rgb = RGBColor(0, 0, 0)
         
         # ========== 2. CERTIFICATION TEXT (topic in bold) ==========
         para = self.doc.add_paragraph()
         para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-        para.paragraph_format.space_before = Pt(0)
-        para.paragraph_format.space_after = Pt(12)
+        para.paragraph_format.space_before = PT_0
+        para.paragraph_format.space_after = PT_12
         para.paragraph_format.line_spacing = 1.5
         
         # First part of the paragraph
         run1 = para.add_run('This is to certify that this research titled ')
         run1.font.name = 'Times New Roman'
-        run1.font.size = Pt(12)
+        run1.font.size = PT_12
         
         # Topic in bold with quotes
         topic_run = para.add_run(f'"{topic}"')
         topic_run.font.name = 'Times New Roman'
-        topic_run.font.size = Pt(12)
+        topic_run.font.size = PT_12
         topic_run.font.bold = True
         
         # Rest of the paragraph
         run2 = para.add_run(f' is the original work of {author}. This work is submitted in partial fulfilment of the requirement for the award of a {degree} in {program} in {institution} Cameroon.')
         run2.font.name = 'Times New Roman'
-        run2.font.size = Pt(12)
+        run2.font.size = PT_12
         
         # ========== 3. SIGNATURE TEXTBOXES: Supervisor (left) | HOD (right) ==========
         # Create a 2-column table to hold the two textboxes side by side
@@ -9015,29 +10045,29 @@ class WordGenerator:
         
         # Signature line paragraph
         sup_line_para = sup_cell.paragraphs[0]
-        sup_line_para.paragraph_format.space_before = Pt(18)
-        sup_line_para.paragraph_format.space_after = Pt(3)
+        sup_line_para.paragraph_format.space_before = PT_18
+        sup_line_para.paragraph_format.space_after = PT_3
         sup_line = sup_line_para.add_run('_' * 15)
         sup_line.font.name = 'Times New Roman'
-        sup_line.font.size = Pt(12)
+        sup_line.font.size = PT_12
         
         # Name paragraph (directly under line)
         sup_name_para = sup_cell.add_paragraph()
-        sup_name_para.paragraph_format.space_before = Pt(0)
-        sup_name_para.paragraph_format.space_after = Pt(0)
+        sup_name_para.paragraph_format.space_before = PT_0
+        sup_name_para.paragraph_format.space_after = PT_0
         sup_name_display = supervisor if supervisor else ''
         sup_name_run = sup_name_para.add_run(sup_name_display)
         sup_name_run.font.name = 'Times New Roman'
-        sup_name_run.font.size = Pt(12)
+        sup_name_run.font.size = PT_12
         sup_name_run.bold = True
         
         # Title paragraph
         sup_title_para = sup_cell.add_paragraph()
-        sup_title_para.paragraph_format.space_before = Pt(0)
-        sup_title_para.paragraph_format.space_after = Pt(6)
+        sup_title_para.paragraph_format.space_before = PT_0
+        sup_title_para.paragraph_format.space_after = PT_6
         sup_title_run = sup_title_para.add_run('(Supervisor)')
         sup_title_run.font.name = 'Times New Roman'
-        sup_title_run.font.size = Pt(11)
+        sup_title_run.font.size = PT_11
         sup_title_run.bold = True
         
         # RIGHT CELL: HOD textbox
@@ -9045,82 +10075,82 @@ class WordGenerator:
         
         # Signature line paragraph
         hod_line_para = hod_cell.paragraphs[0]
-        hod_line_para.paragraph_format.space_before = Pt(18)
-        hod_line_para.paragraph_format.space_after = Pt(3)
+        hod_line_para.paragraph_format.space_before = PT_18
+        hod_line_para.paragraph_format.space_after = PT_3
         hod_line = hod_line_para.add_run('_' * 15)
         hod_line.font.name = 'Times New Roman'
-        hod_line.font.size = Pt(12)
+        hod_line.font.size = PT_12
         
         # Name paragraph (directly under line)
         hod_name_para = hod_cell.add_paragraph()
-        hod_name_para.paragraph_format.space_before = Pt(0)
-        hod_name_para.paragraph_format.space_after = Pt(0)
+        hod_name_para.paragraph_format.space_before = PT_0
+        hod_name_para.paragraph_format.space_after = PT_0
         hod_name_display = hod if hod else ''
         hod_name_run = hod_name_para.add_run(hod_name_display)
         hod_name_run.font.name = 'Times New Roman'
-        hod_name_run.font.size = Pt(12)
+        hod_name_run.font.size = PT_12
         hod_name_run.bold = True
         
         # Title paragraph
         hod_title_para = hod_cell.add_paragraph()
-        hod_title_para.paragraph_format.space_before = Pt(0)
-        hod_title_para.paragraph_format.space_after = Pt(6)
+        hod_title_para.paragraph_format.space_before = PT_0
+        hod_title_para.paragraph_format.space_after = PT_6
         hod_title_run = hod_title_para.add_run('(Head Of Department)')
         hod_title_run.font.name = 'Times New Roman'
-        hod_title_run.font.size = Pt(11)
+        hod_title_run.font.size = PT_11
         hod_title_run.bold = True
         
         # ========== 4. DIRECTOR SIGNATURE (left-aligned) ==========
         # Signature line
         dir_line_para = self.doc.add_paragraph()
         dir_line_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        dir_line_para.paragraph_format.space_before = Pt(18)
-        dir_line_para.paragraph_format.space_after = Pt(3)
+        dir_line_para.paragraph_format.space_before = PT_18
+        dir_line_para.paragraph_format.space_after = PT_3
         dir_line_run = dir_line_para.add_run('_' * 15)
         dir_line_run.font.name = 'Times New Roman'
-        dir_line_run.font.size = Pt(12)
+        dir_line_run.font.size = PT_12
         
         # Name (directly under line)
         dir_name_para = self.doc.add_paragraph()
         dir_name_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        dir_name_para.paragraph_format.space_before = Pt(0)
-        dir_name_para.paragraph_format.space_after = Pt(0)
+        dir_name_para.paragraph_format.space_before = PT_0
+        dir_name_para.paragraph_format.space_after = PT_0
         dir_name_display = director if director else ''
         dir_name_run = dir_name_para.add_run(dir_name_display)
         dir_name_run.font.name = 'Times New Roman'
-        dir_name_run.font.size = Pt(12)
+        dir_name_run.font.size = PT_12
         dir_name_run.bold = True
         
         dir_title_para = self.doc.add_paragraph()
         dir_title_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        dir_title_para.paragraph_format.space_before = Pt(0)
+        dir_title_para.paragraph_format.space_before = PT_0
         dir_title_run = dir_title_para.add_run('(Director)')
         dir_title_run.font.name = 'Times New Roman'
-        dir_title_run.font.size = Pt(11)
+        dir_title_run.font.size = PT_11
         dir_title_run.bold = True
         
         # ========== 4. ACCEPTANCE STATEMENT ==========
-        self.doc.add_paragraph().paragraph_format.space_after = Pt(12)
+        self.doc.add_paragraph().paragraph_format.space_after = PT_12
         
         accept_para = self.doc.add_paragraph()
         accept_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-        accept_para.paragraph_format.space_before = Pt(12)
-        accept_para.paragraph_format.space_after = Pt(12)
+        accept_para.paragraph_format.space_before = PT_12
+        accept_para.paragraph_format.space_after = PT_12
         accept_para.paragraph_format.line_spacing = 1.5
         
         accept_run = accept_para.add_run('Having met the stipulated requirements, the dissertation has been accepted by the Postgraduate School')
         accept_run.font.name = 'Times New Roman'
-        accept_run.font.size = Pt(12)
+        accept_run.font.size = PT_12
         
         # ========== 5. DATE LINE ==========
         date_para = self.doc.add_paragraph()
         date_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        date_para.paragraph_format.space_before = Pt(18)
-        date_para.paragraph_format.space_after = Pt(6)
+        date_para.paragraph_format.space_before = PT_18
+        date_para.paragraph_format.space_after = PT_6
         
         date_run = date_para.add_run('Date' + '_' * 25)
         date_run.font.name = 'Times New Roman'
-        date_run.font.size = Pt(12)
+        date_run.font.size = PT_12
         
         # ========== 6. GENERAL COORDINATOR SECTION ==========
         # Right-aligned signature section
@@ -9145,16 +10175,16 @@ class WordGenerator:
         # Right column only - signature line
         gc_line_cell = gc_table.cell(0, 1).paragraphs[0]
         gc_line_cell.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        gc_line_cell.paragraph_format.space_before = Pt(18)
+        gc_line_cell.paragraph_format.space_before = PT_18
         gc_line_cell.add_run('_' * 30).font.name = 'Times New Roman'
         
         # Title
         gc_title_cell = gc_table.cell(1, 1).paragraphs[0]
         gc_title_cell.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        gc_title_cell.paragraph_format.space_before = Pt(6)
+        gc_title_cell.paragraph_format.space_before = PT_6
         gc_title_run = gc_title_cell.add_run('The General Coordinator')
         gc_title_run.font.name = 'Times New Roman'
-        gc_title_run.font.size = Pt(12)
+        gc_title_run.font.size = PT_12
         gc_title_run.bold = True
         
         # School
@@ -9162,7 +10192,7 @@ class WordGenerator:
         gc_school_cell.alignment = WD_ALIGN_PARAGRAPH.CENTER
         gc_school_run = gc_school_cell.add_run('Postgraduate School')
         gc_school_run.font.name = 'Times New Roman'
-        gc_school_run.font.size = Pt(12)
+        gc_school_run.font.size = PT_12
         
         # Add page break after certification page
         self.doc.add_page_break()
@@ -9175,12 +10205,12 @@ class WordGenerator:
         # Normal style - NO INDENTATION
         normal = styles['Normal']
         normal.font.name = 'Times New Roman'
-        normal.font.size = Pt(12)
+        normal.font.size = PT_12
         normal.paragraph_format.line_spacing = 1.5
         normal.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-        normal.paragraph_format.space_after = Pt(6)
-        normal.paragraph_format.left_indent = Pt(0)  # No left indent
-        normal.paragraph_format.first_line_indent = Pt(0)  # No first line indent
+        normal.paragraph_format.space_after = PT_6
+        normal.paragraph_format.left_indent = PT_0  # No left indent
+        normal.paragraph_format.first_line_indent = PT_0  # No first line indent
         
         # Heading styles - All use Times New Roman, size 12, line spacing 1.5
         heading_configs = {
@@ -9199,8 +10229,8 @@ class WordGenerator:
                 heading.paragraph_format.line_spacing = 1.5
                 heading.paragraph_format.space_before = Pt(config['space_before'])
                 heading.paragraph_format.space_after = Pt(config['space_after'])
-                heading.paragraph_format.left_indent = Pt(0)  # No left indent
-                heading.paragraph_format.first_line_indent = Pt(0)  # No first line indent
+                heading.paragraph_format.left_indent = PT_0  # No left indent
+                heading.paragraph_format.first_line_indent = PT_0  # No first line indent
             except KeyError:
                 pass  # Style doesn't exist, skip
     
@@ -9213,7 +10243,7 @@ class WordGenerator:
         # Style the title - Times New Roman, size 12, bold, black
         for run in title.runs:
             run.font.name = 'Times New Roman'
-            run.font.size = Pt(12)
+            run.font.size = PT_12
             run.font.bold = True
             run.font.color.rgb = RGBColor(0, 0, 0)  # Black
         
@@ -9226,13 +10256,13 @@ class WordGenerator:
         toc_heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run = toc_heading.add_run('TABLE OF CONTENTS')
         run.font.name = 'Times New Roman'
-        run.font.size = Pt(12)
+        run.font.size = PT_12
         run.font.bold = True
         run.font.color.rgb = RGBColor(0, 0, 0)  # Black
         
         # No space after the title
-        toc_heading.paragraph_format.space_after = Pt(0)
-        toc_heading.paragraph_format.space_before = Pt(0)
+        toc_heading.paragraph_format.space_after = PT_0
+        toc_heading.paragraph_format.space_before = PT_0
         toc_heading.paragraph_format.line_spacing = 1.5
         
         # Add TOC field code directly (no blank paragraph in between)
@@ -9268,7 +10298,7 @@ class WordGenerator:
         # Add the instruction text
         run_instr = paragraph.add_run("Right click and update field to get table of contents")
         run_instr.font.name = 'Times New Roman'
-        run_instr.font.size = Pt(12)
+        run_instr.font.size = PT_12
         run_instr.font.bold = True
         run_instr.font.color.rgb = RGBColor(68, 114, 196) # Word Blue
         
@@ -9296,13 +10326,13 @@ class WordGenerator:
         lof_heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run = lof_heading.add_run('LIST OF FIGURES')
         run.font.name = 'Times New Roman'
-        run.font.size = Pt(12)
+        run.font.size = PT_12
         run.font.bold = True
         run.font.color.rgb = RGBColor(0, 0, 0)  # Black
         
         # No space after the title
-        lof_heading.paragraph_format.space_after = Pt(0)
-        lof_heading.paragraph_format.space_before = Pt(0)
+        lof_heading.paragraph_format.space_after = PT_0
+        lof_heading.paragraph_format.space_before = PT_0
         lof_heading.paragraph_format.line_spacing = 1.5
         
         # Add LOF field code directly
@@ -9337,7 +10367,7 @@ class WordGenerator:
         # Add the instruction text
         run_instr = paragraph.add_run("Right click and update field to get list of figures")
         run_instr.font.name = 'Times New Roman'
-        run_instr.font.size = Pt(12)
+        run_instr.font.size = PT_12
         run_instr.font.bold = True
         run_instr.font.color.rgb = RGBColor(68, 114, 196) # Word Blue
         
@@ -9365,13 +10395,13 @@ class WordGenerator:
         lot_heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run = lot_heading.add_run('LIST OF TABLES')
         run.font.name = 'Times New Roman'
-        run.font.size = Pt(12)
+        run.font.size = PT_12
         run.font.bold = True
         run.font.color.rgb = RGBColor(0, 0, 0)  # Black
         
         # No space after the title
-        lot_heading.paragraph_format.space_after = Pt(0)
-        lot_heading.paragraph_format.space_before = Pt(0)
+        lot_heading.paragraph_format.space_after = PT_0
+        lot_heading.paragraph_format.space_before = PT_0
         lot_heading.paragraph_format.line_spacing = 1.5
         
         # Add LOT field code directly
@@ -9406,7 +10436,7 @@ class WordGenerator:
         # Add the instruction text
         run_instr = paragraph.add_run("Right click and update field to get list of tables")
         run_instr.font.name = 'Times New Roman'
-        run_instr.font.size = Pt(12)
+        run_instr.font.size = PT_12
         run_instr.font.bold = True
         run_instr.font.color.rgb = RGBColor(68, 114, 196) # Word Blue
         
@@ -9441,14 +10471,14 @@ class WordGenerator:
         """
         para = self.doc.add_paragraph()
         para.alignment = WD_ALIGN_PARAGRAPH.CENTER if center else WD_ALIGN_PARAGRAPH.LEFT
-        para.paragraph_format.space_before = Pt(6)
-        para.paragraph_format.space_after = Pt(12)
+        para.paragraph_format.space_before = PT_6
+        para.paragraph_format.space_after = PT_12
         para.paragraph_format.line_spacing = 1.5
         
         # Add "Table " text
         run1 = para.add_run('Table ')
         run1.font.name = 'Times New Roman'
-        run1.font.size = Pt(12)
+        run1.font.size = PT_12
         run1.font.bold = True
         run1.font.color.rgb = RGBColor(0, 0, 0)
         
@@ -9482,14 +10512,14 @@ class WordGenerator:
         
         # Style the SEQ field run
         run_seq.font.name = 'Times New Roman'
-        run_seq.font.size = Pt(12)
+        run_seq.font.size = PT_12
         run_seq.font.bold = True
         run_seq.font.color.rgb = RGBColor(0, 0, 0)
         
         # Add colon and title
         run2 = para.add_run(f': {title}')
         run2.font.name = 'Times New Roman'
-        run2.font.size = Pt(12)
+        run2.font.size = PT_12
         run2.font.bold = True
         run2.font.color.rgb = RGBColor(0, 0, 0)
         
@@ -9514,14 +10544,14 @@ class WordGenerator:
         """
         para = self.doc.add_paragraph()
         para.alignment = WD_ALIGN_PARAGRAPH.CENTER if center else WD_ALIGN_PARAGRAPH.LEFT
-        para.paragraph_format.space_before = Pt(6)
-        para.paragraph_format.space_after = Pt(12)
+        para.paragraph_format.space_before = PT_6
+        para.paragraph_format.space_after = PT_12
         para.paragraph_format.line_spacing = 1.5
         
         # Add "Figure " text
         run1 = para.add_run('Figure ')
         run1.font.name = 'Times New Roman'
-        run1.font.size = Pt(12)
+        run1.font.size = PT_12
         run1.font.italic = True
         run1.font.color.rgb = RGBColor(0, 0, 0)
         
@@ -9555,21 +10585,21 @@ class WordGenerator:
         
         # Style the SEQ field run (same approach as table captions)
         run_seq.font.name = 'Times New Roman'
-        run_seq.font.size = Pt(12)
+        run_seq.font.size = PT_12
         run_seq.font.italic = True
         run_seq.font.color.rgb = RGBColor(0, 0, 0)
         
         # Add ": " separator
         run2 = para.add_run(': ')
         run2.font.name = 'Times New Roman'
-        run2.font.size = Pt(12)
+        run2.font.size = PT_12
         run2.font.italic = True
         run2.font.color.rgb = RGBColor(0, 0, 0)
         
         # Add the caption title
         run3 = para.add_run(title)
         run3.font.name = 'Times New Roman'
-        run3.font.size = Pt(12)
+        run3.font.size = PT_12
         run3.font.italic = True
         run3.font.color.rgb = RGBColor(0, 0, 0)
         
@@ -9608,14 +10638,14 @@ class WordGenerator:
         
         # Add formatted caption with SEQ field
         para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        para.paragraph_format.space_before = Pt(6)
-        para.paragraph_format.space_after = Pt(12)
+        para.paragraph_format.space_before = PT_6
+        para.paragraph_format.space_after = PT_12
         para.paragraph_format.line_spacing = 1.5
         
         # Add "Figure " text
         run1 = para.add_run('Figure ')
         run1.font.name = 'Times New Roman'
-        run1.font.size = Pt(12)
+        run1.font.size = PT_12
         run1.font.italic = True
         run1.font.color.rgb = RGBColor(0, 0, 0)
         
@@ -9647,7 +10677,7 @@ class WordGenerator:
         # Add ": " and title
         run2 = para.add_run(': ' + title)
         run2.font.name = 'Times New Roman'
-        run2.font.size = Pt(12)
+        run2.font.size = PT_12
         run2.font.italic = True
         run2.font.color.rgb = RGBColor(0, 0, 0)
         
@@ -9810,19 +10840,19 @@ class WordGenerator:
             # Create paragraph for image with minimal spacing to fit on page
             para = self.doc.add_paragraph()
             para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            para.paragraph_format.space_before = Pt(6)  # Reduced spacing
-            para.paragraph_format.space_after = Pt(3)   # Reduced spacing
+            para.paragraph_format.space_before = PT_6  # Reduced spacing
+            para.paragraph_format.space_after = PT_3   # Reduced spacing
             para.paragraph_format.keep_with_next = True  # Keep with caption if present
             
             # Add image from bytes
             run = para.add_run()
             
             # Create BytesIO stream from image data
-            image_stream = BytesIO(img_data['data'])
+            image_stream = BytesIO(img_data.part.blob)
             
             # Determine width and height - preserve original dimensions
-            width = img_data.get('width', 4.0)
-            height = img_data.get('height', 3.0)
+            width = img_data.width
+            height = img_data.height
             
             # Store original for logging
             original_width, original_height = width, height
@@ -9852,18 +10882,18 @@ class WordGenerator:
             # Add picture to document
             run.add_picture(image_stream, width=Inches(width), height=Inches(height))
             
-            logger.info(f"Inserted image {image_id} ({width:.2f}x{height:.2f} inches)")
+            logger.debug("Inserted image %s (%.2fx%.2f inches)", image_id, width, height)
             
             # Add caption if exists
-            if img_data.get('caption'):
+            if img_data.caption:
                 caption_para = self.doc.add_paragraph()
-                caption_run = caption_para.add_run(img_data['caption'])
+                caption_run = caption_para.add_run(img_data.caption)
                 caption_run.italic = True
                 caption_run.font.name = 'Times New Roman'
                 caption_run.font.size = Pt(10)
                 caption_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                caption_para.paragraph_format.space_before = Pt(0)
-                caption_para.paragraph_format.space_after = Pt(6)  # Reduced spacing
+                caption_para.paragraph_format.space_before = PT_0
+                caption_para.paragraph_format.space_after = PT_6  # Reduced spacing
             
         except Exception as e:
             logger.error(f"Error inserting image {image_id}: {str(e)}")
@@ -9937,7 +10967,7 @@ class WordGenerator:
         # Ensure heading is bold, black, Times New Roman, 12pt
         for run in heading.runs:
             run.font.name = 'Times New Roman'
-            run.font.size = Pt(12)
+            run.font.size = PT_12
             run.font.bold = True
             run.font.color.rgb = RGBColor(0, 0, 0)  # Black
         
@@ -9964,9 +10994,9 @@ class WordGenerator:
         for run in heading.runs:
             run.bold = True
             run.font.name = 'Times New Roman'
-            run.font.size = Pt(12)
+            run.font.size = PT_12
             run.font.color.rgb = RGBColor(0, 0, 0)
-        heading.paragraph_format.space_after = Pt(0)
+        heading.paragraph_format.space_after = PT_0
         heading.paragraph_format.line_spacing = 1.5
         
         # Add chapter title if present (centered, bold)
@@ -9976,13 +11006,13 @@ class WordGenerator:
             for run in title_para.runs:
                 run.bold = True
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 run.font.color.rgb = RGBColor(0, 0, 0)
-            title_para.paragraph_format.space_before = Pt(0)
-            title_para.paragraph_format.space_after = Pt(0)
+            title_para.paragraph_format.space_before = PT_0
+            title_para.paragraph_format.space_after = PT_0
             title_para.paragraph_format.line_spacing = 1.5
         else:
-            heading.paragraph_format.space_after = Pt(0)
+            heading.paragraph_format.space_after = PT_0
         
         # Add content
         self._add_section_content(section)
@@ -10010,9 +11040,9 @@ class WordGenerator:
         for run in heading.runs:
             run.bold = True
             run.font.name = 'Times New Roman'
-            run.font.size = Pt(12)
+            run.font.size = PT_12
             run.font.color.rgb = RGBColor(0, 0, 0)
-        heading.paragraph_format.space_after = Pt(0)
+        heading.paragraph_format.space_after = PT_0
         heading.paragraph_format.line_spacing = 1.5
         
         # Add content based on front matter type
@@ -10046,9 +11076,9 @@ class WordGenerator:
             run = para.add_run(text)
             run.italic = False
             run.font.name = 'Times New Roman'
-            run.font.size = Pt(12)
+            run.font.size = PT_12
             para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            para.paragraph_format.space_before = Pt(12)  # Reduced spacing
+            para.paragraph_format.space_before = PT_12  # Reduced spacing
             para.paragraph_format.line_spacing = 1.5
     
     def _add_declaration_content(self, section):
@@ -10066,7 +11096,7 @@ class WordGenerator:
                 para = self.doc.add_paragraph()
                 run = para.add_run(text if text else '________________________')
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
                 para.paragraph_format.space_before = Pt(36)
                 para.paragraph_format.line_spacing = 1.5
@@ -10074,12 +11104,12 @@ class WordGenerator:
                 # Regular paragraph (block paragraph - no indent)
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
         
         # Add signature line if not already present
         if not has_signature:
@@ -10094,17 +11124,17 @@ class WordGenerator:
             sig_para.paragraph_format.line_spacing = 1.5
             for run in sig_para.runs:
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
             
             # Date line
             date_para = self.doc.add_paragraph()
             date_para.add_run('Date: ________________________')
             date_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            date_para.paragraph_format.space_before = Pt(12)
+            date_para.paragraph_format.space_before = PT_12
             date_para.paragraph_format.line_spacing = 1.5
             for run in date_para.runs:
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
     
     def _add_certification_content(self, section):
         """Add certification content with multiple signature lines"""
@@ -10118,19 +11148,19 @@ class WordGenerator:
                 para = self.doc.add_paragraph()
                 run = para.add_run(text if text else '________________________')
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
                 para.paragraph_format.space_before = Pt(24)
                 para.paragraph_format.line_spacing = 1.5
             else:
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
         
         # Add multiple signature blocks for committee members
         self.doc.add_paragraph()  # Blank line
@@ -10148,11 +11178,11 @@ class WordGenerator:
                 para = self.doc.add_paragraph()
                 para.add_run(sig_text)
                 para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-                para.paragraph_format.space_before = Pt(6)
+                para.paragraph_format.space_before = PT_6
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             else:
                 self.doc.add_paragraph()  # Empty line between signature blocks
     
@@ -10164,12 +11194,12 @@ class WordGenerator:
             text = item.get('text', '')
             para = self.doc.add_paragraph(text)
             para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            para.paragraph_format.left_indent = Pt(0)
-            para.paragraph_format.first_line_indent = Pt(0)
+            para.paragraph_format.left_indent = PT_0
+            para.paragraph_format.first_line_indent = PT_0
             para.paragraph_format.line_spacing = 1.5
             for run in para.runs:
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
     
     def _add_abstract_content(self, section):
         """Add abstract content with Keywords section"""
@@ -10185,21 +11215,21 @@ class WordGenerator:
                 run = para.add_run('Keywords: ')
                 run.bold = True
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 # Extract keywords (after "Keywords:")
                 keywords = re.sub(r'^[Kk]eywords?\s*[:\-]\s*', '', text)
                 para.add_run(keywords)
-                para.paragraph_format.space_before = Pt(12)
+                para.paragraph_format.space_before = PT_12
                 para.paragraph_format.line_spacing = 1.5
             else:
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
     
     def _add_toc_content(self, section):
         """Add Table of Contents entries with dot leaders"""
@@ -10227,13 +11257,13 @@ class WordGenerator:
                     
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             else:
                 para = self.doc.add_paragraph(text)
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
     
     def _add_list_section_content(self, section):
         """Add content for List of Tables, List of Figures, Abbreviations, Glossary sections."""
@@ -10274,7 +11304,7 @@ class WordGenerator:
             
             for run in para.runs:
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
     
     def _format_single_apa_reference(self, text):
         """Apply APA formatting rules to a single reference string."""
@@ -10365,7 +11395,7 @@ class WordGenerator:
                 # Explicitly set font for all runs to ensure consistency after merge
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'table_caption':
                 # Explicit table caption type
@@ -10387,7 +11417,7 @@ class WordGenerator:
                         for run in para.runs:
                             run.bold = True
                             run.font.name = 'Times New Roman'
-                            run.font.size = Pt(12)
+                            run.font.size = PT_12
                 self.has_tables = True
                 continue
             
@@ -10411,7 +11441,7 @@ class WordGenerator:
                         for run in para.runs:
                             run.italic = True
                             run.font.name = 'Times New Roman'
-                            run.font.size = Pt(12)
+                            run.font.size = PT_12
                 self.has_figures = True
                 continue
             
@@ -10420,11 +11450,11 @@ class WordGenerator:
                 run = para.add_run(f"{item.get('term', '')}: ")
                 run.bold = True
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 if item.get('definition'):
                     run_def = para.add_run(item.get('definition', ''))
                     run_def.font.name = 'Times New Roman'
-                    run_def.font.size = Pt(12)
+                    run_def.font.size = PT_12
             
             elif item.get('type') == 'bullet_list':
                 # Process items to determine nesting
@@ -10465,11 +11495,11 @@ class WordGenerator:
                         # Level 2: 0.5 inch left indent
                         
                         if is_nested:
-                            para.paragraph_format.left_indent = Inches(0.5)
-                            para.paragraph_format.first_line_indent = Inches(-0.25)
+                            para.paragraph_format.left_indent = INCH_HALF
+                            para.paragraph_format.first_line_indent = INCH_NEG_QUARTER
                         else:
-                            para.paragraph_format.left_indent = Inches(0.25)
-                            para.paragraph_format.first_line_indent = Inches(-0.25)
+                            para.paragraph_format.left_indent = INCH_QUARTER
+                            para.paragraph_format.first_line_indent = INCH_NEG_QUARTER
                         
                         # Apply custom bullet formatting if possible
                         # Note: Word's bullet formatting is complex via python-docx. 
@@ -10489,26 +11519,26 @@ class WordGenerator:
                             # Add bullet run
                             run_bullet = para.add_run('■\t')
                             run_bullet.font.name = 'Arial'
-                            run_bullet.font.size = Pt(12)
+                            run_bullet.font.size = PT_12
                             
                             # Add content run
                             run_text = para.add_run(content)
                             run_text.font.name = 'Times New Roman'
-                            run_text.font.size = Pt(12)
+                            run_text.font.size = PT_12
                             
                             # Set indentation for manual bullet
                             if is_nested:
                                 para.paragraph_format.tab_stops.add_tab_stop(Inches(0.75))
                                 para.paragraph_format.left_indent = Inches(0.75)
-                                para.paragraph_format.first_line_indent = Inches(-0.25)
+                                para.paragraph_format.first_line_indent = INCH_NEG_QUARTER
                             else:
-                                para.paragraph_format.tab_stops.add_tab_stop(Inches(0.5))
-                                para.paragraph_format.left_indent = Inches(0.5)
-                                para.paragraph_format.first_line_indent = Inches(-0.25)
+                                para.paragraph_format.tab_stops.add_tab_stop(INCH_HALF)
+                                para.paragraph_format.left_indent = INCH_HALF
+                                para.paragraph_format.first_line_indent = INCH_NEG_QUARTER
                         else:
                             for run in para.runs:
                                 run.font.name = 'Times New Roman'
-                                run.font.size = Pt(12)
+                                run.font.size = PT_12
                             
                         previous_indent = current_indent
                 else:
@@ -10518,7 +11548,7 @@ class WordGenerator:
                         para = self.doc.add_paragraph(content, style='List Bullet')
                         for run in para.runs:
                             run.font.name = 'Times New Roman'
-                            run.font.size = Pt(12)
+                            run.font.size = PT_12
             
             elif item.get('type') == 'numbered_list':
                 for list_item in item.get('items', []):
@@ -10531,7 +11561,7 @@ class WordGenerator:
                     para = self.doc.add_paragraph(content_to_add, style='List Number')
                     for run in para.runs:
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
             
             elif item.get('type') == 'table':
                 self._add_table(item)
@@ -10557,17 +11587,17 @@ class WordGenerator:
                             for run in para.runs:
                                 run.italic = True
                                 run.font.name = 'Times New Roman'
-                                run.font.size = Pt(12)
+                                run.font.size = PT_12
                 self.has_figures = True
             
             elif item.get('type') == 'quote':
                 para = self.doc.add_paragraph(item.get('text', ''))
-                para.paragraph_format.left_indent = Inches(0.5)
-                para.paragraph_format.right_indent = Inches(0.5)
+                para.paragraph_format.left_indent = INCH_HALF
+                para.paragraph_format.right_indent = INCH_HALF
                 for run in para.runs:
                     run.italic = True
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'equation':
                 para = self.doc.add_paragraph(item.get('label', ''))
@@ -10583,18 +11613,18 @@ class WordGenerator:
                     if not part: continue
                     run = para.add_run(part)
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     if i % 2 == 1:  # Odd parts are between * markers -> italic
                         run.italic = True
                 
                 # Only apply hanging indent for references in the references section
                 if is_references_section:
-                    para.paragraph_format.left_indent = Inches(0.5)
+                    para.paragraph_format.left_indent = INCH_HALF
                     para.paragraph_format.first_line_indent = Inches(-0.5)
                 else:
                     # In-text reference citations - no indent
-                    para.paragraph_format.left_indent = Pt(0)
-                    para.paragraph_format.first_line_indent = Pt(0)
+                    para.paragraph_format.left_indent = PT_0
+                    para.paragraph_format.first_line_indent = PT_0
                 para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
                 para.paragraph_format.line_spacing = 1.5
             
@@ -10604,12 +11634,12 @@ class WordGenerator:
                 # Page metadata - centered, italic
                 para = self.doc.add_paragraph(item.get('text', ''))
                 para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run.font.italic = True
             
             elif item.get('type') == 'academic_metadata':
@@ -10620,35 +11650,35 @@ class WordGenerator:
                     # Author names - centered, bold
                     para = self.doc.add_paragraph(text)
                     para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    para.paragraph_format.left_indent = Pt(0)
-                    para.paragraph_format.first_line_indent = Pt(0)
+                    para.paragraph_format.left_indent = PT_0
+                    para.paragraph_format.first_line_indent = PT_0
                     para.paragraph_format.line_spacing = 1.5
                     for run in para.runs:
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
                         run.font.bold = True
                 elif subtype == 'affiliation':
                     # Affiliation - normal text, centered
                     para = self.doc.add_paragraph(text)
                     para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    para.paragraph_format.left_indent = Pt(0)
-                    para.paragraph_format.first_line_indent = Pt(0)
-                    para.paragraph_format.space_after = Pt(6)
+                    para.paragraph_format.left_indent = PT_0
+                    para.paragraph_format.first_line_indent = PT_0
+                    para.paragraph_format.space_after = PT_6
                 elif subtype == 'contact':
                     # Contact info - centered
                     para = self.doc.add_paragraph(text)
                     para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    para.paragraph_format.left_indent = Pt(0)
-                    para.paragraph_format.first_line_indent = Pt(0)
+                    para.paragraph_format.left_indent = PT_0
+                    para.paragraph_format.first_line_indent = PT_0
                     para.paragraph_format.line_spacing = 1.5
                     for run in para.runs:
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
                 else:
                     para = self.doc.add_paragraph(text)
                     para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    para.paragraph_format.left_indent = Pt(0)
-                    para.paragraph_format.first_line_indent = Pt(0)
+                    para.paragraph_format.left_indent = PT_0
+                    para.paragraph_format.first_line_indent = PT_0
             
             elif item.get('type') == 'math_expression':
                 subtype = item.get('subtype', 'inline_math')
@@ -10664,23 +11694,23 @@ class WordGenerator:
                     # Display math - centered, with spacing
                     para = self.doc.add_paragraph(clean_text.strip())
                     para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    para.paragraph_format.left_indent = Pt(0)
-                    para.paragraph_format.first_line_indent = Pt(0)
-                    para.paragraph_format.space_before = Pt(12)
-                    para.paragraph_format.space_after = Pt(12)
+                    para.paragraph_format.left_indent = PT_0
+                    para.paragraph_format.first_line_indent = PT_0
+                    para.paragraph_format.space_before = PT_12
+                    para.paragraph_format.space_after = PT_12
                     para.paragraph_format.line_spacing = 1.5
                     for run in para.runs:
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
                 else:
                     # Inline math - just add as text
                     para = self.doc.add_paragraph(text)
-                    para.paragraph_format.left_indent = Pt(0)
-                    para.paragraph_format.first_line_indent = Pt(0)
+                    para.paragraph_format.left_indent = PT_0
+                    para.paragraph_format.first_line_indent = PT_0
                     para.paragraph_format.line_spacing = 1.5
                     for run in para.runs:
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
             
             elif item.get('type') == 'footnote_endnote':
                 subtype = item.get('subtype', 'footnote_entry')
@@ -10689,17 +11719,17 @@ class WordGenerator:
                 if subtype == 'footnote_entry':
                     # Footnote entry - hanging indent
                     para = self.doc.add_paragraph(text)
-                    para.paragraph_format.left_indent = Inches(0.5)
-                    para.paragraph_format.first_line_indent = Inches(-0.25)
+                    para.paragraph_format.left_indent = INCH_HALF
+                    para.paragraph_format.first_line_indent = INCH_NEG_QUARTER
                     para.paragraph_format.line_spacing = 1.5
                     for run in para.runs:
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
                 else:
                     para = self.doc.add_paragraph(text)
                     for run in para.runs:
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
             
             elif item.get('type') == 'inline_formatting':
                 text = item.get('text', '')
@@ -10707,8 +11737,8 @@ class WordGenerator:
                 
                 # Parse the text and apply formatting
                 para = self.doc.add_paragraph()
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 
                 if formatting.get('bold_italic'):
                     # Remove *** or ___ markers and apply both bold and italic
@@ -10716,7 +11746,7 @@ class WordGenerator:
                     clean_text = re.sub(r'___(.+?)___', r'\1', clean_text)
                     run = para.add_run(clean_text)
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run.bold = True
                     run.italic = True
                 elif formatting.get('bold'):
@@ -10725,7 +11755,7 @@ class WordGenerator:
                     clean_text = re.sub(r'__(.+?)__', r'\1', clean_text)
                     run = para.add_run(clean_text)
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run.bold = True
                 elif formatting.get('italic'):
                     # Remove * or _ markers and apply italic
@@ -10733,14 +11763,14 @@ class WordGenerator:
                     clean_text = re.sub(r'_(.+?)_', r'\1', clean_text)
                     run = para.add_run(clean_text)
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run.italic = True
                 else:
                     # Remove all formatting markers as fallback
                     clean_text = re.sub(r'[\*_]{1,3}(.+?)[\*_]{1,3}', r'\1', text)
                     run = para.add_run(clean_text)
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             # ================================================================
             # NEW 20 ACADEMIC PATTERN RENDERING (December 30, 2025)
@@ -10755,7 +11785,7 @@ class WordGenerator:
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     if subtype == 'figure_caption':
                         run.bold = True
             
@@ -10764,11 +11794,11 @@ class WordGenerator:
                 text = item.get('text', '')
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'appendix':
                 # Appendix section - similar to heading but with distinct style
@@ -10777,7 +11807,7 @@ class WordGenerator:
                 heading.paragraph_format.line_spacing = 1.5
                 for run in heading.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run.font.bold = True
                     run.font.color.rgb = RGBColor(0, 0, 0)  # Black
             
@@ -10787,14 +11817,14 @@ class WordGenerator:
                 # Remove leading > markers
                 clean_text = re.sub(r'^[>\s]+', '', text)
                 para = self.doc.add_paragraph(clean_text)
-                para.paragraph_format.left_indent = Inches(0.5)
-                para.paragraph_format.right_indent = Inches(0.5)
-                para.paragraph_format.space_before = Pt(6)
-                para.paragraph_format.space_after = Pt(6)
+                para.paragraph_format.left_indent = INCH_HALF
+                para.paragraph_format.right_indent = INCH_HALF
+                para.paragraph_format.space_before = PT_6
+                para.paragraph_format.space_after = PT_6
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run.italic = True
             
             elif item.get('type') == 'math_model':
@@ -10802,27 +11832,27 @@ class WordGenerator:
                 text = item.get('text', '')
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 para.paragraph_format.space_before = Pt(8)
                 para.paragraph_format.space_after = Pt(8)
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'text_emphasis':
                 # Text emphasis - bold/italic/underline
                 text = item.get('text', '')
                 subtype = item.get('subtype', 'bold')
                 para = self.doc.add_paragraph()
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 # Clean formatting markers
                 clean_text = re.sub(r'[\*_~]{1,3}(.+?)[\*_~]{1,3}', r'\1', text)
                 run = para.add_run(clean_text)
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 if 'bold' in subtype:
                     run.bold = True
                 if 'italic' in subtype:
@@ -10835,27 +11865,27 @@ class WordGenerator:
                 text = item.get('text', '')
                 page_num = item.get('page_number', '')
                 para = self.doc.add_paragraph()
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 run = para.add_run(text)
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 if page_num:
                     para.add_run('\t')
                     run_num = para.add_run(str(page_num))
                     run_num.font.name = 'Times New Roman'
-                    run_num.font.size = Pt(12)
+                    run_num.font.size = PT_12
             
             elif item.get('type') == 'footnote_marker':
                 # Footnote marker / reference
                 text = item.get('text', '')
                 para = self.doc.add_paragraph(text)
-                para.paragraph_format.left_indent = Inches(0.5)
-                para.paragraph_format.first_line_indent = Inches(-0.25)
+                para.paragraph_format.left_indent = INCH_HALF
+                para.paragraph_format.first_line_indent = INCH_NEG_QUARTER
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'abbreviation':
                 # Abbreviation definition
@@ -10868,27 +11898,27 @@ class WordGenerator:
                     run = para.add_run(abbr)
                     run.bold = True
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run_def = para.add_run(f' – {defn}')
                     run_def.font.name = 'Times New Roman'
-                    run_def.font.size = Pt(12)
+                    run_def.font.size = PT_12
                 else:
                     run = para.add_run(text)
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'caption_format':
                 # Figure/table caption formatting
                 text = item.get('text', '')
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
-                para.paragraph_format.space_before = Pt(6)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
+                para.paragraph_format.space_before = PT_6
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'page_break':
                 # Insert page break
@@ -10899,12 +11929,12 @@ class WordGenerator:
                 text = item.get('text', '')
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'questionnaire':
                 # Questionnaire item
@@ -10912,14 +11942,14 @@ class WordGenerator:
                 subtype = item.get('subtype', 'question_item')
                 if subtype == 'likert_scale':
                     para = self.doc.add_paragraph(text)
-                    para.paragraph_format.left_indent = Inches(0.5)
+                    para.paragraph_format.left_indent = INCH_HALF
                     para.paragraph_format.line_spacing = 1.5
                 else:
                     para = self.doc.add_paragraph(text)
                     para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'glossary_entry':
                 # Glossary entry - term in bold, definition follows
@@ -10930,39 +11960,39 @@ class WordGenerator:
                     run = para.add_run(term)
                     run.bold = True
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run_def = para.add_run(': ' + definition if definition else '')
                     run_def.font.name = 'Times New Roman'
-                    run_def.font.size = Pt(12)
+                    run_def.font.size = PT_12
                 else:
                     run = para.add_run(definition)
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
-                para.paragraph_format.left_indent = Inches(0.25)
-                para.paragraph_format.first_line_indent = Inches(-0.25)
+                    run.font.size = PT_12
+                para.paragraph_format.left_indent = INCH_QUARTER
+                para.paragraph_format.first_line_indent = INCH_NEG_QUARTER
             
             elif item.get('type') == 'cross_reference':
                 # Cross-reference - render as normal text
                 text = item.get('text', '')
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'running_header':
                 # Running header - typically in document header
                 text = item.get('text', '')
                 para = self.doc.add_paragraph(text)
                 para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                para.paragraph_format.left_indent = Pt(0)
-                para.paragraph_format.first_line_indent = Pt(0)
+                para.paragraph_format.left_indent = PT_0
+                para.paragraph_format.first_line_indent = PT_0
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'nested_list':
                 # Nested list with indent levels
@@ -10972,7 +12002,7 @@ class WordGenerator:
                     para.paragraph_format.left_indent = Inches(0.25 + (0.25 * indent))
                     for run in para.runs:
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
             
             # ================================================================
             # DISSERTATION-SPECIFIC CONTENT RENDERING (December 30, 2025)
@@ -10984,7 +12014,7 @@ class WordGenerator:
                 para = self.doc.add_paragraph()
                 run = para.add_run(text)
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 run.italic = True
                 para.alignment = WD_ALIGN_PARAGRAPH.CENTER
                 para.paragraph_format.line_spacing = 1.5
@@ -11002,7 +12032,7 @@ class WordGenerator:
                 para.paragraph_format.line_spacing = 1.5
                 for run in para.runs:
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
             
             elif item.get('type') == 'chapter_title':
                 # Chapter title - centered, bold (heading level 1)
@@ -11012,10 +12042,10 @@ class WordGenerator:
                 for run in para.runs:
                     run.bold = True
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                     run.font.color.rgb = RGBColor(0, 0, 0)
-                para.paragraph_format.space_before = Pt(0)
-                para.paragraph_format.space_after = Pt(0)
+                para.paragraph_format.space_before = PT_0
+                para.paragraph_format.space_after = PT_0
                 para.paragraph_format.line_spacing = 1.5
             
             # ================================================================
@@ -11043,13 +12073,13 @@ class WordGenerator:
                     run = para.add_run(clean_text)
                     run.bold = True
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                 elif key_point_type == 'example':
                     # Italic for examples
                     run = para.add_run(clean_text)
                     run.italic = True
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                 elif key_point_type == 'definition':
                     # Bold with definition format
                     # Try to extract term and definition
@@ -11058,27 +12088,27 @@ class WordGenerator:
                         term_run = para.add_run(parts[0] + ':')
                         term_run.bold = True
                         term_run.font.name = 'Times New Roman'
-                        term_run.font.size = Pt(12)
+                        term_run.font.size = PT_12
                         if len(parts) > 1:
                             defn_run = para.add_run(' ' + parts[1].strip())
                             defn_run.font.name = 'Times New Roman'
-                            defn_run.font.size = Pt(12)
+                            defn_run.font.size = PT_12
                     else:
                         run = para.add_run(clean_text)
                         run.bold = True
                         run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        run.font.size = PT_12
                 else:
                     # Default: bold
                     run = para.add_run(clean_text)
                     run.bold = True
                     run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
+                    run.font.size = PT_12
                 
                 para.alignment = WD_ALIGN_PARAGRAPH.LEFT
                 para.paragraph_format.line_spacing = 1.5
-                para.paragraph_format.space_before = Pt(6)
-                para.paragraph_format.space_after = Pt(6)
+                para.paragraph_format.space_before = PT_6
+                para.paragraph_format.space_after = PT_6
             
             elif item.get('type') == 'assignment_header_field':
                 # Assignment header field (Student Name, Course, etc.) - bold
@@ -11087,10 +12117,10 @@ class WordGenerator:
                 run = para.add_run(text)
                 run.bold = True
                 run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                run.font.size = PT_12
                 para.alignment = WD_ALIGN_PARAGRAPH.LEFT
                 para.paragraph_format.line_spacing = 1.5
-                para.paragraph_format.space_after = Pt(3)
+                para.paragraph_format.space_after = PT_3
     
     def _add_table(self, table_data):
         """Add a table with academic formatting (proper alignment, column sizing)"""
@@ -11117,9 +12147,9 @@ class WordGenerator:
                     caption_run = caption.add_run(caption_text)
                     caption_run.bold = True
                     caption_run.font.name = 'Times New Roman'
-                    caption_run.font.size = Pt(12)
+                    caption_run.font.size = PT_12
                     caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    caption.paragraph_format.space_after = Pt(6)
+                    caption.paragraph_format.space_after = PT_6
         
         # Add table
         if table_data.get('rows') and len(table_data['rows']) > 0:
@@ -11159,7 +12189,7 @@ class WordGenerator:
                 # Total table width (in inches) - standard page width minus margins
                 total_table_width = Inches(6.0)
                 # Minimum column width
-                min_col_width = Inches(0.5)
+                min_col_width = INCH_HALF
                 
                 # Set column widths proportionally
                 for col_idx in range(num_cols):
@@ -11186,7 +12216,7 @@ class WordGenerator:
                                 # Set font for all runs
                                 for run in paragraph.runs:
                                     run.font.name = 'Times New Roman'
-                                    run.font.size = Pt(12)
+                                    run.font.size = PT_12
                                 
                                 # Header row (row 0): centered and bold
                                 if row_idx == 0:
@@ -11205,7 +12235,7 @@ class WordGenerator:
         
         # Add spacing after table
         spacing = self.doc.add_paragraph()
-        spacing.paragraph_format.space_before = Pt(6)
+        spacing.paragraph_format.space_before = PT_6
 
 
 # Flask Routes
@@ -11221,6 +12251,134 @@ def health_check():
     })
 
 
+def format_document_file(input_path, filename, job_id):
+    """
+    Run the formatting pipeline on one saved upload: process it, write
+    {job_id}_formatted.docx and record the smart filename in its metadata.
+    Touches only files (no Flask request or database state), so it can run in
+    a worker process.
+    
+    Returns:
+        dict: The JSON response body for the job
+    """
+    file_ext = os.path.splitext(filename)[1].lower()
+    
+    # Process document
+    processor = DocumentProcessor()
+    images = []  # Extracted images
+    
+    if file_ext == '.docx':
+        # Robust unpacking to handle both dict and tuple returns
+        proc_result = processor.process_docx(input_path)
+        if isinstance(proc_result, tuple) and len(proc_result) == 2:
+            result, images = proc_result
+        else:
+            result = proc_result
+            images = []
+        logger.info(f"Processed document with {len(images)} images")
+    else:
+        # Read as text (txt, md, etc.) - no images in plain text
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+        # Robust unpacking for text processing too
+        proc_result = processor.process_text(text)
+        if isinstance(proc_result, tuple) and len(proc_result) == 2:
+            result, images = proc_result
+        else:
+            result = proc_result
+            images = []
+    
+    # Validate result format
+    if not isinstance(result, dict) or 'structured' not in result:
+        logger.error(f"Invalid processing result format: {type(result)}")
+        raise ValueError('Document processing failed to produce structured data')
+    
+    # Generate smart filename
+    smart_filename = processor.generate_smart_filename(result['structured'], filename)
+    logger.info(f"Generated smart filename: {smart_filename}")
+    
+    # Update metadata with smart filename
+    try:
+        meta_path = os.path.join(OUTPUT_FOLDER, f"{job_id}_meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                metadata = json.load(f)
+            
+            metadata['smart_filename'] = smart_filename
+            
+            with open(meta_path, 'w') as f:
+                json.dump(metadata, f)
+    except Exception as e:
+        logger.error(f"Failed to update metadata with smart filename: {e}")
+    
+    # Generate formatted Word document with images
+    output_path = os.path.join(_ensure_dir(OUTPUT_FOLDER), f"{job_id}_formatted.docx")
+    generator = WordGenerator()
+    
+    # Pass cover page data and certification data if detected
+    cover_page_data = getattr(processor, 'cover_page_data', None)
+    certification_data = getattr(processor, 'certification_data', None)
+    generator.generate(
+        result['structured'], 
+        output_path, 
+        images=images,
+        cover_page_data=cover_page_data,
+        certification_data=certification_data
+    )
+    
+    # Generate preview markdown
+    preview = generate_preview_markdown(result['structured'])
+    
+    # Add image count to stats
+    result['stats']['images'] = len(images)
+    
+    return {
+        'job_id': job_id,
+        'stats': result['stats'],
+        'structured': result['structured'],
+        'preview': preview,
+        'download_url': f'/download/{job_id}',
+        'status': 'complete',
+        'images_preserved': len(images),
+        'filename': f"{smart_filename}.docx"
+    }
+
+
+def _format_document_job(input_path, filename, job_id):
+    """Worker entry point for /format_batch; always removes the input file."""
+    try:
+        return format_document_file(input_path, filename, job_id)
+    finally:
+        if os.path.exists(input_path):
+            try:
+                os.remove(input_path)
+            except:
+                pass
+
+
+# Process pool for /format_batch, created on first use. Processes rather than
+# threads: the formatter is CPU-bound Python and lxml work that holds the GIL.
+# TOC/LOF/LOT are left to Word on open (w:updateFields), so workers never
+# contend for a Word instance.
+FORMAT_WORKERS = int(os.environ.get('FORMAT_WORKERS', '0')) or os.cpu_count() or 1
+_format_pool = None
+_format_pool_lock = threading.Lock()
+
+
+def _get_format_pool():
+    global _format_pool
+    with _format_pool_lock:
+        if _format_pool is None:
+            _format_pool = ProcessPoolExecutor(max_workers=FORMAT_WORKERS)
+        return _format_pool
+
+
+@atexit.register
+def _shutdown_format_pool():
+    if _format_pool is not None:
+        _format_pool.shutdown(wait=False, cancel_futures=True)
+
+
 @app.route('/upload', methods=['POST'])
 @login_required
 def upload_document():
@@ -11230,28 +12388,37 @@ def upload_document():
         current_user.documents_generated += 1
         db.session.commit()
 
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file uploaded'}), 400
-    
-    file = request.files['file']
-    if file.filename == '':
+    # Raw uploads (body is the file itself) skip multipart parsing entirely
+    raw_upload = request.mimetype == 'application/octet-stream'
+    if raw_upload:
+        filename = request.args.get('filename') or request.headers.get('X-Filename', '')
+    else:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file uploaded'}), 400
+        file = request.files['file']
+        filename = file.filename
+    if filename == '':
         return jsonify({'error': 'Empty filename'}), 400
     
     # Generate unique ID
-    job_id = str(uuid.uuid4())
-    
-    # Save uploaded file
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    input_path = os.path.join(UPLOAD_FOLDER, f"{job_id}{file_ext}")
-    file.save(input_path)
+    job_id = secrets.token_hex(16)
+    
+    # Save uploaded file, copying in large chunks
+    file_ext = os.path.splitext(filename)[1].lower()
+    input_path = os.path.join(_ensure_dir(UPLOAD_FOLDER), f"{job_id}{file_ext}")
+    if raw_upload:
+        with open(input_path, 'wb') as f:
+            shutil.copyfileobj(request.stream, f, UPLOAD_BUFFER_SIZE)
+    else:
+        file.save(input_path, buffer_size=UPLOAD_BUFFER_SIZE)
     
     # Save metadata
     try:
         metadata = {
-            'original_filename': file.filename,
+            'original_filename': filename,
             'upload_time': datetime.now().isoformat()
         }
-        with open(os.path.join(OUTPUT_FOLDER, f"{job_id}_meta.json"), 'w') as f:
+        with open(os.path.join(_ensure_dir(OUTPUT_FOLDER), f"{job_id}_meta.json"), 'w') as f:
             json.dump(metadata, f)
             
         # Create DocumentRecord
@@ -11262,8 +12429,8 @@ def upload_document():
             # We'll update the filename after processing if possible, or just use job_id logic
             doc_record = DocumentRecord(
                 user_id=current_user.id,
-                filename=f"formatted_{file.filename}", # Predicted filename
-                original_filename=file.filename,
+                filename=f"formatted_{filename}", # Predicted filename
+                original_filename=filename,
                 job_id=job_id,
                 file_path=f"{job_id}_formatted.docx" # Internal storage name usually
             )
@@ -11274,92 +12441,19 @@ def upload_document():
         logger.error(f"Failed to save metadata or record: {e}")
     
     try:
-        # Process document
-        processor = DocumentProcessor()
-        images = []  # Extracted images
-        
-        if file_ext == '.docx':
-            # Robust unpacking to handle both dict and tuple returns
-            proc_result = processor.process_docx(input_path)
-            if isinstance(proc_result, tuple) and len(proc_result) == 2:
-                result, images = proc_result
-            else:
-                result = proc_result
-                images = []
-            logger.info(f"Processed document with {len(images)} images")
-        else:
-            # Read as text (txt, md, etc.) - no images in plain text
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
-            # Robust unpacking for text processing too
-            proc_result = processor.process_text(text)
-            if isinstance(proc_result, tuple) and len(proc_result) == 2:
-                result, images = proc_result
-            else:
-                result = proc_result
-                images = []
-        
-        # Validate result format
-        if not isinstance(result, dict) or 'structured' not in result:
-            logger.error(f"Invalid processing result format: {type(result)}")
-            return jsonify({'error': 'Document processing failed to produce structured data'}), 500
-
-        # Generate smart filename
-        smart_filename = processor.generate_smart_filename(result['structured'], file.filename)
-        logger.info(f"Generated smart filename: {smart_filename}")
+        response = format_document_file(input_path, filename, job_id)
         
-        # Update metadata with smart filename
+        # Update DocumentRecord with the smart filename
         try:
-            meta_path = os.path.join(OUTPUT_FOLDER, f"{job_id}_meta.json")
-            if os.path.exists(meta_path):
-                with open(meta_path, 'r') as f:
-                    metadata = json.load(f)
-                
-                metadata['smart_filename'] = smart_filename
-                
-                with open(meta_path, 'w') as f:
-                    json.dump(metadata, f)
-                    
-            # Update DocumentRecord if exists
             if current_user.is_authenticated:
                 doc_record = DocumentRecord.query.filter_by(job_id=job_id).first()
                 if doc_record:
-                    doc_record.filename = f"{smart_filename}.docx"
+                    doc_record.filename = response['filename']
                     db.session.commit()
         except Exception as e:
             logger.error(f"Failed to update metadata with smart filename: {e}")
-
-        # Generate formatted Word document with images
-        output_path = os.path.join(OUTPUT_FOLDER, f"{job_id}_formatted.docx")
-        generator = WordGenerator()
-        
-        # Pass cover page data and certification data if detected
-        cover_page_data = getattr(processor, 'cover_page_data', None)
-        certification_data = getattr(processor, 'certification_data', None)
-        generator.generate(
-            result['structured'], 
-            output_path, 
-            images=images,
-            cover_page_data=cover_page_data,
-            certification_data=certification_data
-        )
-        
-        # Generate preview markdown
-        preview = generate_preview_markdown(result['structured'])
-        
-        # Add image count to stats
-        result['stats']['images'] = len(images)
         
-        return jsonify({
-            'job_id': job_id,
-            'stats': result['stats'],
-            'structured': result['structured'],
-            'preview': preview,
-            'download_url': f'/download/{job_id}',
-            'status': 'complete',
-            'images_preserved': len(images),
-            'filename': f"{smart_filename}.docx"
-        })
+        return jsonify(response)
     
     except Exception as e:
         import traceback
@@ -11375,6 +12469,75 @@ def upload_document():
                 pass
 
 
+@app.route('/format_batch', methods=['POST'])
+@login_required
+def format_batch():
+    """Upload and process several documents in parallel (multipart field 'files')"""
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if not files:
+        return jsonify({'error': 'No files uploaded'}), 400
+    
+    if current_user.is_authenticated:
+        current_user.documents_generated += len(files)
+        db.session.commit()
+    
+    # Save every upload first, then fan out to the worker processes
+    jobs = []
+    for file in files:
+        job_id = secrets.token_hex(16)
+        file_ext = os.path.splitext(file.filename)[1].lower()
+        input_path = os.path.join(_ensure_dir(UPLOAD_FOLDER), f"{job_id}{file_ext}")
+        file.save(input_path, buffer_size=UPLOAD_BUFFER_SIZE)
+        
+        try:
+            metadata = {
+                'original_filename': file.filename,
+                'upload_time': datetime.now().isoformat()
+            }
+            with open(os.path.join(_ensure_dir(OUTPUT_FOLDER), f"{job_id}_meta.json"), 'w') as f:
+                json.dump(metadata, f)
+        except Exception as e:
+            logger.error(f"Failed to save metadata: {e}")
+        
+        jobs.append((job_id, file.filename, input_path))
+    
+    pool = _get_format_pool()
+    futures = [
+        pool.submit(_format_document_job, input_path, filename, job_id)
+        for job_id, filename, input_path in jobs
+    ]
+    
+    results = []
+    for (job_id, filename, input_path), future in zip(jobs, futures):
+        try:
+            response = future.result()
+        except Exception as e:
+            logger.error(f"Error processing document {filename}: {str(e)}")
+            results.append({'job_id': job_id, 'original_filename': filename,
+                            'status': 'error', 'error': str(e)})
+            continue
+        
+        response['original_filename'] = filename
+        results.append(response)
+        
+        # Create DocumentRecord
+        try:
+            if current_user.is_authenticated:
+                doc_record = DocumentRecord(
+                    user_id=current_user.id,
+                    filename=response['filename'],
+                    original_filename=filename,
+                    job_id=job_id,
+                    file_path=f"{job_id}_formatted.docx"
+                )
+                db.session.add(doc_record)
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to save record: {e}")
+    
+    return jsonify({'results': results})
+
+
 @app.route('/download/<job_id>', methods=['GET'])
 def download_document(job_id):
     """Download formatted document"""
@@ -11413,8 +12576,9 @@ def download_document(job_id):
     )
 
 
-# Lock for PDF conversion to prevent concurrent Word instances
-pdf_conversion_lock = threading.Lock()
+# Lock for PDF conversion to prevent concurrent Word instances. Re-entrant so
+# download_pdf can hold it across the field update and the conversion.
+pdf_conversion_lock = threading.RLock()
 
 def _convert_docx_to_pdf(docx_path, pdf_path):
     """Helper to convert DOCX to PDF using OS-specific tools"""
@@ -11457,7 +12621,14 @@ def _convert_docx_to_pdf(docx_path, pdf_path):
                 except:
                     pass
     else:
-        # Linux: Use LibreOffice (headless)
+        # Linux: export through the shared headless LibreOffice session when the
+        # UNO bridge is reachable, so it is not fighting a one-shot soffice
+        if _soffice_bridge_mode() is not None:
+            if _run_soffice_job(docx_path, pdf_path=pdf_path) and os.path.exists(pdf_path):
+                return True, None
+            return False, 'LibreOffice PDF export failed.'
+        
+        # Otherwise a one-shot LibreOffice (headless) conversion
         try:
             subprocess.run(['libreoffice', '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
         except (subprocess.CalledProcessError, FileNotFoundError):
@@ -11517,8 +12688,19 @@ def download_pdf(job_id, filename):
     if os.path.exists(pdf_path):
         return send_file(pdf_path, as_attachment=as_attachment, download_name=download_name, mimetype='application/pdf')
 
-    # Convert to PDF
-    success, error = _convert_docx_to_pdf(docx_path, pdf_path)
+    # Hold the lock while the .docx is rewritten so two downloads of the same
+    # job do not race, and re-check in case the other one already converted it
+    with pdf_conversion_lock:
+        if os.path.exists(pdf_path):
+            success, error = True, None
+        else:
+            # PDF converters do not honour w:updateFields, so fill in a deferred
+            # TOC/LOF/LOT before converting
+            if docx_requests_field_update(docx_path) and update_toc_with_word(docx_path):
+                set_docx_update_fields(docx_path, enabled=False)
+            
+            # Convert to PDF
+            success, error = _convert_docx_to_pdf(docx_path, pdf_path)
     
     if success and os.path.exists(pdf_path):
         return send_file(pdf_path, as_attachment=as_attachment, download_name=download_name, mimetype='application/pdf')
@@ -11625,7 +12807,7 @@ def api_generate_coverpage():
         return jsonify({'error': error}), 400
         
     # Generate a new job_id for this cover page result
-    job_id = str(uuid.uuid4())
+    job_id = secrets.token_hex(16)
     
     # Check for merge request
     merge_job_id = data.get('mergeJobId')
@@ -11672,11 +12854,11 @@ def api_generate_coverpage():
                     
                     font = academic_style.font
                     font.name = 'Times New Roman'
-                    font.size = Pt(12)
+                    font.size = PT_12
                     pf = academic_style.paragraph_format
                     pf.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
                     pf.line_spacing = 1.5
-                    pf.space_after = Pt(0)
+                    pf.space_after = PT_0
 
                     # --- AcademicListNumber ---
                     # We create a custom list style to prevent merging with Cover Page's list styles
@@ -11692,7 +12874,7 @@ def api_generate_coverpage():
                     
                     font = academic_list_number.font
                     font.name = 'Times New Roman'
-                    font.size = Pt(12)
+                    font.size = PT_12
                     pf = academic_list_number.paragraph_format
                     pf.line_spacing = 1.5
                     
@@ -11708,7 +12890,7 @@ def api_generate_coverpage():
                         
                     font = academic_list_bullet.font
                     font.name = 'Times New Roman'
-                    font.size = Pt(12)
+                    font.size = PT_12
                     pf = academic_list_bullet.paragraph_format
                     pf.line_spacing = 1.5
 
@@ -11786,11 +12968,11 @@ def api_generate_coverpage():
 
                 
                 # Merge using docxcompose
-                composer = Composer(cover_doc)
+                composer = FootnoteBatchingComposer(cover_doc)
                 composer.append(processed_doc)
                 
                 # Save merged document
-                composer.save(output_path)
+                save_docx(composer.doc, output_path)
                 
                 # --- POST-MERGE FIX: Restore Page Numbering ---
                 # The merge process often breaks page numbering linkage.
@@ -11842,7 +13024,7 @@ def api_generate_coverpage():
                             fldChar2.set(qn('w:fldCharType'), 'end')
                             run._r.append(fldChar2)
                         
-                        merged_doc.save(output_path)
+                        save_docx(merged_doc, output_path)
                         logger.info("Restored page numbering in merged document")
                 except Exception as e:
                     logger.error(f"Error restoring page numbering: {e}")
@@ -11856,7 +13038,7 @@ def api_generate_coverpage():
             # For now, let's just log it and return the cover page
 
     # Rename output file to standard format {job_id}_formatted.docx
-    formatted_path = os.path.join(OUTPUT_FOLDER, f"{job_id}_formatted.docx")
+    formatted_path = os.path.join(_ensure_dir(OUTPUT_FOLDER), f"{job_id}_formatted.docx")
     try:
         if os.path.exists(formatted_path):
             os.remove(formatted_path)
@@ -11903,7 +13085,7 @@ def api_generate_coverpage():
             'merged_from': merge_job_id
         }
         
-        with open(os.path.join(OUTPUT_FOLDER, f"{job_id}_meta.json"), 'w') as f:
+        with open(os.path.join(_ensure_dir(OUTPUT_FOLDER), f"{job_id}_meta.json"), 'w') as f:
             json.dump(metadata, f)
     except Exception as e:
         logger.error(f"Failed to save metadata: {e}")
@@ -0,0 +1,11 @@
+import re
+
+# Shared placeholder patterns for the cover page generator and sample inspection.
+# Compiled once at import so the per-placeholder loops skip the re module cache lookup.
+
+# Matches {{...}} placeholders, including those spanning newlines
+PLACEHOLDER_RE = re.compile(r'\{\{[^}]+\}\}', re.DOTALL)
+# Strips the braces from a placeholder
+BRACE_RE = re.compile(r'[{}]')
+# Collapses runs of whitespace (including newlines) to a single space
+WHITESPACE_RE = re.compile(r'\s+')
@@ -0,0 +1,92 @@
+"""
+Headless LibreOffice document operations over the UNO bridge.
+
+Imported by the backend when its interpreter can see LibreOffice's `uno` module,
+and otherwise run as a script by an interpreter that can (e.g. Debian's
+/usr/bin/python3 with python3-uno), since a venv or /usr/local Python does not
+see the distribution's bridge. Stdlib and uno only, so it runs under either.
+
+Usage: python3 soffice_bridge.py PORT DOCX_PATH [--update-fields] [--pdf PDF_PATH]
+"""
+import argparse
+import os
+import sys
+import time
+
+import uno
+
+
+def _property(name, value):
+    prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def connect(port, attempts=40):
+    """
+    Return a Desktop from the soffice process listening on localhost:port,
+    retrying while it opens the socket.
+    """
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        'com.sun.star.bridge.UnoUrlResolver', local_context)
+    connect_url = f'uno:socket,host=localhost,port={port};urp;StarOffice.ComponentContext'
+
+    last_error = None
+    for _ in range(attempts):
+        try:
+            context = resolver.resolve(connect_url)
+            return context.ServiceManager.createInstanceWithContext(
+                'com.sun.star.frame.Desktop', context)
+        except Exception as e:
+            last_error = e
+            time.sleep(0.25)
+    raise RuntimeError(f'Could not connect to LibreOffice: {last_error}')
+
+
+def process_document(desktop, docx_path, update_fields=False, pdf_path=None):
+    """
+    Open a document hidden, optionally recompute its fields and indexes (TOC,
+    LOF and LOT) and save it in place, then optionally export it as PDF.
+    """
+    doc = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(os.path.abspath(docx_path)), '_blank', 0,
+        (_property('Hidden', True),))
+    try:
+        if update_fields:
+            # Recompute fields, then every index (TOC, LOF and LOT are all indexes)
+            doc.getTextFields().refresh()
+            indexes = doc.getDocumentIndexes()
+            for i in range(indexes.getCount()):
+                indexes.getByIndex(i).update()
+            # Save with the filter the document was loaded with
+            doc.store()
+        if pdf_path:
+            doc.storeToURL(uno.systemPathToFileUrl(os.path.abspath(pdf_path)), (
+                _property('FilterName', 'writer_pdf_Export'),
+                _property('Overwrite', True),
+            ))
+    finally:
+        doc.close(True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Update fields or export PDF via headless LibreOffice')
+    parser.add_argument('port', type=int)
+    parser.add_argument('docx_path')
+    parser.add_argument('--update-fields', action='store_true')
+    parser.add_argument('--pdf', dest='pdf_path')
+    args = parser.parse_args(argv)
+
+    try:
+        process_document(connect(args.port), args.docx_path,
+                         update_fields=args.update_fields, pdf_path=args.pdf_path)
+    except Exception as e:
+        print(f'LibreOffice bridge error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
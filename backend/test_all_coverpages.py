@@ -1,6 +1,6 @@
 import os
 import sys
-from coverpage_generator import generate_cover_page
+from coverpage_generator import generate_cover_page, generate_cover_pages
 
 # Test cases covering different templates and scenarios
 test_cases = [
@@ -76,10 +76,23 @@ for case in test_cases:
         else:
             print(f"❌ FAILED: File not found at {output_path}")
 
+print("\nTesting: Batch generation")
+print("-" * 30)
+
+batch_results = generate_cover_pages([case['data'] for case in test_cases])
+batch_ok = len(batch_results) == len(test_cases)
+for case, (output_path, error) in zip(test_cases, batch_results):
+    if error or not os.path.exists(output_path):
+        print(f"❌ FAILED: {case['name']}: {error or 'file not found'}")
+        batch_ok = False
+if batch_ok:
+    print(f"✅ SUCCESS")
+    print(f"   Files: {len(batch_results)}")
+
 print("\n" + "=" * 60)
 print(f"Test Summary: {success_count}/{len(test_cases)} passed")
 
-if success_count == len(test_cases):
+if success_count == len(test_cases) and batch_ok:
     sys.exit(0)
 else:
     sys.exit(1)
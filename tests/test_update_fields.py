@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from docx import Document
+
+from pattern_formatter_backend import (
+    docx_requests_field_update,
+    request_field_update_on_open,
+    set_docx_update_fields,
+)
+
+
+class TestUpdateFieldsRoundTrip(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.docx')
+        os.close(fd)
+        doc = Document()
+        doc.add_paragraph('Body text')
+        self.doc = doc
+
+    def tearDown(self):
+        for path in (self.path, self.path + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_plain_document_does_not_request_update(self):
+        self.doc.save(self.path)
+        self.assertFalse(docx_requests_field_update(self.path))
+
+    def test_request_on_open_is_saved(self):
+        request_field_update_on_open(self.doc)
+        self.doc.save(self.path)
+        self.assertTrue(docx_requests_field_update(self.path))
+
+    def test_clear_and_set_round_trip(self):
+        request_field_update_on_open(self.doc)
+        self.doc.save(self.path)
+
+        self.assertTrue(set_docx_update_fields(self.path, enabled=False))
+        self.assertFalse(docx_requests_field_update(self.path))
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+        self.assertTrue(set_docx_update_fields(self.path))
+        self.assertTrue(docx_requests_field_update(self.path))
+
+        # The patched package still opens and keeps its content
+        reopened = Document(self.path)
+        self.assertEqual([p.text for p in reopened.paragraphs], ['Body text'])
+
+
+if __name__ == '__main__':
+    unittest.main()
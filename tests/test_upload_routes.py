@@ -0,0 +1,94 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import pattern_formatter_backend as backend
+
+SAMPLE_TEXT = (
+    "INTRODUCTION\n\n"
+    "This report describes the results of the study.\n\n"
+    "1.1 Background\n\n"
+    "The background of the study is given here.\n"
+)
+
+
+class TestUploadRoutes(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pool = ThreadPoolExecutor(max_workers=2)
+        patches = [
+            mock.patch.object(backend, 'UPLOAD_FOLDER', os.path.join(self.tmp_dir, 'uploads')),
+            mock.patch.object(backend, 'OUTPUT_FOLDER', os.path.join(self.tmp_dir, 'outputs')),
+            # Threads instead of worker processes so the patched folders apply
+            mock.patch.object(backend, '_get_format_pool', return_value=self.pool),
+            mock.patch.dict(backend.app.config, {'LOGIN_DISABLED': True, 'TESTING': True}),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = backend.app.test_client()
+
+    def tearDown(self):
+        self.pool.shutdown(wait=True)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _output_path(self, job_id):
+        return os.path.join(backend.OUTPUT_FOLDER, f"{job_id}_formatted.docx")
+
+    def test_format_batch_keeps_upload_order(self):
+        data = {'files': [
+            (io.BytesIO(SAMPLE_TEXT.encode('utf-8')), 'second.txt'),
+            (io.BytesIO(SAMPLE_TEXT.encode('utf-8')), 'first.txt'),
+        ]}
+        response = self.client.post('/format_batch', data=data, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+
+        results = response.get_json()['results']
+        self.assertEqual([r['original_filename'] for r in results], ['second.txt', 'first.txt'])
+        for result in results:
+            self.assertEqual(result['status'], 'complete')
+            self.assertTrue(os.path.exists(self._output_path(result['job_id'])))
+
+    def test_format_batch_reports_bad_file_per_entry(self):
+        data = {'files': [
+            (io.BytesIO(b'this is not a zip archive'), 'broken.docx'),
+            (io.BytesIO(SAMPLE_TEXT.encode('utf-8')), 'good.txt'),
+        ]}
+        response = self.client.post('/format_batch', data=data, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+
+        bad, good = response.get_json()['results']
+        self.assertEqual(bad['original_filename'], 'broken.docx')
+        self.assertEqual(bad['status'], 'error')
+        self.assertTrue(bad['error'])
+        self.assertFalse(os.path.exists(self._output_path(bad['job_id'])))
+
+        self.assertEqual(good['original_filename'], 'good.txt')
+        self.assertEqual(good['status'], 'complete')
+        self.assertTrue(os.path.exists(self._output_path(good['job_id'])))
+
+    def test_raw_body_upload(self):
+        response = self.client.post(
+            '/upload?filename=x.txt',
+            data=SAMPLE_TEXT.encode('utf-8'),
+            content_type='application/octet-stream',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        result = response.get_json()
+        self.assertEqual(result['status'], 'complete')
+        self.assertTrue(os.path.exists(self._output_path(result['job_id'])))
+        # The raw body was saved under the job id and removed after formatting
+        self.assertFalse(os.path.exists(os.path.join(backend.UPLOAD_FOLDER, f"{result['job_id']}.txt")))
+
+
+if __name__ == '__main__':
+    unittest.main()